@@ -11,6 +11,47 @@ class Settings(BaseSettings):
     # Redis settings
     REDIS_URL: str = "redis://redis:6379/0"
 
+    # Scraper settings
+    SCRAPER_MAX_SESSIONS: int = 8  # pooled HTTP sessions per scraper (one per proxy)
+    SCRAPER_MAX_CLIENTS_PER_SESSION: int = 10  # concurrent requests per session
+    SCRAPER_WORKER_BATCH_SIZE: int = 10  # jobs read per xreadgroup call
+    SCRAPER_RATE_LIMIT_HEADROOM: float = 0.9  # fraction of a supplier's rate_limit the fleet may use
+    SCRAPER_PROXY_RATE_LIMIT: int = 30  # requests per minute through any one proxy, per supplier; 0 disables
+    SCRAPER_FLEET_SIZE: int = 4  # scraping processes sharing a rate limit, each gets 1/N while Redis is down
+    SCRAPER_PARSER_EXECUTOR: str = "thread"  # "thread" or "process" pool for HTML parsing
+    SCRAPER_PARSER_WORKERS: int = 4
+    SCRAPER_PROXY_FLUSH_SECONDS: int = 30  # how often proxy health is written to proxy_pool
+    SCRAPER_PROXY_COOLDOWN_SECONDS: int = 60  # first cooldown for a failing proxy, doubles per strike
+    SCRAPER_PROXY_MIN_HEALTH: int = 30  # below this a proxy is cooled down
+    SCRAPER_PROXY_SLOW_SECONDS: float = 5.0  # responses slower than this lower proxy health
+    SCRAPER_SINGLEFLIGHT_LOCK_SECONDS: int = 30  # cross-process scrape lock TTL; 0 coalesces per process only
+    SCRAPER_INITIAL_CONCURRENCY: int = 4  # starting in-flight requests per supplier, adapted by AIMD
+    SCRAPER_MAX_CONCURRENCY: int = 32  # ceiling for the adaptive in-flight limit
+    SCRAPER_LATENCY_TARGET_SECONDS: float = 3.0  # p95 latency above which the limit stops growing
+    SCRAPER_STREAM_MAX_BYTES: int = 0  # stream tracker change checks, cut after the tracked fields; 0 downloads whole pages
+    SCRAPER_BREAKER_ERROR_RATE: float = 0.5  # error share over the last minute that opens the circuit
+    SCRAPER_BREAKER_MIN_CALLS: int = 10  # outcomes needed before the error rate counts
+    SCRAPER_BREAKER_BLOCK_THRESHOLD: int = 3  # block/captcha responses per minute that open the circuit
+    SCRAPER_BREAKER_BACKOFF_SECONDS: int = 30  # first open period, doubles per consecutive trip
+    SCRAPER_BREAKER_MAX_BACKOFF_SECONDS: int = 1800
+    TRACKER_MAX_STALENESS_SECONDS: int = 300  # tracker accepts cached scrapes up to this age
+    TRACKER_CHUNK_SIZE: int = 500  # products loaded, scraped and bulk-written per round
+    TRACKER_MIN_INTERVAL_SECONDS: int = 900  # check interval after a price/stock change
+    TRACKER_MAX_INTERVAL_SECONDS: int = 86400  # ceiling for stable products
+    TRACKER_ACTIVE_MAX_INTERVAL_SECONDS: int = 3600  # ceiling for products with Active listings
+    TRACKER_ARCHIVED_INTERVAL_SECONDS: int = 604800
+    TRACKER_BACKOFF_FACTOR: float = 1.5  # interval growth after a check with no change
+    TRACKER_RETRY_SECONDS: int = 300  # next attempt after a failed scrape
+    TRACKER_CLAIM_LEASE_SECONDS: int = 600  # claimed products become due again if not rescheduled
+    TRACKER_DISPATCH_BATCH_SIZE: int = 500  # due products claimed per dispatch
+    TRACKER_SYNC_INTERVAL_SECONDS: int = 300  # how often new products are added to the schedule
+    TRACKER_SWEEP_STALE_SECONDS: int = 600  # a full sweep whose checkpoint is older is resumed by another run
+    TRACKER_SHARDS: int = 64  # schedule partitions divided among tracker workers; fixed once deployed
+    TRACKER_SHARD_LEASE_SECONDS: int = 30  # a silent worker's shards move to others after this
+    HISTORY_FLUSH_ROWS: int = 5000  # buffered price/stock history rows that trigger a bulk write
+    HISTORY_FLUSH_SECONDS: float = 2.0  # longest a history row waits in the buffer
+    CHANGE_STREAM_MAXLEN: int = 100_000  # approximate cap on tracker:changes entries
+
     # Security settings
     SECRET_KEY: str = "super-secret-key"  # TODO: Change in production
     ALGORITHM: str = "HS256"
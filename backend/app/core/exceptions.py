@@ -2,6 +2,26 @@ class ScrapingError(Exception):
     """Custom exception for scraping errors."""
     pass
 
+class ProductNotFound(ScrapingError):
+    """Raised when the supplier reports that a product does not exist."""
+    pass
+
+class SupplierBlocked(ScrapingError):
+    """Raised when the supplier blocks or throttles us (403/429/503, captcha)."""
+    pass
+
+class CaptchaDetected(SupplierBlocked):
+    """Raised when the supplier answers with a captcha or robot-check page."""
+    pass
+
+class SupplierTimeout(ScrapingError):
+    """Raised when a request to the supplier times out."""
+    pass
+
+class CircuitOpen(ScrapingError):
+    """Raised without contacting the supplier while its circuit breaker is open."""
+    pass
+
 class InvalidListingState(Exception):
     """Custom exception for invalid listing state transitions."""
-    pass
\ No newline at end of file
+    pass
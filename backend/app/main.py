@@ -6,6 +6,7 @@ from app.config import settings
 from app.core.redis import connect_redis, close_redis
 from app.core.logging import configure_logging, logger
 from app.api.v1.router import api_router
+from app.scrapers.registry import ScraperRegistry
 
 # Configure structured logging
 configure_logging()
@@ -62,7 +63,13 @@ async def read_root():
 async def health_check():
     """
     Health check endpoint.
+
+    Scraper status comes from cached probes (no scraping), together with
+    each scraper's circuit, concurrency and scrape cache hits/misses; the
+    API is "degraded" when any supplier is unreachable or its circuit is open.
     """
-    return {"status": "ok"}
+    scrapers = await ScraperRegistry.health_snapshot()
+    healthy = all(s["healthy"] for s in scrapers.values())
+    return {"status": "ok" if healthy else "degraded", "scrapers": scrapers}
 
 logger.info("Dropship Central API starting up...")
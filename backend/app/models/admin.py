@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, JSON, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, JSON, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.models.base import BaseModel
+from .base import BaseModel
 
 class Alert(BaseModel):
     """
@@ -29,6 +29,17 @@ class Job(BaseModel):
     Represents a background job executed by the system.
     """
     __tablename__ = "jobs"
+    # Only one tracking sweep may be RUNNING; two processes starting a
+    # sweep at once cannot both insert one
+    __table_args__ = (
+        Index(
+            "uq_jobs_running_sweep",
+            "type",
+            unique=True,
+            postgresql_where=text("status = 'RUNNING' AND type = 'track_products'"),
+            sqlite_where=text("status = 'RUNNING' AND type = 'track_products'"),
+        ),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Nullable for system jobs
     type = Column(String, nullable=False) # scrape_amazon, track_products, sync_ebay, upload_shopify
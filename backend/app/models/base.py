@@ -1,3 +1,18 @@
+from typing import Any
+
+from sqlalchemy import Column, Integer, DateTime
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.sql import func
+
+Base: Any = declarative_base()
+
+class BaseModel(Base):
+    """
+    Abstract base for models declared with classic Column attributes.
+    Provides the id primary key and created/updated timestamps.
+    """
+    __abstract__ = True
 
-Base = declarative_base()
\ No newline at end of file
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -5,7 +5,7 @@ from datetime import datetime, date
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, Date, Text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
-from app.models.base import Base
+from .base import Base
 
 class StoreAccount(Base):
     """
@@ -2,16 +2,19 @@ from decimal import Decimal
 from typing import List, Optional
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, DECIMAL, JSON, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
-from app.models.base import Base
+from .base import Base
 
 class Product(Base):
     """
     Represents a product scraped from a supplier.
     """
     __tablename__ = "products"
+    # A supplier item is identified by (supplier_id, asin); products of
+    # different users tracking it are found, scraped once and updated together
+    __table_args__ = (Index("ix_products_supplier_item", "supplier_id", "asin"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     supplier_id: Mapped[Optional[int]] = mapped_column(ForeignKey("suppliers.id"))
@@ -26,6 +29,11 @@ class Product(Base):
     url: Mapped[Optional[str]] = mapped_column(String)
     last_scraped_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     is_archived: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Latest observation, so tracking and policy checks never read history
+    previous_price: Mapped[Optional[Decimal]] = mapped_column(DECIMAL(10, 2))
+    price_changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    stock_changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    page_fingerprint: Mapped[Optional[dict]] = mapped_column(JSON)  # PageFingerprint of the last scraped page
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
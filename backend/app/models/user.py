@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.models.base import BaseModel
+from .base import BaseModel
 
 class User(BaseModel):
     """
@@ -18,6 +18,8 @@ class User(BaseModel):
     is_active = Column(Boolean, default=True, nullable=False)
 
     sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
+    store_accounts = relationship("StoreAccount", back_populates="user", cascade="all, delete-orphan")
+    listings = relationship("Listing", back_populates="user")
 
 class Session(BaseModel):
     """
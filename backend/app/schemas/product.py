@@ -91,6 +91,9 @@ class ProductInDBBase(ProductBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    previous_price: Optional[Decimal] = None
+    price_changed_at: Optional[datetime] = None
+    stock_changed_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -1,119 +1,304 @@
-from curl_cffi.requests import AsyncSession, Headers
+from curl_cffi.requests import Headers
 from bs4 import BeautifulSoup
+import hashlib
 import random
-from typing import Optional, List
-from .base import BaseScraper, Product
+import re
+from typing import Any, Optional, List, Dict, Tuple
+from .base import BaseScraper, Product, PageFingerprint
+from .session_pool import SessionPool
+from .parsing import get_parser_pool, make_soup
+from .extraction import extract_product_html
+from .blocks import CAPTCHA, DOG_PAGE, NOT_FOUND, ROBOT_CHECK, BlockMarkers
 from ..core.exceptions import ProductNotFound, ScrapingError
-# from ..utils.proxy_manager import get_healthy_proxy # This will be created later
+from ..config import settings
 import logging
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
+AMAZON_URL = "https://www.amazon.com"
+
+# Raw-markup regions that carry the tracked fields. Everything else on the
+# page (ads, recommendations, session tokens) changes on every load.
+FINGERPRINT_REGIONS = [
+    re.compile(rb'id="productTitle"[^>]*>(.*?)</span>', re.S),
+    re.compile(rb'class="a-price-whole">(.*?)</span>', re.S),
+    re.compile(rb'class="a-price-fraction">(.*?)</span>', re.S),
+    re.compile(rb'<div[^>]*id="availability"[^>]*>(.*?)</div>', re.S),
+]
+
+# Once the title and availability blocks have arrived (the price sits
+# between them), the rest of a product page is reviews and recommendations
+STREAM_STOP_MARKERS = (b'id="productTitle"', b'id="availability"')
+
+# Markup that only appears on Amazon's interstitial and error pages
+AMAZON_BLOCK_MARKERS: BlockMarkers = {
+    CAPTCHA: (b"/errors/validateCaptcha", b"Type the characters you see in this image"),
+    ROBOT_CHECK: (b"<title>Robot Check</title>", b"api-services-support@amazon.com"),
+    DOG_PAGE: (b"Sorry! Something went wrong!", b"ref=cs_503_link"),
+    NOT_FOUND: (b"Sorry! We couldn't find that page", b"ref=cs_404_link"),
+}
+
+# Default extraction spec; Supplier.scraper_config can override it
+AMAZON_EXTRACTION = {
+    "fields": {
+        "title": {"selector": "#productTitle, h1 span"},
+        "price": {"selector": ".priceToPay .a-offscreen, .a-price .a-offscreen", "convert": "price"},
+        "stock": {"selector": "#availability span", "default": "In Stock"},
+        "rating": {"selector": "#acrPopover .a-icon-alt", "regex": r"([\d.]+) out of", "convert": "float"},
+        "reviews_count": {"selector": "#acrCustomerReviewText", "convert": "int"},
+        "images": {"selector": "#imageBlock img", "attr": "src", "many": True, "limit": 10},
+        "description": {"selector": "#productDescription"},
+    },
+}
+
 class AmazonScraper(BaseScraper):
     supplier_name = "amazon"
     requires_js = False  # curl-cffi can handle most Amazon pages
+    parser_backend = "lxml"  # BeautifulSoup tree builder, see parsing.PARSER_BACKENDS
+    extraction_config: Dict[str, Any] = AMAZON_EXTRACTION  # see extraction.ExtractionSpec
+    block_markers = AMAZON_BLOCK_MARKERS
+    session_pool: SessionPool
 
     def __init__(self):
-        self.base_url = "https://www.amazon.com"
+        self.base_url = AMAZON_URL
         self.impersonate_browser = "chrome120"
+        self.session_pool = SessionPool(
+            impersonate=self.impersonate_browser,
+            max_sessions=settings.SCRAPER_MAX_SESSIONS,
+            max_clients=settings.SCRAPER_MAX_CLIENTS_PER_SESSION,
+        )
+
+    async def open(self) -> None:
+        """Open the session pool and pre-warm the connection to Amazon"""
+        await self.session_pool.open(warmup_url=self.base_url)
+
+    async def probe(self) -> None:
+        """HEAD the home page through the session pool"""
+        response = await self._request(self.base_url, method="HEAD", timeout=5)
+        if response.status_code >= 400:
+            raise ScrapingError(f"Amazon returned {response.status_code}")
 
     async def get_product(self, asin: str) -> Product:
         """Fetch Amazon product by ASIN"""
         try:
-            url = f"{self.base_url}/dp/{asin}"
-            # proxy = await get_healthy_proxy()  # From proxy_pool
+            url, response = await self._fetch_product_page(asin)
 
-            headers = self._get_random_headers()
+            # Parse HTML off the event loop
+            product = await get_parser_pool().run(
+                extract_product_html,
+                response.content,
+                asin,
+                url,
+                self.parser_backend,
+                self.extraction_config,
+            )
+
+            logger.info(f"Scraped Amazon product {asin}: {product.title}")
+            return product
 
-            async with AsyncSession() as session:
-                response = await session.get(
-                    url,
-                    impersonate=self.impersonate_browser,
-                    # proxy=proxy,
-                    headers=headers,
-                    timeout=10
-                )
+        except Exception as e:
+            logger.error(f"Amazon scrape of {asin} failed: {e}")
+            if isinstance(e, ScrapingError):
+                raise
+            raise ScrapingError(f"Failed to scrape {asin}: {str(e)}")
 
-            if response.status_code == 404:
-                raise ProductNotFound(f"ASIN {asin} not found on Amazon")
+    async def get_product_if_changed(
+        self, asin: str, previous: Optional[PageFingerprint] = None
+    ) -> Tuple[Optional[Product], Optional[PageFingerprint]]:
+        """Fetch Amazon product by ASIN, skipping the parse if the page is unchanged
 
-            if response.status_code != 200:
-                raise ScrapingError(f"Failed to fetch {asin}: {response.status_code}")
+        Sends If-None-Match/If-Modified-Since when ``previous`` carries
+        validators, and otherwise compares a hash of the title, price and
+        availability markup taken straight from the raw bytes.
+        """
+        try:
+            url, response = await self._fetch_product_page(
+                asin, self._conditional_headers(previous), stream=True
+            )
 
-            # Parse HTML
-            soup = BeautifulSoup(response.text, "html.parser")
-            product = self._parse_product(soup, asin, url)
+            if response.status_code == 304:
+                logger.info(f"Amazon product {asin} unchanged (validator).")
+                return None, previous
 
-            logger.info("amazon_product_scraped", asin=asin, title=product.title)
-            return product
+            fingerprint = PageFingerprint(
+                digest=self._fingerprint_page(response.content),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            if previous is not None and fingerprint.digest and fingerprint.digest == previous.digest:
+                logger.info(f"Amazon product {asin} unchanged (digest).")
+                return None, fingerprint
+
+            product = await get_parser_pool().run(
+                extract_product_html,
+                response.content,
+                asin,
+                url,
+                self.parser_backend,
+                self.extraction_config,
+            )
+
+            logger.info(f"Scraped Amazon product {asin}: {product.title}")
+            return product, fingerprint
 
         except Exception as e:
-            logger.error("amazon_scrape_failed", asin=asin, error=str(e))
+            logger.error(f"Amazon scrape of {asin} failed: {e}")
+            if isinstance(e, ScrapingError):
+                raise
             raise ScrapingError(f"Failed to scrape {asin}: {str(e)}")
 
+    def _streams_change_checks(self) -> bool:
+        return bool(settings.SCRAPER_STREAM_MAX_BYTES)
+
+    async def _fetch_product_page(
+        self, asin: str, extra_headers: Optional[Dict[str, str]] = None, stream: bool = False
+    ):
+        """GET the product page, raising on anything but 200 or 304
+
+        Args:
+            asin: Amazon product ID
+            extra_headers: Headers added to the randomized browser headers
+            stream: Download only the start of the page, up to the
+                availability block (see STREAM_STOP_MARKERS), when
+                ``SCRAPER_STREAM_MAX_BYTES`` is set. The prefix holds the
+                tracked fields but not the description.
+
+        Returns:
+            (url, response)
+        """
+        url = f"{self.base_url}/dp/{asin}"
+
+        headers = self._get_random_headers()
+        if extra_headers:
+            headers.update(extra_headers)
+
+        if stream and settings.SCRAPER_STREAM_MAX_BYTES:
+            response = await self._request(
+                url,
+                headers=headers,
+                timeout=10,
+                max_bytes=settings.SCRAPER_STREAM_MAX_BYTES,
+                stop_markers=STREAM_STOP_MARKERS,
+            )
+        else:
+            response = await self._request(url, headers=headers, timeout=10)
+
+        if response.status_code == 404:
+            raise ProductNotFound(f"ASIN {asin} not found on Amazon")
+
+        if response.status_code not in (200, 304):
+            raise ScrapingError(f"Failed to fetch {asin}: {response.status_code}")
+
+        return url, response
+
+    @staticmethod
+    def _conditional_headers(previous: Optional[PageFingerprint]) -> Dict[str, str]:
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        return headers
+
+    @staticmethod
+    def _fingerprint_page(html: bytes) -> Optional[str]:
+        """Hash the page regions the tracker cares about, without parsing
+
+        Returns None when none of the regions are present (block pages,
+        layout changes), so such pages are never treated as unchanged.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        found = False
+        for pattern in FINGERPRINT_REGIONS:
+            match = pattern.search(html)
+            if match:
+                found = True
+                digest.update(match.group(1).strip())
+            digest.update(b"\x00")
+        return digest.hexdigest() if found else None
+
     async def search(self, query: str, limit: int = 10) -> List[Product]:
-        """Search Amazon products"""
+        """Search Amazon products, reading as many result pages as ``limit`` needs"""
+        products = [p async for p in self.search_iter(query, limit=limit)]
+        logger.info(f"Amazon search for {query!r} found {len(products)} products.")
+        return products
+
+    async def search_page(self, query: str, page: int = 1) -> List[Product]:
+        """Fetch one page of Amazon search results"""
         try:
-            url = f"{self.base_url}/s"
             params = {"k": query}
-            # proxy = await get_healthy_proxy()
+            if page > 1:
+                params["page"] = str(page)
             headers = self._get_random_headers()
 
-            async with AsyncSession() as session:
-                response = await session.get(
-                    url,
-                    params=params,
-                    impersonate=self.impersonate_browser,
-                    # proxy=proxy,
-                    headers=headers
-                )
+            response = await self._request(f"{self.base_url}/s", params=params, headers=headers)
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            products = self._parse_search_results(soup)[:limit]
+            if response.status_code != 200:
+                raise ScrapingError(f"Failed to fetch search page {page}: {response.status_code}")
 
-            logger.info("amazon_search_completed", query=query, count=len(products))
+            products = await get_parser_pool().run(
+                self._parse_search_html, response.content, self.parser_backend
+            )
+
+            logger.info(f"Amazon search for {query!r}, page {page}: {len(products)} products.")
             return products
 
         except Exception as e:
-            logger.error("amazon_search_failed", query=query, error=str(e))
+            logger.error(f"Amazon search for {query!r}, page {page} failed: {e}")
+            if isinstance(e, ScrapingError):
+                raise
             raise ScrapingError(f"Search failed: {str(e)}")
 
-    def _parse_product(self, soup: BeautifulSoup, asin: str, url: str) -> Product:
-        """Extract product data from HTML"""
-        # Use CSS selectors (adapt from your amazon_poller.py)
-        title = soup.select_one("h1 span")
-        title = title.text.strip() if title else "Unknown"
-        price_text = soup.select_one(".a-price-whole")
-        price_text = price_text.text if price_text else "0"
-        price = Decimal(price_text.replace("$", "").replace(",", ""))
-        stock = self._extract_stock(soup)
-        rating = self._extract_rating(soup)
-        reviews = self._extract_reviews(soup)
-        images = self._extract_images(soup)
-
-        return Product(
-            asin=asin,
-            title=title,
-            price=price,
-            stock=stock,
-            rating=rating,
-            reviews_count=reviews,
-            images=images,
-            url=url
-        )
+    # Parsing is done in classmethods so it can run in a process pool
+
+    @classmethod
+    def _parse_search_html(cls, html: bytes, backend: str) -> List[Product]:
+        """Build the DOM with ``backend`` and extract search results"""
+        return cls._parse_search_results(make_soup(html, backend))
 
-    def _parse_search_results(self, soup: BeautifulSoup) -> List[Product]:
+    @classmethod
+    def _parse_search_results(cls, soup: BeautifulSoup) -> List[Product]:
         """Extract products from search page"""
         products = []
         for item in soup.select("[data-component-type='s-search-result']"):
             asin = item.get("data-asin")
-            if not asin:
+            if not asin or not isinstance(asin, str):
                 continue
-            # Parse each search result
-            # ... implementation details ...
+            title = item.select_one("h2 span")
+            price = item.select_one(".a-price .a-offscreen")
+            rating = item.select_one(".a-icon-alt")
+            reviews = item.select_one("[aria-label] .s-underline-text")
+            image = item.select_one("img.s-image")
+            products.append(Product(
+                asin=asin,
+                title=title.text.strip() if title else "Unknown",
+                price=cls._parse_price(price.text if price else "0"),
+                stock="In Stock",
+                rating=cls._parse_rating(rating.text) if rating else None,
+                reviews_count=cls._parse_count(reviews.text) if reviews else None,
+                images=[str(image["src"])] if image and image.get("src") else [],
+                url=f"{AMAZON_URL}/dp/{asin}",
+            ))
         return products
 
+    @staticmethod
+    def _parse_price(text: str) -> Decimal:
+        return Decimal(text.strip().replace("$", "").replace(",", "") or "0")
+
+    @staticmethod
+    def _parse_rating(text: str) -> Optional[float]:
+        """Leading number of a rating text ("4.5 out of 5 stars"), None if there is none"""
+        match = re.match(r"\s*(\d+(?:\.\d+)?)", text)
+        return float(match.group(1)) if match else None
+
+    @staticmethod
+    def _parse_count(text: str) -> Optional[int]:
+        """Exact count from "1,234" or "(1,234)"; None for "New", "1.2K" and other text"""
+        digits = text.strip().strip("()").replace(",", "")
+        return int(digits) if digits.isdigit() else None
+
     def _get_random_headers(self) -> Headers:
         """Random user agent and headers"""
         user_agents = [
@@ -125,19 +310,3 @@ class AmazonScraper(BaseScraper):
             "Accept-Language": "en-US,en;q=0.9",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         })
-
-    def _extract_stock(self, soup) -> str:
-        # Implementation from your amazon_poller.py patterns
-        return "In Stock"
-
-    def _extract_rating(self, soup) -> Optional[float]:
-        # Implementation
-        return 4.5
-
-    def _extract_reviews(self, soup) -> Optional[int]:
-        # Implementation
-        return 100
-
-    def _extract_images(self, soup) -> List[str]:
-        # Implementation
-        return []
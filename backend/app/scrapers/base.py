@@ -1,26 +1,101 @@
+import asyncio
+import hashlib
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Iterable, AsyncIterator, Set, Tuple
+from pydantic import BaseModel, ConfigDict
 from decimal import Decimal
+from curl_cffi.requests import HttpMethod
+from curl_cffi.requests.exceptions import Timeout
+from .session_pool import SessionPool
+from .rate_limiter import RateLimiter
+from .cache import scrape_cache
+from .singleflight import SingleFlight
+from .circuit_breaker import CircuitBreaker
+from .concurrency import AIMDLimiter
+from .streaming import read_prefix
+from .blocks import NOT_FOUND, BlockMarkers, classify_page, raise_for_page
+from ..config import settings
+from ..core.redis import get_redis_client
+from ..core.exceptions import ScrapingError, SupplierBlocked, SupplierTimeout
+from ..utils.proxy_manager import ProxyState, get_healthy_proxy, get_proxy_manager
+
+# Responses that mean the proxy's IP is being blocked or throttled
+BLOCK_STATUS_CODES = (403, 429, 503)
+
+# Proxy picked for the supplier call in progress (see BaseScraper._call_limited)
+_call_proxy: ContextVar[Optional[ProxyState]] = ContextVar("call_proxy", default=None)
 
 class Product(BaseModel):
     """Scraped product data"""
     asin: str  # supplier unique ID
     title: str
-    description: Optional[str]
-    price: Decimal
+    description: Optional[str] = None
+    price: Optional[Decimal] = None  # None when the page shows no price (e.g. unavailable)
     stock: str  # "In Stock" or "5 available"
     rating: Optional[float]
     reviews_count: Optional[int]
     images: List[str]
     url: str
 
+class PageFingerprint(BaseModel):
+    """Identifies a version of a supplier page without parsing it"""
+    model_config = ConfigDict(frozen=True)
+
+    digest: Optional[str] = None  # hash of the page region holding tracked fields
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+class ScrapeResult(BaseModel):
+    """Outcome of one item in a batch scrape"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    product_id: str
+    product: Optional[Product] = None  # None with no error: page unchanged
+    fingerprint: Optional[PageFingerprint] = None
+    error: Optional[Exception] = None
+
+    @property
+    def unchanged(self) -> bool:
+        return self.error is None and self.product is None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class BaseScraper(ABC):
     """Abstract base for all scrapers"""
 
     supplier_name: str  # e.g., "amazon", "aliexpress"
     rate_limit: int = 60  # requests per minute
+    proxy_rate_limit: int = settings.SCRAPER_PROXY_RATE_LIMIT  # requests per minute per proxy, 0 for no cap
     requires_js: bool = False  # needs browser
+    max_concurrency: int = settings.SCRAPER_MAX_CONCURRENCY  # ceiling for in-flight requests
+    cache_ttl: int = 900  # seconds a scraped product stays in the shared cache
+    health_ttl: int = 60  # seconds a health probe result is reused
+    block_markers: BlockMarkers = {}  # see blocks.classify_page
+    extraction_config: Optional[Dict[str, Any]] = None  # see extraction.ExtractionSpec
+    session_pool: Optional[SessionPool] = None  # long-lived HTTP sessions
+    singleflight: Optional[SingleFlight] = None  # attached by ScraperRegistry
+    circuit_breaker: Optional[CircuitBreaker] = None  # attached by ScraperRegistry
+    _rate_limiter: Optional[RateLimiter] = None
+    _concurrency: Optional[AIMDLimiter] = None
+
+    async def open(self) -> None:
+        """Open long-lived resources (HTTP session pool)
+
+        Workers call this once at startup so the first scrape doesn't pay
+        for connection setup.
+        """
+        if self.session_pool is not None:
+            await self.session_pool.open()
+
+    async def close(self) -> None:
+        """Release long-lived resources. Workers call this at shutdown."""
+        if self.session_pool is not None:
+            await self.session_pool.close()
 
     @abstractmethod
     async def get_product(self, product_id: str) -> Product:
@@ -54,15 +129,455 @@ class BaseScraper(ABC):
         """
         pass
 
+    async def search_page(self, query: str, page: int = 1) -> List[Product]:
+        """Fetch one page of search results
+
+        Scrapers that support pagination override this; ``search_iter``
+        builds on it.
+
+        Args:
+            query: Search term
+            page: 1-based result page
+
+        Returns:
+            Products on that page (empty past the last page)
+
+        Raises:
+            ScrapingError: If the page can't be fetched
+        """
+        if page > 1:
+            return []
+        return await self.search(query)
+
+    async def search_iter(
+        self, query: str, limit: Optional[int] = None, max_pages: int = 20
+    ) -> AsyncIterator[Product]:
+        """Stream search results page by page
+
+        While the consumer works through one page the next one is already
+        being fetched (rate limited), so only about two pages are held in
+        memory. Fetching stops at ``limit`` results, after ``max_pages``,
+        at the first empty page, or as soon as the consumer stops iterating.
+        Products repeated across pages (sponsored slots) are yielded once.
+
+        Args:
+            query: Search term
+            limit: Max products to yield (None: all pages)
+            max_pages: Max result pages to fetch
+
+        Yields:
+            Product per search result, in page order
+        """
+        async def fetch(page: int) -> List[Product]:
+            return await self._call(self.search_page, query, page)
+
+        seen: Set[str] = set()
+        page = 1
+        next_page: Optional[asyncio.Task[List[Product]]] = asyncio.create_task(fetch(page))
+        try:
+            while next_page is not None:
+                products = await next_page
+                next_page = None
+                if not products:
+                    return
+                new = [p for p in products if p.asin not in seen]
+                if limit is not None:
+                    new = new[: limit - len(seen)]
+                seen.update(p.asin for p in new)
+
+                if page < max_pages and (limit is None or len(seen) < limit):
+                    page += 1
+                    next_page = asyncio.create_task(fetch(page))
+                for product in new:
+                    yield product
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def fetch_product(
+        self, product_id: str, max_staleness: Optional[float] = None
+    ) -> Product:
+        """Get a product through the shared scrape cache
+
+        This is the entry point callers should use: a product scraped by any
+        worker within ``max_staleness`` seconds is served from Redis, and
+        only misses go to the supplier (rate limited). Concurrent misses for
+        the same product share one scrape (see ``singleflight``).
+
+        Args:
+            product_id: Supplier-specific product identifier
+            max_staleness: Max acceptable age of cached data in seconds
+                (None: anything within ``cache_ttl``, 0: always scrape)
+
+        Raises:
+            ProductNotFound: If product doesn't exist
+            ScrapingError: If scraping fails
+        """
+        cached = await self._get_cached(product_id, max_staleness)
+        if cached is not None:
+            return cached
+
+        async def scrape() -> Product:
+            product = await self._call(self.get_product, product_id)
+            await self._set_cached(product_id, product)
+            return product
+
+        return await self._coalesce(product_id, scrape, self._peek_cached(product_id))
+
+    async def fetch_product_if_changed(
+        self,
+        product_id: str,
+        previous: Optional[PageFingerprint] = None,
+        max_staleness: Optional[float] = None,
+    ) -> Tuple[Optional[Product], Optional[PageFingerprint]]:
+        """``fetch_product`` counterpart of ``get_product_if_changed``
+
+        A cache hit returns the cached product with no fingerprint. Callers
+        coalesce only with callers holding the same ``previous``, since
+        "unchanged" is relative to it. Products parsed from a streamed page
+        prefix are not cached, so ``fetch_product`` never serves them.
+
+        Returns:
+            (product, fingerprint); product is None when unchanged
+        """
+        cached = await self._get_cached(product_id, max_staleness)
+        if cached is not None:
+            return cached, None
+
+        async def scrape() -> Tuple[Optional[Product], Optional[PageFingerprint]]:
+            product, fingerprint = await self._call(
+                self.get_product_if_changed, product_id, previous
+            )
+            if product is not None and not self._streams_change_checks():
+                await self._set_cached(product_id, product)
+            return product, fingerprint
+
+        peek_product = self._peek_cached(product_id)
+
+        async def peek() -> Optional[Tuple[Product, None]]:
+            product = await peek_product()
+            return (product, None) if product is not None else None
+
+        key = f"{product_id}:{previous.digest if previous is not None else ''}"
+        return await self._coalesce(key, scrape, peek)
+
+    async def _call(self, fn, *args):
+        """Make one supplier request: circuit breaker, rate limit, then
+        adaptive concurrency limit
+
+        Raises:
+            CircuitOpen: If the supplier's circuit is open; no request is
+                made and no rate limit token is used
+        """
+        if self.circuit_breaker is None:
+            return await self._call_limited(fn, *args)
+        async with self.circuit_breaker.guard():
+            return await self._call_limited(fn, *args)
+
+    async def _call_limited(self, fn, *args):
+        # The proxy is picked here so its own bucket is charged along with
+        # the supplier's; _request then sends through it. Wait for the rate
+        # limit outside the slot: the limiter times the request itself, not
+        # the queueing in front of it
+        proxy = await get_healthy_proxy()
+        await self._throttle(proxy.url if proxy else None)
+        token = _call_proxy.set(proxy)
+        try:
+            async with self.concurrency_limiter.slot():
+                return await fn(*args)
+        finally:
+            _call_proxy.reset(token)
+
+    @property
+    def concurrency_limiter(self) -> AIMDLimiter:
+        """Adaptive in-flight limit shared by every caller of this scraper"""
+        if self._concurrency is None:
+            self._concurrency = AIMDLimiter(
+                self.supplier_name,
+                initial=settings.SCRAPER_INITIAL_CONCURRENCY,
+                max_limit=self.max_concurrency,
+                latency_target=settings.SCRAPER_LATENCY_TARGET_SECONDS,
+            )
+        return self._concurrency
+
+    async def _coalesce(self, key: str, scrape, peek):
+        """Run ``scrape`` through the single-flight group, if one is attached"""
+        if self.singleflight is None:
+            return await scrape()
+        return await self.singleflight.do(key, scrape, peek)
+
+    def _peek_cached(self, product_id: str):
+        """Cache read accepting only entries written after this call
+
+        Used while another process holds the single-flight lock: its scrape
+        is fresh enough whatever ``max_staleness`` the caller asked for.
+        """
+        started = time.time()
+
+        async def peek() -> Optional[Product]:
+            return await self._get_cached(product_id, time.time() - started)
+
+        return peek
+
+    def _streams_change_checks(self) -> bool:
+        """Whether ``get_product_if_changed`` reads only a page prefix, leaving
+        out fields such as the description"""
+        return False
+
+    async def _get_cached(
+        self, product_id: str, max_staleness: Optional[float]
+    ) -> Optional[Product]:
+        payload = await scrape_cache.get(self.supplier_name, product_id, max_staleness)
+        return Product.model_validate_json(payload) if payload is not None else None
+
+    async def _set_cached(self, product_id: str, product: Product) -> None:
+        await scrape_cache.set(
+            self.supplier_name, product_id, product.model_dump_json(), self.cache_ttl
+        )
+
+    async def get_product_if_changed(
+        self, product_id: str, previous: Optional[PageFingerprint] = None
+    ) -> Tuple[Optional[Product], Optional[PageFingerprint]]:
+        """Fetch a product unless its page is unchanged since ``previous``
+
+        Scrapers override this to compare fingerprints (or HTTP validators)
+        before parsing. The default fetches and parses the product and
+        fingerprints the result, so it only saves downstream work.
+
+        Args:
+            product_id: Supplier-specific product identifier
+            previous: Fingerprint returned by the last fetch, if any
+
+        Returns:
+            (product, fingerprint); product is None when unchanged
+        """
+        product = await self.get_product(product_id)
+        digest = hashlib.blake2b(product.model_dump_json().encode(), digest_size=16).hexdigest()
+        fingerprint = PageFingerprint(digest=digest)
+        if previous is not None and previous.digest == digest:
+            return None, fingerprint
+        return product, fingerprint
+
+    async def get_products(
+        self,
+        product_ids: Iterable[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        fingerprints: Optional[Dict[str, PageFingerprint]] = None,
+        max_staleness: Optional[float] = None,
+    ) -> AsyncIterator[ScrapeResult]:
+        """Fetch many products, yielding each result as soon as it completes
+
+        Requests in flight follow the scraper's adaptive limit (see
+        ``concurrency_limiter``) and are spaced to honor ``rate_limit``. A failing item yields a result carrying its
+        error instead of aborting the batch. Duplicate IDs are fetched once.
+
+        Args:
+            product_ids: Supplier-specific product identifiers
+            concurrency: Max fetches this batch runs at once, on top of the
+                adaptive limit (defaults to ``max_concurrency``)
+            deadline: Seconds allowed for the whole batch; items still pending
+                or not started when it expires yield a ScrapingError
+            fingerprints: Previous fingerprint per product ID; items whose
+                page is unchanged yield a result with ``unchanged`` set
+            max_staleness: Serve items from the scrape cache if they are at
+                most this many seconds old (see ``fetch_product``)
+
+        Yields:
+            ScrapeResult per unique product ID, in completion order
+        """
+        concurrency = concurrency or self.max_concurrency
+        fingerprints = fingerprints or {}
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline if deadline is not None else None
+        pending_ids = iter(dict.fromkeys(product_ids))
+        in_flight: Dict[asyncio.Task, str] = {}
+
+        def launch() -> None:
+            while len(in_flight) < concurrency:
+                product_id = next(pending_ids, None)
+                if product_id is None:
+                    return
+                task = asyncio.create_task(
+                    self._fetch_result(
+                        product_id, fingerprints.get(product_id), max_staleness
+                    )
+                )
+                in_flight[task] = product_id
+
+        try:
+            launch()
+            while in_flight:
+                timeout = None if expires_at is None else max(0.0, expires_at - loop.time())
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    del in_flight[task]
+                    yield task.result()
+                launch()
+
+            # Deadline expired: report everything that didn't make it
+            for task, product_id in list(in_flight.items()):
+                task.cancel()
+                yield ScrapeResult(
+                    product_id=product_id,
+                    error=ScrapingError(f"Deadline exceeded while scraping {product_id}"),
+                )
+            for product_id in pending_ids:
+                yield ScrapeResult(
+                    product_id=product_id,
+                    error=ScrapingError(f"Deadline exceeded before scraping {product_id}"),
+                )
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _fetch_result(
+        self,
+        product_id: str,
+        previous: Optional[PageFingerprint] = None,
+        max_staleness: Optional[float] = None,
+    ) -> ScrapeResult:
+        """Fetch one product for a batch, capturing any error in the result"""
+        try:
+            product, fingerprint = await self.fetch_product_if_changed(
+                product_id, previous, max_staleness
+            )
+            return ScrapeResult(product_id=product_id, product=product, fingerprint=fingerprint)
+        except Exception as e:
+            return ScrapeResult(product_id=product_id, error=e)
+
+    async def _request(
+        self,
+        url: str,
+        method: HttpMethod = "GET",
+        max_bytes: Optional[int] = None,
+        stop_markers: Iterable[bytes] = (),
+        **kwargs,
+    ):
+        """Request through the call's proxy (see _call_limited; direct if none) and report the outcome
+
+        With ``max_bytes`` the body is streamed and only its prefix is read
+        (see streaming.read_prefix); ``response.content`` holds that prefix.
+
+        Bodies are checked against ``block_markers`` before anyone parses
+        them, so captcha and error pages never turn into products.
+
+        Raises:
+            SupplierBlocked: On a block/throttle status code or block page
+                (CaptchaDetected for captcha/robot-check pages)
+            ProductNotFound: On a not-found page served with status 200
+            SupplierTimeout: If the request times out
+        """
+        if self.session_pool is None:
+            raise ScrapingError(f"{self.supplier_name} scraper has no session pool")
+        proxy = _call_proxy.get() or await get_healthy_proxy()
+        started = time.monotonic()
+        try:
+            async with self.session_pool.session(proxy.url if proxy else None) as session:
+                if max_bytes:
+                    response = await session.request(method, url, stream=True, **kwargs)
+                    response.content = await read_prefix(response, max_bytes, stop_markers)
+                else:
+                    response = await session.request(method, url, **kwargs)
+        except Exception as e:
+            if proxy:
+                get_proxy_manager().record_failure(proxy)
+            if isinstance(e, Timeout):
+                raise SupplierTimeout(f"Timed out fetching {url}: {e}") from e
+            raise
+
+        page = None
+        if self.block_markers and response.status_code == 200 and method != "HEAD":
+            page = classify_page(response.content, self.block_markers)
+        blocked = response.status_code in BLOCK_STATUS_CODES or page not in (None, NOT_FOUND)
+        if proxy:
+            if blocked:
+                get_proxy_manager().record_failure(proxy, blocked=True)
+            else:
+                get_proxy_manager().record_success(proxy, time.monotonic() - started)
+        if page is not None:
+            raise_for_page(page, self.supplier_name, url)
+        if blocked:
+            raise SupplierBlocked(f"{self.supplier_name} returned {response.status_code} for {url}")
+        return response
+
+    def set_rate_limit(self, rate_limit: int) -> None:
+        """Override the class-level ``rate_limit`` (e.g. from Supplier.rate_limit)"""
+        if rate_limit != self.rate_limit:
+            self.rate_limit = rate_limit
+            self._rate_limiter = None
+
+    async def _throttle(self, proxy: Optional[str] = None) -> None:
+        """Wait for a slot in the fleet-wide rate limit for this supplier,
+        and in the per-proxy one when the request goes through ``proxy``"""
+        if not self.rate_limit:
+            return
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter(
+                self.supplier_name, self.rate_limit, proxy_rate_limit=self.proxy_rate_limit or None
+            )
+        await self._rate_limiter.acquire(proxy)
+
+    async def probe(self) -> None:
+        """Cheap reachability check of the supplier, raising on failure
+
+        Must not fetch or parse a product page and must not use the rate
+        limit. Scrapers override this (e.g. a HEAD request through the
+        session pool); the default has nothing to check.
+        """
+        return None
+
     async def health_check(self) -> bool:
         """Check if scraper is working (can reach supplier)
 
         Returns:
             True if healthy, False otherwise
         """
+        status = await self.health_status()
+        return status["healthy"]
+
+    async def health_status(self) -> Dict[str, Any]:
+        """Result of the last ``probe``, re-probed at most every ``health_ttl``
+
+        The result is shared through Redis, so the API and every worker
+        together probe a supplier once per TTL.
+
+        Returns:
+            {"healthy", "latency_ms", "checked_at", "error"}
+        """
+        key = f"health:{self.supplier_name}"
         try:
-            # Try to fetch one simple page
-            await self.get_product("B000000000")  # Dummy ID
-            return True
-        except:
-            return False
+            redis = await get_redis_client()
+            cached = await redis.get(key)
+        except Exception:
+            redis, cached = None, None
+        if cached is not None:
+            return json.loads(cached)
+
+        async def run_probe() -> Dict[str, Any]:
+            started = time.monotonic()
+            try:
+                await self.probe()
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            status = {
+                "healthy": error is None,
+                "latency_ms": round((time.monotonic() - started) * 1000),
+                "checked_at": time.time(),
+                "error": error,
+            }
+            if redis is not None:
+                try:
+                    await redis.set(key, json.dumps(status), ex=self.health_ttl)
+                except Exception:
+                    pass
+            return status
+
+        if self.singleflight is None:
+            return await run_probe()
+        return await self.singleflight.do("health", run_probe)
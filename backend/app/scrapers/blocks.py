@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, Optional
+from ..core.exceptions import CaptchaDetected, ProductNotFound, SupplierBlocked
+
+# Kinds of non-product pages a supplier serves instead of the real one
+CAPTCHA = "captcha"
+ROBOT_CHECK = "robot_check"
+DOG_PAGE = "dog_page"  # Amazon's "Sorry! Something went wrong" error page
+NOT_FOUND = "not_found"
+
+# Interstitials are small and put their tell-tale markup near the top, so
+# only the start of the body is scanned
+SCAN_BYTES = 32 * 1024
+
+BlockMarkers = Dict[str, Iterable[bytes]]
+
+
+def classify_page(body: bytes, markers: BlockMarkers, scan_bytes: int = SCAN_BYTES) -> Optional[str]:
+    """Recognize a block/error page from raw bytes, without parsing
+
+    Args:
+        body: Raw response body (or a prefix of it)
+        markers: Byte strings per page kind, checked in order
+        scan_bytes: How much of the body to scan
+
+    Returns:
+        The page kind, or None for a regular page
+    """
+    head = body[:scan_bytes]
+    for kind, needles in markers.items():
+        for needle in needles:
+            if needle in head:
+                return kind
+    return None
+
+
+def raise_for_page(kind: str, supplier: str, url: str) -> None:
+    """Raise the typed exception for a classified page"""
+    if kind == NOT_FOUND:
+        raise ProductNotFound(f"{supplier} served a not-found page for {url}")
+    if kind in (CAPTCHA, ROBOT_CHECK):
+        raise CaptchaDetected(f"{supplier} served a {kind} page for {url}")
+    raise SupplierBlocked(f"{supplier} served a {kind} page for {url}")
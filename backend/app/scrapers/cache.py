@@ -0,0 +1,79 @@
+import time
+from collections import Counter
+from typing import Dict, Optional
+from ..core.redis import get_redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCache:
+    """Shared cache of scraped products in Redis, keyed by (supplier, product id)
+
+    Each entry is a hash holding the serialized product and the time it was
+    scraped, so callers can ask for data no older than ``max_staleness``
+    even when the supplier's TTL is longer. Redis errors count as misses:
+    the cache never makes a scrape fail.
+
+    Values are product JSON strings; (de)serialization is left to the
+    scraper so this module stays independent of the Product model.
+    """
+
+    def __init__(self, prefix: str = "scrape"):
+        self.prefix = prefix
+        self.hits: Counter = Counter()  # per supplier, this process
+        self.misses: Counter = Counter()
+
+    def _key(self, supplier: str, product_id: str) -> str:
+        return f"{self.prefix}:{supplier}:{product_id}"
+
+    async def get(
+        self, supplier: str, product_id: str, max_staleness: Optional[float] = None
+    ) -> Optional[str]:
+        """Return the cached product JSON, or None on miss or if too stale
+
+        Args:
+            supplier: Supplier name
+            product_id: Supplier-specific product identifier
+            max_staleness: Max acceptable age in seconds (None: any age within TTL)
+        """
+        if max_staleness is not None and max_staleness <= 0:
+            self.misses[supplier] += 1
+            return None
+        try:
+            redis = await get_redis_client()
+            scraped_at, payload = await redis.hmget(
+                self._key(supplier, product_id), ["scraped_at", "product"]
+            )
+        except Exception as e:
+            logger.warning(f"Scrape cache unavailable for {supplier}: {e}")
+            self.misses[supplier] += 1
+            return None
+
+        if payload is None or scraped_at is None or (
+            max_staleness is not None and time.time() - float(scraped_at) > max_staleness
+        ):
+            self.misses[supplier] += 1
+            return None
+        self.hits[supplier] += 1
+        return str(payload)  # the client decodes responses
+
+    async def set(self, supplier: str, product_id: str, payload: str, ttl: int) -> None:
+        """Store product JSON for ``ttl`` seconds"""
+        key = self._key(supplier, product_id)
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={"scraped_at": time.time(), "product": payload})
+                pipe.expire(key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Scrape cache unavailable for {supplier}: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per supplier for this process"""
+        suppliers = set(self.hits) | set(self.misses)
+        return {s: {"hits": self.hits[s], "misses": self.misses[s]} for s in suppliers}
+
+
+scrape_cache = ScrapeCache()
@@ -0,0 +1,236 @@
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional, Tuple
+from redis.commands.core import AsyncScript
+from ..config import settings
+from ..core.exceptions import CircuitOpen, ProductNotFound, SupplierBlocked
+from ..core.redis import get_redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Open the circuit unless another worker already did. Returns the
+# resulting {open_until, strikes}, so concurrent trips back off once.
+TRIP_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local base = tonumber(ARGV[2])
+local max_backoff = tonumber(ARGV[3])
+local jitter = tonumber(ARGV[4])
+local reopen = ARGV[5] == '1'
+
+local state = redis.call('HMGET', key, 'open_until', 'strikes')
+local open_until = tonumber(state[1]) or 0
+local strikes = tonumber(state[2]) or 0
+if open_until > now and not reopen then
+    return {tostring(open_until), strikes}
+end
+
+strikes = strikes + 1
+local backoff = math.min(max_backoff, base * 2 ^ (strikes - 1))
+open_until = now + backoff * (0.5 + 0.5 * jitter)
+redis.call('HSET', key, 'open_until', tostring(open_until), 'strikes', strikes)
+redis.call('EXPIRE', key, math.ceil(max_backoff * 4))
+return {tostring(open_until), strikes}
+"""
+
+
+class CircuitBreaker:
+    """Fleet-wide circuit breaker for one supplier
+
+    Closed: requests flow and outcomes are counted over a sliding window.
+    The circuit opens when the error rate crosses ``error_rate`` (with at
+    least ``min_calls`` outcomes) or ``block_threshold`` block/captcha
+    responses are seen. Open: requests fail fast with ``CircuitOpen`` for an
+    exponentially growing, jittered backoff. Half-open: once the backoff
+    expires a single probe request is let through fleet-wide; success closes
+    the circuit, failure re-opens it with a longer backoff.
+
+    Open state and strike count live in Redis (``breaker:{supplier}``) so
+    every worker backs off together; the error window is per process.
+    Without Redis the breaker keeps working on local state only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 60.0,
+        min_calls: int = settings.SCRAPER_BREAKER_MIN_CALLS,
+        error_rate: float = settings.SCRAPER_BREAKER_ERROR_RATE,
+        block_threshold: int = settings.SCRAPER_BREAKER_BLOCK_THRESHOLD,
+        backoff: float = settings.SCRAPER_BREAKER_BACKOFF_SECONDS,
+        max_backoff: float = settings.SCRAPER_BREAKER_MAX_BACKOFF_SECONDS,
+        sync_interval: float = 1.0,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.block_threshold = block_threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sync_interval = sync_interval
+
+        self._key = f"breaker:{name}"
+        self._events: Deque[Tuple[float, bool, bool]] = deque()  # (time, failed, blocked)
+        self._open_until = 0.0  # wall clock; 0 means closed
+        self._strikes = 0
+        self._synced_at = float("-inf")
+        self._probing = False
+        self._trip: Optional[AsyncScript] = None
+
+    @property
+    def state(self) -> str:
+        if not self._open_until:
+            return CLOSED
+        return OPEN if time.time() < self._open_until else HALF_OPEN
+
+    def snapshot(self) -> dict:
+        """Last known state, without touching Redis"""
+        return {
+            "state": self.state,
+            "strikes": self._strikes,
+            "retry_in": max(0.0, round(self._open_until - time.time(), 1)) if self._open_until else 0.0,
+        }
+
+    @asynccontextmanager
+    async def guard(self):
+        """Wrap one supplier request
+
+        Raises:
+            CircuitOpen: If the circuit is open (or half-open with a probe
+                already in flight)
+        """
+        probe = await self._admit()
+        try:
+            yield
+        except ProductNotFound:
+            await self._on_success(probe)  # the supplier answered
+            raise
+        except SupplierBlocked:
+            await self._on_failure(probe, blocked=True)
+            raise
+        except Exception:
+            await self._on_failure(probe)
+            raise
+        except BaseException:
+            if probe:
+                await self._end_probe()
+            raise
+        else:
+            await self._on_success(probe)
+
+    async def _admit(self) -> bool:
+        """Let a request through or raise; returns True for a half-open probe"""
+        await self._sync()
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True  # claim before awaiting so one probe per process
+            try:
+                redis = await get_redis_client()
+                acquired = await redis.set(f"{self._key}:probe", 1, nx=True, px=int(self.backoff * 1000))
+            except Exception:
+                acquired = True  # no shared state: probe locally
+            if acquired:
+                logger.info(f"Circuit for {self.name} half-open, sending a probe.")
+                return True
+            self._probing = False
+        raise CircuitOpen(
+            f"Circuit open for {self.name}, retry in {max(0.0, self._open_until - time.time()):.0f}s"
+        )
+
+    async def _on_success(self, probe: bool) -> None:
+        if probe:
+            await self._close()
+        else:
+            self._record(failed=False, blocked=False)
+
+    async def _on_failure(self, probe: bool, blocked: bool = False) -> None:
+        if probe:
+            await self._open(reopen=True)
+            await self._end_probe()
+            return
+        self._record(failed=True, blocked=blocked)
+        if self.state == CLOSED and self._should_trip():
+            await self._open(reopen=False)
+
+    def _record(self, failed: bool, blocked: bool) -> None:
+        now = time.monotonic()
+        self._events.append((now, failed, blocked))
+        while self._events and self._events[0][0] < now - self.window:
+            self._events.popleft()
+
+    def _should_trip(self) -> bool:
+        calls = len(self._events)
+        failures = sum(1 for _, failed, _ in self._events if failed)
+        blocks = sum(1 for _, _, blocked in self._events if blocked)
+        return blocks >= self.block_threshold or (
+            calls >= self.min_calls and failures / calls >= self.error_rate
+        )
+
+    async def _open(self, reopen: bool) -> None:
+        now = time.time()
+        jitter = random.random()
+        try:
+            redis = await get_redis_client()
+            if self._trip is None:
+                self._trip = redis.register_script(TRIP_LUA)
+            open_until, strikes = await self._trip(
+                keys=[self._key],
+                args=[now, self.backoff, self.max_backoff, jitter, int(reopen)],
+            )
+            self._open_until, self._strikes = float(open_until), int(strikes)
+        except Exception as e:
+            logger.warning(f"Shared circuit state for {self.name} unavailable: {e}")
+            self._strikes += 1
+            backoff = min(self.max_backoff, self.backoff * 2 ** (self._strikes - 1))
+            self._open_until = now + backoff * (0.5 + 0.5 * jitter)
+        self._events.clear()
+        self._synced_at = time.monotonic()
+        logger.warning(
+            f"Circuit for {self.name} opened for {self._open_until - now:.1f}s (strike {self._strikes})."
+        )
+
+    async def _close(self) -> None:
+        try:
+            redis = await get_redis_client()
+            await redis.delete(self._key, f"{self._key}:probe")
+        except Exception as e:
+            logger.warning(f"Shared circuit state for {self.name} unavailable: {e}")
+        self._open_until = 0.0
+        self._strikes = 0
+        self._probing = False
+        self._events.clear()
+        self._synced_at = time.monotonic()
+        logger.info(f"Circuit for {self.name} closed.")
+
+    async def _end_probe(self) -> None:
+        self._probing = False
+        try:
+            redis = await get_redis_client()
+            await redis.delete(f"{self._key}:probe")
+        except Exception:
+            pass  # the probe lock expires on its own
+
+    async def _sync(self) -> None:
+        """Refresh the shared open state from Redis, at most every ``sync_interval``"""
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        try:
+            redis = await get_redis_client()
+            open_until, strikes = await redis.hmget(self._key, ["open_until", "strikes"])
+        except Exception as e:
+            logger.warning(f"Shared circuit state for {self.name} unavailable: {e}")
+            return
+        self._open_until = float(open_until) if open_until else 0.0
+        self._strikes = int(strikes) if strikes else 0
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List
+from ..core.exceptions import SupplierBlocked, SupplierTimeout
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Outcomes that mean the supplier or proxies are overloaded
+OVERLOAD_ERRORS = (SupplierBlocked, SupplierTimeout, asyncio.TimeoutError)
+
+
+class AIMDLimiter:
+    """Adaptive in-flight limit for requests to one supplier
+
+    Additive increase, multiplicative decrease (as in TCP congestion
+    control): after every ``limit`` completed requests the limit grows by
+    one if p95 latency stayed under ``latency_target``, the error rate
+    under ``max_error_rate`` and the limit was actually reached. A timeout
+    or block response cuts it by ``backoff`` straight away, at most once
+    per window so a burst of failures from in-flight requests counts once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_target: float = 3.0,
+        max_error_rate: float = 0.1,
+        backoff: float = 0.5,
+    ):
+        self.name = name
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._saturated = False
+        self._cut_in_window = False
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one in-flight slot for the duration of a request"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+            if self.in_flight >= self.limit:
+                self._saturated = True
+
+        started = time.monotonic()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._record(time.monotonic() - started, error)
+                self._cond.notify_all()
+
+    def _record(self, latency: float, error) -> None:
+        if isinstance(error, OVERLOAD_ERRORS):
+            if not self._cut_in_window:
+                self._set_limit(int(self.limit * self.backoff), reason=type(error).__name__)
+                self._cut_in_window = True
+            self._errors += 1
+        elif error is not None:
+            self._errors += 1
+        self._latencies.append(latency)
+
+        if len(self._latencies) < self.limit:
+            return
+        samples = sorted(self._latencies)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        error_rate = self._errors / len(samples)
+        if (
+            not self._cut_in_window
+            and self._saturated
+            and p95 <= self.latency_target
+            and error_rate <= self.max_error_rate
+        ):
+            self._set_limit(self.limit + 1, reason="healthy")
+        self._latencies.clear()
+        self._errors = 0
+        self._saturated = False
+        self._cut_in_window = False
+
+    def _set_limit(self, limit: int, reason: str) -> None:
+        limit = max(self.min_limit, min(limit, self.max_limit))
+        if limit != self.limit:
+            logger.info(f"Concurrency limit for {self.name}: {self.limit} -> {limit} ({reason}).")
+            self.limit = limit
+
+    def snapshot(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight}
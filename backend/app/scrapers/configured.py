@@ -0,0 +1,99 @@
+from typing import Any, Dict, List, Optional
+from .base import BaseScraper, Product
+from .session_pool import SessionPool
+from .parsing import get_parser_pool
+from .extraction import extract_product_html, get_plan
+from ..core.exceptions import ProductNotFound, ScrapingError
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ConfiguredScraper(BaseScraper):
+    """Scraper for a supplier onboarded purely through Supplier.scraper_config
+
+    Product pages are fetched from ``product_url`` and fields are pulled out
+    with the config's compiled extraction plan (see extraction.py).
+    """
+
+    parser_backend = "lxml"
+    extraction_config: Dict[str, Any]
+    session_pool: SessionPool
+
+    def __init__(
+        self,
+        supplier_name: str,
+        base_url: str,
+        config: Dict[str, Any],
+        rate_limit: Optional[int] = None,
+        requires_js: bool = False,
+    ):
+        plan = get_plan(config)  # validate the spec up front
+        if not plan.spec.product_url:
+            raise ValueError(f"scraper_config for {supplier_name} has no product_url")
+        self.supplier_name = supplier_name
+        self.base_url = base_url.rstrip("/") if base_url else ""
+        self.extraction_config = config
+        self.product_url = plan.spec.product_url
+        self.requires_js = requires_js
+        if rate_limit:
+            self.rate_limit = rate_limit
+        self.session_pool = SessionPool(
+            impersonate=config.get("impersonate", "chrome120"),
+            max_sessions=settings.SCRAPER_MAX_SESSIONS,
+            max_clients=settings.SCRAPER_MAX_CLIENTS_PER_SESSION,
+        )
+
+    @classmethod
+    def from_supplier(cls, supplier) -> "ConfiguredScraper":
+        return cls(
+            supplier.name,
+            supplier.base_url,
+            supplier.scraper_config,
+            rate_limit=supplier.rate_limit,
+            requires_js=supplier.requires_js,
+        )
+
+    async def open(self) -> None:
+        await self.session_pool.open(warmup_url=self.base_url or None)
+
+    async def probe(self) -> None:
+        """HEAD the supplier's base URL through the session pool"""
+        if not self.base_url:
+            return
+        response = await self._request(self.base_url, method="HEAD", timeout=5)
+        if response.status_code >= 400:
+            raise ScrapingError(f"{self.supplier_name} returned {response.status_code}")
+
+    async def get_product(self, product_id: str) -> Product:
+        """Fetch a product page and apply the extraction plan"""
+        url = self.product_url.format(base_url=self.base_url, id=product_id)
+        try:
+            response = await self._request(url, headers=self.extraction_config.get("headers"), timeout=10)
+
+            if response.status_code == 404:
+                raise ProductNotFound(f"{product_id} not found on {self.supplier_name}")
+            if response.status_code != 200:
+                raise ScrapingError(f"Failed to fetch {product_id}: {response.status_code}")
+
+            product = await get_parser_pool().run(
+                extract_product_html,
+                response.content,
+                product_id,
+                url,
+                self.parser_backend,
+                self.extraction_config,
+            )
+
+            logger.info(f"Scraped {self.supplier_name} product {product_id}.")
+            return product
+
+        except Exception as e:
+            logger.error(f"Scraping {self.supplier_name} product {product_id} failed: {e}")
+            if isinstance(e, ScrapingError):
+                raise
+            raise ScrapingError(f"Failed to scrape {product_id}: {str(e)}")
+
+    async def search(self, query: str, limit: int = 10) -> List[Product]:
+        """Search isn't part of the extraction spec yet"""
+        raise ScrapingError(f"Search is not configured for {self.supplier_name}")
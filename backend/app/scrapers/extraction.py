@@ -0,0 +1,268 @@
+import json
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+from pydantic import BaseModel, field_validator
+from .base import Product
+from .parsing import make_soup
+from ..core.exceptions import ScrapingError
+
+# Extraction specs come from Supplier.scraper_config, e.g.
+#
+#     {
+#         "product_url": "{base_url}/item/{id}",
+#         "fields": {
+#             "title": {"selector": "h1.product-name"},
+#             "price": {"selector": "[itemprop=price]", "attr": "content", "convert": "price"},
+#             "rating": {"selector": ".stars", "regex": "([\\d.]+) of 5", "convert": "float"},
+#             "images": {"selector": ".gallery img", "attr": "src", "many": true, "limit": 10}
+#         }
+#     }
+#
+# Each spec is compiled once (CSS via soupsieve, regexes via re) into an
+# ExtractionPlan that pulls every field out of a document in one pass.
+
+
+def _to_number(text: str) -> Optional[str]:
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", text)
+    return match.group(0).replace(",", "") if match else None
+
+
+def _to_decimal(text: str) -> Decimal:
+    # The first number, so a range like "$12.99 - $24.99" reads as its low end
+    number = _to_number(text)
+    if number is None:
+        raise ValueError(f"Not a price: {text!r}")
+    return Decimal(number)
+
+
+def _to_int(text: str) -> Optional[int]:
+    number = _to_number(text)
+    return int(float(number)) if number else None
+
+
+def _to_float(text: str) -> Optional[float]:
+    number = _to_number(text)
+    return float(number) if number else None
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "text": lambda s: s,
+    "price": _to_decimal,
+    "int": _to_int,
+    "float": _to_float,
+}
+
+
+class FieldSpec(BaseModel):
+    """How to extract one Product field"""
+    selector: str
+    attr: Optional[str] = None  # read this attribute instead of the text
+    regex: Optional[str] = None  # keep group 1 (or the whole match)
+    convert: str = "text"
+    many: bool = False  # collect every match into a list
+    limit: Optional[int] = None  # stop collecting after this many (many=True)
+    default: Any = None  # used when nothing matches
+
+    @field_validator("convert")
+    @classmethod
+    def _known_converter(cls, value: str) -> str:
+        if value not in CONVERTERS:
+            raise ValueError(f"Unknown converter {value!r}, expected one of {sorted(CONVERTERS)}")
+        return value
+
+
+class ExtractionSpec(BaseModel):
+    """The extraction part of Supplier.scraper_config"""
+    product_url: Optional[str] = None  # "{base_url}/dp/{id}"
+    fields: Dict[str, FieldSpec]
+
+    @field_validator("fields")
+    @classmethod
+    def _product_fields(cls, fields: Dict[str, FieldSpec]) -> Dict[str, FieldSpec]:
+        unknown = set(fields) - set(Product.model_fields)
+        if unknown:
+            raise ValueError(f"Not Product fields: {sorted(unknown)}")
+        return fields
+
+
+def _split_top_level(text: str, separators: str) -> List[str]:
+    """Split on ``separators`` outside [...] and (...)"""
+    parts: List[str] = []
+    current: List[str] = []
+    depth = 0
+    for ch in text:
+        if ch in "[(":
+            depth += 1
+        elif ch in "])":
+            depth -= 1
+        if depth == 0 and ch in separators:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _index_keys(selector: str) -> Optional[List[Tuple[str, str]]]:
+    """Cheap (kind, value) keys an element must have to possibly match
+
+    One key per comma-separated alternative, taken from its rightmost
+    compound selector: the id, else a class, else the tag name. None if
+    some alternative has no such key (e.g. ``[data-x]`` or ``*``).
+    """
+    keys = []
+    for alternative in _split_top_level(selector, ","):
+        compound = _split_top_level(alternative, " >+~")[-1]
+        compound = re.sub(r"\[[^\]]*\]|:[\w-]+(\([^)]*\))?", "", compound)
+        ids = re.findall(r"#([\w-]+)", compound)
+        classes = re.findall(r"\.([\w-]+)", compound)
+        tag = re.match(r"[a-zA-Z][\w-]*", compound)
+        if ids:
+            key = ("id", ids[0])
+        elif classes:
+            key = ("class", classes[0])
+        elif tag:
+            key = ("tag", tag.group(0).lower())
+        else:
+            return None
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+class _CompiledField:
+    __slots__ = ("name", "spec", "selector", "regex", "convert")
+
+    def __init__(self, name: str, spec: FieldSpec):
+        self.name = name
+        self.spec = spec
+        self.selector = soupsieve.compile(spec.selector)
+        self.regex = re.compile(spec.regex, re.S) if spec.regex else None
+        self.convert = CONVERTERS[spec.convert]
+
+    def read(self, element: Tag) -> Any:
+        if self.spec.attr:
+            raw = element.get(self.spec.attr)
+            if isinstance(raw, list):  # multi-valued attributes like class
+                raw = " ".join(raw)
+        else:
+            raw = element.get_text(" ", strip=True)
+        if not raw:
+            return None
+        if self.regex is not None:
+            match = self.regex.search(raw)
+            if match is None:
+                return None
+            raw = match.group(1) if match.groups() else match.group(0)
+        return self.convert(raw.strip())
+
+
+class ExtractionPlan:
+    """Compiled extraction spec, reusable across pages
+
+    Fields are indexed by the id, class or tag their selector needs on the
+    matched element, so the single walk over the document only runs the
+    full selector match on plausible candidates.
+    """
+
+    def __init__(self, spec: ExtractionSpec):
+        self.spec = spec
+        self._fields = [_CompiledField(name, f) for name, f in spec.fields.items()]
+        self._index: Dict[Tuple[str, str], List[_CompiledField]] = {}
+        self._unindexed: List[_CompiledField] = []
+        for field in self._fields:
+            keys = _index_keys(field.spec.selector)
+            if keys is None:
+                self._unindexed.append(field)
+            for key in keys or ():
+                self._index.setdefault(key, []).append(field)
+
+    def _candidates(self, element: Tag) -> List[_CompiledField]:
+        index = self._index
+        candidates = list(self._unindexed)
+        candidates += index.get(("tag", element.name), ())
+        element_id = element.get("id")
+        if element_id and isinstance(element_id, str):
+            candidates += index.get(("id", element_id), ())
+        for cls in element.get("class") or ():
+            candidates += index.get(("class", cls), ())
+        return candidates
+
+    def extract(self, soup: Union[BeautifulSoup, Tag]) -> Dict[str, Any]:
+        """Extract every field in one walk over the document
+
+        Single-valued fields keep their first match in document order. The
+        walk stops as soon as every field is complete (a ``many`` field is
+        complete once it reaches its ``limit``).
+        """
+        values: Dict[str, Any] = {}
+        lists: Dict[str, List[Any]] = {f.name: [] for f in self._fields if f.spec.many}
+        done: Set[str] = set()
+
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+            for field in self._candidates(element):
+                if field.name in done or not field.selector.match(element):
+                    continue
+                value = field.read(element)
+                if value is None:
+                    continue
+                if not field.spec.many:
+                    values[field.name] = value
+                    done.add(field.name)
+                elif value not in lists[field.name]:
+                    lists[field.name].append(value)
+                    if field.spec.limit and len(lists[field.name]) >= field.spec.limit:
+                        done.add(field.name)
+                if len(done) == len(self._fields):
+                    break
+            if len(done) == len(self._fields):
+                break
+
+        for field in self._fields:
+            if field.spec.many:
+                values[field.name] = lists[field.name] or (field.spec.default or [])
+            elif field.name not in values and field.spec.default is not None:
+                default = field.spec.default
+                values[field.name] = field.convert(default) if isinstance(default, str) else default
+        return values
+
+    def extract_product(self, soup: Union[BeautifulSoup, Tag], product_id: str, url: str) -> Product:
+        """Extract a Product, raising ScrapingError if required fields are missing"""
+        values = self.extract(soup)
+        values.setdefault("rating", None)  # optional, but without a model default
+        values.setdefault("reviews_count", None)
+        missing = [
+            name for name, field in Product.model_fields.items()
+            if field.is_required() and name not in values and name not in ("asin", "url")
+        ]
+        if missing:
+            raise ScrapingError(f"No match for {', '.join(missing)} on {url}")
+        return Product(asin=product_id, url=url, **values)
+
+
+@lru_cache(maxsize=64)
+def _compile(config_json: str) -> ExtractionPlan:
+    return ExtractionPlan(ExtractionSpec.model_validate_json(config_json))
+
+
+def get_plan(config: Dict[str, Any]) -> ExtractionPlan:
+    """Compiled plan for a scraper_config, compiled once per process
+
+    Raises:
+        pydantic.ValidationError: If the config is not a valid spec
+    """
+    return _compile(json.dumps(config, sort_keys=True, default=str))
+
+
+def extract_product_html(
+    html: bytes, product_id: str, url: str, backend: str, config: Dict[str, Any]
+) -> Product:
+    """Parse a product page and apply the config's plan (parser pool entry point)"""
+    return get_plan(config).extract_product(make_soup(html, backend), product_id, url)
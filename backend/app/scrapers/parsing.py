@@ -0,0 +1,93 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar, Union
+from bs4 import BeautifulSoup, FeatureNotFound
+from ..config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# BeautifulSoup tree builders, fastest first. lxml is a C parser and is
+# several times faster than the pure-Python html.parser on large pages.
+PARSER_BACKENDS = ("lxml", "html.parser", "html5lib")
+DEFAULT_BACKEND = "html.parser"
+
+
+def make_soup(html: Union[str, bytes], backend: str = DEFAULT_BACKEND) -> BeautifulSoup:
+    """Build a BeautifulSoup tree with the requested backend
+
+    Falls back to the stdlib ``html.parser`` when the backend's library is
+    not installed, so a missing optional dependency never breaks scraping.
+    """
+    try:
+        return BeautifulSoup(html, backend)
+    except FeatureNotFound:
+        logger.warning(f"Parser backend {backend} unavailable, falling back to {DEFAULT_BACKEND}.")
+        return BeautifulSoup(html, DEFAULT_BACKEND)
+
+
+class ParserPool:
+    """Executor that runs HTML parsing off the event loop
+
+    ``thread`` keeps the loop responsive while a page is parsed; ``process``
+    additionally parses pages in parallel across cores. With ``process``,
+    the callable and its arguments must be picklable (module-level functions
+    or classmethods, plain str/bytes arguments).
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown parser pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: forking a process that runs an event loop and curl threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="parser"
+                )
+            logger.info(f"Started {self.kind} parser pool with {self.max_workers} workers.")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_parser_pool: Optional[ParserPool] = None
+
+
+def get_parser_pool() -> ParserPool:
+    """Process-wide parser pool configured from settings"""
+    global _parser_pool
+    if _parser_pool is None:
+        _parser_pool = ParserPool(
+            kind=settings.SCRAPER_PARSER_EXECUTOR,
+            max_workers=settings.SCRAPER_PARSER_WORKERS,
+        )
+    return _parser_pool
+
+
+def shutdown_parser_pool() -> None:
+    global _parser_pool
+    if _parser_pool is not None:
+        _parser_pool.shutdown()
+        _parser_pool = None
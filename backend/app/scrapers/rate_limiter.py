@@ -0,0 +1,117 @@
+import asyncio
+import random
+from typing import Dict, Optional
+from redis.commands.core import AsyncScript
+from ..config import settings
+from ..core.redis import get_redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Token bucket stored as a Redis hash {tokens, ts}. Uses the Redis server
+# clock so every worker agrees on elapsed time. Returns 0 when a token was
+# taken, otherwise the milliseconds to wait until one is available.
+TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', key, math.ceil(capacity * 1000 / rate) * 2)
+return wait
+"""
+
+
+class RateLimiter:
+    """Fleet-wide token bucket for one supplier, shared through Redis
+
+    Every worker process acquiring from the same supplier draws on the same
+    bucket, so the combined request rate stays just under ``rate_limit``
+    (scaled by ``SCRAPER_RATE_LIMIT_HEADROOM``). An optional per-proxy bucket
+    additionally caps how hard any single exit IP is used.
+
+    If Redis is unreachable the limiter falls back to spacing requests
+    locally at ``1 / SCRAPER_FLEET_SIZE`` of the rate, so the fleet as a
+    whole stays within the limit.
+    """
+
+    def __init__(
+        self,
+        supplier_name: str,
+        rate_limit: int,
+        burst: Optional[int] = None,
+        proxy_rate_limit: Optional[int] = None,
+    ):
+        """
+        Args:
+            supplier_name: Bucket key, e.g. "amazon"
+            rate_limit: Requests per minute for the whole fleet
+            burst: Bucket capacity (defaults to one second of traffic, min 1)
+            proxy_rate_limit: Requests per minute per proxy, None to disable
+        """
+        self.supplier_name = supplier_name
+        self.rate_limit = rate_limit
+        self.proxy_rate_limit = proxy_rate_limit
+        self.burst = burst or max(1, rate_limit // 60)
+        self._script: Optional[AsyncScript] = None
+        self._next_local_slot: Dict[str, float] = {}
+
+    async def acquire(self, proxy: Optional[str] = None) -> None:
+        """Wait until a request to the supplier (through ``proxy``) is allowed"""
+        await self._acquire_bucket(f"ratelimit:{self.supplier_name}", self.rate_limit, self.burst)
+        if proxy and self.proxy_rate_limit:
+            await self._acquire_bucket(
+                f"ratelimit:{self.supplier_name}:{proxy}",
+                self.proxy_rate_limit,
+                max(1, self.proxy_rate_limit // 60),
+            )
+
+    async def _acquire_bucket(self, key: str, rate_limit: int, capacity: int) -> None:
+        """Take one token from ``key``, sleeping for as long as Redis asks"""
+        rate = rate_limit * settings.SCRAPER_RATE_LIMIT_HEADROOM / 60  # tokens per second
+        while True:
+            try:
+                wait_ms = await self._take(key, rate, capacity)
+            except Exception as e:
+                logger.warning(f"Rate limiter bucket {key} unavailable, spacing requests locally: {e}")
+                await self._wait_local(key, rate / max(1, settings.SCRAPER_FLEET_SIZE))
+                return
+            if wait_ms <= 0:
+                return
+            # Jitter so waiting workers don't all retry on the same tick
+            await asyncio.sleep(wait_ms / 1000 * (1 + random.random() * 0.1))
+
+    async def _take(self, key: str, rate: float, capacity: int) -> int:
+        if self._script is None:
+            redis = await get_redis_client()
+            self._script = redis.register_script(TOKEN_BUCKET_LUA)
+        return int(await self._script(keys=[key], args=[rate, capacity]))
+
+    async def _wait_local(self, key: str, rate: float) -> None:
+        """Space requests within this process when Redis is unavailable"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_local_slot.get(key, 0.0))
+        self._next_local_slot[key] = slot + 1 / rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
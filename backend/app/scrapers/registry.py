@@ -1,6 +1,13 @@
-from typing import Dict, Optional
+import asyncio
+from typing import Any, Dict, Optional
 from .base import BaseScraper
+from .cache import scrape_cache
 from .amazon import AmazonScraper
+from .configured import ConfiguredScraper
+from .parsing import shutdown_parser_pool
+from .singleflight import SingleFlight
+from .circuit_breaker import CircuitBreaker
+from ..config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,10 +19,21 @@ class ScraperRegistry:
 
     @classmethod
     def register(cls, scraper: BaseScraper):
-        """Register a scraper"""
+        """Register a scraper
+
+        Every registered scraper gets a single-flight group, so concurrent
+        fetches of the same product through the registry share one scrape,
+        and a circuit breaker shared by all workers.
+        """
         name = scraper.supplier_name
+        if scraper.singleflight is None:
+            scraper.singleflight = SingleFlight(
+                name, lock_ttl=settings.SCRAPER_SINGLEFLIGHT_LOCK_SECONDS or None
+            )
+        if scraper.circuit_breaker is None:
+            scraper.circuit_breaker = CircuitBreaker(name)
         cls._scrapers[name] = scraper
-        logger.info("scraper_registered", supplier=name)
+        logger.info(f"Registered scraper for {name}.")
 
     @classmethod
     def get(cls, supplier_name: str) -> BaseScraper:
@@ -24,6 +42,68 @@ class ScraperRegistry:
             raise ValueError(f"Unknown scraper: {supplier_name}")
         return cls._scrapers[supplier_name]
 
+    @classmethod
+    def configure_from_supplier(cls, supplier) -> BaseScraper:
+        """Apply a Supplier row's settings to its scraper
+
+        A supplier without a built-in scraper whose ``scraper_config`` has
+        extraction ``fields`` gets a ConfiguredScraper. For built-in
+        scrapers, configured ``fields`` replace the default extraction spec.
+        """
+        config = supplier.scraper_config or {}
+        if supplier.name not in cls._scrapers and config.get("fields"):
+            cls.register(ConfiguredScraper.from_supplier(supplier))
+        scraper = cls.get(supplier.name)
+        if supplier.rate_limit:
+            scraper.set_rate_limit(supplier.rate_limit)
+        if config.get("fields") and config != getattr(scraper, "extraction_config", None):
+            scraper.extraction_config = config
+        return scraper
+
+    @classmethod
+    async def open_all(cls):
+        """Open long-lived resources (session pools) of every scraper"""
+        for scraper in cls._scrapers.values():
+            await scraper.open()
+
+    @classmethod
+    async def close_all(cls):
+        """Close long-lived resources of every scraper"""
+        for name, scraper in cls._scrapers.items():
+            try:
+                await scraper.close()
+            except Exception as e:
+                logger.error(f"Closing scraper for {name} failed: {e}")
+        shutdown_parser_pool()
+
+    @classmethod
+    async def health_snapshot(cls) -> Dict[str, Dict[str, Any]]:
+        """Health of every scraper without scraping anything
+
+        Combines each scraper's cached probe result with its circuit breaker,
+        concurrency state and this process's scrape cache hits and misses.
+        A scraper with an open circuit is unhealthy even if its probe passed.
+        """
+        names = list(cls._scrapers)
+        statuses = await asyncio.gather(
+            *(cls._scrapers[name].health_status() for name in names)
+        )
+        cache_stats = scrape_cache.stats()
+        snapshot = {}
+        for name, status in zip(names, statuses):
+            scraper = cls._scrapers[name]
+            status = dict(
+                status,
+                concurrency=scraper.concurrency_limiter.snapshot(),
+                cache=cache_stats.get(scraper.supplier_name, {"hits": 0, "misses": 0}),
+            )
+            if scraper.circuit_breaker is not None:
+                status["circuit"] = scraper.circuit_breaker.snapshot()
+                if status["circuit"]["state"] == "open":
+                    status["healthy"] = False
+            snapshot[name] = status
+        return snapshot
+
     @classmethod
     def list_scrapers(cls) -> list:
         """List all registered scrapers"""
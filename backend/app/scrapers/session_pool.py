@@ -0,0 +1,128 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from curl_cffi import CurlHttpVersion
+from curl_cffi.requests import AsyncSession
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pool key used for requests that go out without a proxy
+DIRECT = "direct"
+
+
+class _PooledSession:
+    """A long-lived session plus the number of requests currently using it"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.in_use = 0
+
+
+class SessionPool:
+    """Bounded pool of long-lived curl-cffi sessions
+
+    Each proxy gets its own session (proxy affinity), so the TCP/TLS
+    connections it keeps alive are always reused through the same exit IP.
+    Sessions negotiate HTTP/2 where the server supports it, which lets
+    concurrent requests to the same host share one connection.
+
+    When the pool is full, the least recently used idle session is closed
+    to make room; if every session is busy, callers wait for one to free up.
+    """
+
+    def __init__(
+        self,
+        impersonate: str,
+        max_sessions: int = 8,
+        max_clients: int = 10,
+        timeout: float = 10,
+        http_version: CurlHttpVersion = CurlHttpVersion.V2TLS,
+    ):
+        self.impersonate = impersonate
+        self.max_sessions = max_sessions
+        self.max_clients = max_clients
+        self.timeout = timeout
+        self.http_version = http_version
+        self._sessions: "OrderedDict[str, _PooledSession]" = OrderedDict()
+        self._cond = asyncio.Condition()
+
+    async def open(self, warmup_url: Optional[str] = None) -> None:
+        """Open the direct session and optionally pre-warm its connection
+
+        Args:
+            warmup_url: URL to HEAD once so the first real request skips the
+                TCP+TLS handshake
+        """
+        async with self.session() as session:
+            if warmup_url:
+                try:
+                    await session.head(warmup_url)
+                except Exception as e:
+                    logger.warning(f"Session pool warm-up of {warmup_url} failed: {e}")
+        logger.info(f"Session pool opened (max {self.max_sessions} sessions).")
+
+    async def close(self) -> None:
+        """Close every pooled session (call at worker shutdown)"""
+        async with self._cond:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._cond.notify_all()
+        for entry in sessions:
+            await entry.session.close()
+        logger.info(f"Session pool closed {len(sessions)} sessions.")
+
+    @asynccontextmanager
+    async def session(self, proxy: Optional[str] = None) -> AsyncIterator[AsyncSession]:
+        """Borrow the session bound to ``proxy`` (or the direct session)
+
+        Args:
+            proxy: Proxy URL, or None for a direct connection
+
+        Yields:
+            A keep-alive AsyncSession, shared with other concurrent callers
+            using the same proxy
+        """
+        key = proxy or DIRECT
+        async with self._cond:
+            entry = await self._checkout(key, proxy)
+            entry.in_use += 1
+        try:
+            yield entry.session
+        finally:
+            async with self._cond:
+                entry.in_use -= 1
+                self._cond.notify_all()
+
+    async def _checkout(self, key: str, proxy: Optional[str]) -> _PooledSession:
+        """Find or create the session for ``key``; must hold ``self._cond``"""
+        while True:
+            entry = self._sessions.get(key)
+            if entry is not None:
+                self._sessions.move_to_end(key)
+                return entry
+
+            if len(self._sessions) >= self.max_sessions:
+                idle = next((k for k, e in self._sessions.items() if e.in_use == 0), None)
+                if idle is None:
+                    await self._cond.wait()
+                    continue
+                evicted = self._sessions.pop(idle)
+                await evicted.session.close()
+                logger.debug(f"Session pool evicted idle session {idle}.")
+
+            entry = _PooledSession(
+                AsyncSession(
+                    impersonate=self.impersonate,
+                    proxy=proxy,
+                    http_version=self.http_version,
+                    max_clients=self.max_clients,
+                    timeout=self.timeout,
+                )
+            )
+            self._sessions[key] = entry
+            return entry
+
+    def __len__(self) -> int:
+        return len(self._sessions)
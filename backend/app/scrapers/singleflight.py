@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from redis.commands.core import AsyncScript
+from ..core.redis import get_redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delete the lock only if we still own it
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one upstream call
+
+    Within a process, callers asking for a key that is already in flight
+    await the same task instead of starting their own. With ``lock_ttl``
+    set, a Redis lock extends this across processes: only the lock holder
+    runs the call, and everyone else polls ``peek`` (typically a cache
+    read) until the holder's result shows up or the lock goes away.
+    """
+
+    def __init__(self, name: str, lock_ttl: Optional[float] = None, poll_interval: float = 0.2):
+        """
+        Args:
+            name: Namespace for lock keys, e.g. the supplier name
+            lock_ttl: Seconds a cross-process lock is held at most; None
+                disables the Redis lock
+            poll_interval: Seconds between ``peek`` calls while waiting
+        """
+        self.name = name
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._release: Optional[AsyncScript] = None
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        peek: Optional[Callable[[], Awaitable[Optional[T]]]] = None,
+    ) -> T:
+        """Run ``fn`` once for all concurrent callers of ``key``
+
+        Args:
+            key: Identity of the call, e.g. the product ID
+            fn: The upstream call
+            peek: Returns the result if another process already produced it
+                (None otherwise); required for the cross-process lock
+
+        Returns:
+            The shared result; exceptions are shared too
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, fn, peek))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # shield: one caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        peek: Optional[Callable[[], Awaitable[Optional[T]]]],
+    ) -> T:
+        if self.lock_ttl is None or peek is None:
+            return await fn()
+
+        lock_key = f"singleflight:{self.name}:{key}"
+        token = uuid.uuid4().hex
+        while True:
+            try:
+                redis = await get_redis_client()
+                acquired = await redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+            except Exception as e:
+                logger.warning(f"Single-flight lock {lock_key} unavailable, calling without it: {e}")
+                return await fn()
+
+            if acquired:
+                try:
+                    return await fn()
+                finally:
+                    await self._unlock(redis, lock_key, token)
+
+            # Another process is fetching; its result lands where peek looks
+            await asyncio.sleep(self.poll_interval)
+            result = await peek()
+            if result is not None:
+                return result
+
+    async def _unlock(self, redis, lock_key: str, token: str) -> None:
+        try:
+            if self._release is None:
+                self._release = redis.register_script(RELEASE_LUA)
+            await self._release(keys=[lock_key], args=[token])
+        except Exception as e:
+            # The lock expires on its own after lock_ttl
+            logger.warning(f"Releasing single-flight lock {lock_key} failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self._calls)
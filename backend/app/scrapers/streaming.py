@@ -0,0 +1,55 @@
+from typing import Iterable
+
+# Bytes read past the last stop marker, so the element it opens is complete
+STREAM_TAIL_BYTES = 32 * 1024
+
+
+async def read_prefix(
+    response,
+    max_bytes: int,
+    stop_markers: Iterable[bytes] = (),
+    tail_bytes: int = STREAM_TAIL_BYTES,
+) -> bytes:
+    """Read a streamed curl_cffi response only as far as needed
+
+    Stops after ``max_bytes``, or ``tail_bytes`` after every stop marker
+    has been seen, then aborts the rest of the transfer. The returned
+    prefix is truncated HTML, which lxml and html.parser parse fine.
+
+    Args:
+        response: Response from ``session.request(..., stream=True)``
+        max_bytes: Byte budget for the body
+        stop_markers: Byte strings that together mean the needed part of
+            the page has arrived
+
+    Returns:
+        The body prefix
+    """
+    pending = list(stop_markers)
+    overlap = max((len(m) for m in pending), default=1) - 1
+    stop_at = max_bytes
+    chunks = []
+    size = 0
+    carry = b""
+    chunk_iter = response.aiter_content()
+    complete = False
+    try:
+        async for chunk in chunk_iter:
+            chunks.append(chunk)
+            size += len(chunk)
+            if pending:
+                window = carry + chunk  # markers may straddle chunk boundaries
+                pending = [m for m in pending if m not in window]
+                carry = window[-overlap:] if overlap else b""
+                if not pending:
+                    stop_at = min(max_bytes, size + tail_bytes)
+            if size >= stop_at:
+                break
+        else:
+            complete = True
+    finally:
+        if not complete and response.quit_now is not None:
+            response.quit_now.set()  # curl aborts on its next write
+        await chunk_iter.aclose()
+        await response.aclose()
+    return b"".join(chunks)[:stop_at]
@@ -0,0 +1,190 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, cast
+
+from pydantic import ValidationError
+from redis.exceptions import ResponseError
+from redis.typing import EncodableT, FieldT
+
+from backend.app.services.schemas import ProductChangeEvent
+from backend.app.core.redis import get_redis_client
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Redis Stream of ProductChangeEvents, one entry per changed product
+CHANGES_STREAM = "tracker:changes"
+
+# (entry id, fields) as read with decode_responses; fields is None for an
+# entry trimmed away while pending
+StreamEntry = Tuple[str, Optional[Dict[str, str]]]
+
+
+def encode_event(event: ProductChangeEvent) -> Dict[FieldT, EncodableT]:
+    """Flat stream fields for an event, leaving out empty values."""
+    fields: Dict[FieldT, EncodableT] = {}
+    for name, value in event.model_dump(mode="json", exclude_none=True).items():
+        fields[name] = ("1" if value else "0") if isinstance(value, bool) else str(value)
+    return fields
+
+
+def decode_event(fields: Dict[str, str]) -> ProductChangeEvent:
+    """
+    Raises:
+        pydantic.ValidationError: If the entry is not a change event
+    """
+    return ProductChangeEvent.model_validate(fields)
+
+
+class ChangeEventPublisher:
+    """
+    Publishes tracker change events to the ``tracker:changes`` stream.
+
+    Each batch is one pipelined round trip of XADDs, trimmed
+    approximately (``MAXLEN ~``) to ``CHANGE_STREAM_MAXLEN`` entries so
+    the stream's memory stays bounded however long consumers lag.
+    """
+
+    def __init__(
+        self,
+        stream: str = CHANGES_STREAM,
+        maxlen: int = settings.CHANGE_STREAM_MAXLEN,
+    ):
+        self.stream = stream
+        self.maxlen = maxlen
+
+    async def publish(self, events: Sequence[ProductChangeEvent]) -> None:
+        """
+        Append events to the stream.
+
+        Publishing is best effort: the changes are already committed, so
+        a Redis failure is logged rather than raised.
+        """
+        if not events:
+            return
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.xadd(self.stream, encode_event(event), maxlen=self.maxlen, approximate=True)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish {len(events)} change events: {e}")
+
+
+class ChangeEventConsumer:
+    """
+    Reads change events as a member of a consumer group.
+
+    Every group sees every event once; within a group each event goes to
+    one consumer. Events are acknowledged after the handler succeeds, so
+    a failed or crashed consumer's events stay pending and are reclaimed
+    by a group member after ``claim_idle_ms``.
+
+    Example:
+        consumer = ChangeEventConsumer("repricer", "repricer-1")
+        await consumer.consume(handle_changes)
+    """
+
+    def __init__(
+        self,
+        group: str,
+        consumer: str,
+        stream: str = CHANGES_STREAM,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        claim_idle_ms: int = 60000,
+        start_id: str = "$",
+    ):
+        self.group = group
+        self.consumer = consumer
+        self.stream = stream
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.start_id = start_id
+        self._group_ready = False
+
+    async def ensure_group(self) -> None:
+        """Create the consumer group (and stream) if missing."""
+        if self._group_ready:
+            return
+        redis = await get_redis_client()
+        try:
+            await redis.xgroup_create(self.stream, self.group, id=self.start_id, mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def read(self) -> List[Tuple[str, ProductChangeEvent]]:
+        """
+        Next batch of (entry id, event), blocking up to ``block_ms``.
+
+        Events another consumer left pending for longer than
+        ``claim_idle_ms`` are taken over first. Malformed entries are
+        acknowledged and skipped.
+        """
+        await self.ensure_group()
+        redis = await get_redis_client()
+        claimed = await redis.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms, start_id="0-0", count=self.batch_size,
+        )
+        entries: List[StreamEntry] = claimed[1]  # [next start id, entries, deleted ids]
+        if not entries:
+            # RESP2 reply: [[stream, entries]] for our single stream
+            response = cast(
+                List[Tuple[str, List[StreamEntry]]],
+                await redis.xreadgroup(
+                    self.group, self.consumer, {self.stream: ">"},
+                    count=self.batch_size, block=self.block_ms,
+                ),
+            )
+            entries = response[0][1] if response else []
+
+        batch: List[Tuple[str, ProductChangeEvent]] = []
+        malformed: List[str] = []
+        for entry_id, fields in entries:
+            if fields is None:  # trimmed away while pending
+                malformed.append(entry_id)
+                continue
+            try:
+                batch.append((entry_id, decode_event(fields)))
+            except ValidationError as e:
+                logger.warning(f"Skipping malformed change event {entry_id}: {e}")
+                malformed.append(entry_id)
+        if malformed:
+            await self.ack(malformed)
+        return batch
+
+    async def ack(self, entry_ids: Sequence[str]) -> None:
+        if entry_ids:
+            redis = await get_redis_client()
+            await redis.xack(self.stream, self.group, *entry_ids)
+
+    async def consume(
+        self,
+        handler: Callable[[List[ProductChangeEvent]], Awaitable[None]],
+        stop: Optional[asyncio.Event] = None,
+    ) -> None:
+        """
+        Feed batches to ``handler`` until ``stop`` is set, acking each
+        batch once the handler returns.
+        """
+        while stop is None or not stop.is_set():
+            try:
+                batch = await self.read()
+            except Exception as e:
+                logger.error(f"Reading change events failed: {e}", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+            if not batch:
+                continue
+            try:
+                await handler([event for _, event in batch])
+            except Exception as e:
+                # Left pending: reclaimed and retried after claim_idle_ms
+                logger.error(f"Change event handler failed for {len(batch)} events: {e}", exc_info=True)
+                continue
+            await self.ack([entry_id for entry_id, _ in batch])
@@ -0,0 +1,203 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.app.models.product import PriceHistory, StockHistory
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ("product_id", "old_price", "new_price", "price_change_percent", "recorded_at", "reason")
+STOCK_COLUMNS = ("product_id", "old_stock", "new_stock", "recorded_at", "reason")
+
+# Failures of the database or the connection rather than of the rows: the
+# batch is kept and retried. asyncpg errors surface unwrapped from COPY.
+TRANSIENT_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    OSError,  # includes ConnectionError and TimeoutError
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.exceptions.OperatorInterventionError,
+    asyncpg.exceptions.InsufficientResourcesError,
+)
+
+
+class HistoryWriter:
+    """
+    Buffers PriceHistory and StockHistory rows and writes them in bulk.
+
+    Rows are flushed when ``max_rows`` are buffered or every
+    ``flush_interval`` seconds, whichever comes first, and once more on
+    ``close()``. On asyncpg each table is written with a single ``COPY``;
+    other drivers get one executemany ``INSERT`` per table, which
+    SQLAlchemy batches into multi-row statements. ``recorded_at`` is
+    stamped when a row is buffered, not when it is written.
+
+    History is written outside the transaction that updates the products,
+    so a crash can lose up to one flush interval of history rows, never
+    the products' latest observation.
+
+    A batch that fails on a connection or database outage stays buffered
+    for the next flush. A batch the database rejects (bad data, constraint
+    violations) is written in halves until the offending rows are isolated;
+    those are logged and dropped so they can't block the buffer.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_rows: int = settings.HISTORY_FLUSH_ROWS,
+        flush_interval: float = settings.HISTORY_FLUSH_SECONDS,
+    ):
+        self.engine = engine
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self._price_rows: List[Dict[str, Any]] = []
+        self._stock_rows: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._price_rows) + len(self._stock_rows)
+
+    async def start(self) -> None:
+        """Start the periodic flush."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop the periodic flush and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.pending:
+            logger.error(f"Dropping {self.pending} unwritten history rows on shutdown.")
+
+    async def add(
+        self,
+        price_rows: Sequence[Dict[str, Any]] = (),
+        stock_rows: Sequence[Dict[str, Any]] = (),
+    ) -> None:
+        """
+        Buffer history rows, flushing first if the buffer is full.
+
+        Args:
+            price_rows: PriceHistory column values, without ``id``.
+            stock_rows: StockHistory column values, without ``id``.
+        """
+        now = datetime.now(timezone.utc)
+        self._price_rows += [{"recorded_at": now, **row} for row in price_rows]
+        self._stock_rows += [{"recorded_at": now, **row} for row in stock_rows]
+        if self.pending >= self.max_rows:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write every buffered row; on an outage the rows stay buffered."""
+        async with self._lock:
+            price_rows, self._price_rows = self._price_rows, []
+            stock_rows, self._stock_rows = self._stock_rows, []
+            if not price_rows and not stock_rows:
+                return
+            try:
+                await self._write(price_rows, stock_rows)
+            except TRANSIENT_ERRORS as e:
+                self._requeue(price_rows, stock_rows)
+                logger.error(f"History flush failed, {self.pending} rows buffered: {e}", exc_info=True)
+                return
+            except Exception as e:
+                logger.error(f"History batch rejected, isolating the bad rows: {e}")
+                await self._salvage(price_rows, stock_rows)
+                return
+            logger.debug(f"Wrote {len(price_rows)} price and {len(stock_rows)} stock history rows.")
+
+    async def _salvage(self, price_rows: List[Dict[str, Any]], stock_rows: List[Dict[str, Any]]) -> None:
+        """Write a rejected batch in halves, dropping only the rows the database refuses"""
+        parts: List[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = [([], stock_rows), (price_rows, [])]
+        dropped = 0
+        while parts:
+            prices, stocks = parts.pop()
+            if not prices and not stocks:
+                continue
+            try:
+                await self._write(prices, stocks)
+            except TRANSIENT_ERRORS as e:
+                # Requeue the latest part first so the buffer keeps row order
+                for prices, stocks in parts + [(prices, stocks)]:
+                    self._requeue(prices, stocks)
+                logger.error(f"History flush failed, {self.pending} rows buffered: {e}", exc_info=True)
+                break
+            except Exception as e:
+                rows = prices or stocks
+                if len(rows) == 1:
+                    dropped += 1
+                    logger.error(f"Dropping history row rejected by the database: {rows[0]}: {e}")
+                    continue
+                half = len(rows) // 2
+                if prices:
+                    parts += [(prices[half:], []), (prices[:half], [])]
+                else:
+                    parts += [([], stocks[half:]), ([], stocks[:half])]
+        if dropped:
+            logger.error(f"Dropped {dropped} rejected history rows.")
+
+    async def _write(self, price_rows: List[Dict[str, Any]], stock_rows: List[Dict[str, Any]]) -> None:
+        async with self.engine.connect() as conn:
+            if conn.dialect.driver == "asyncpg":
+                await self._copy(conn, price_rows, stock_rows)
+            else:
+                await self._insert(conn, price_rows, stock_rows)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    @staticmethod
+    async def _copy(conn, price_rows, stock_rows) -> None:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        async with driver.transaction():
+            for table, columns, rows in (
+                (PriceHistory.__table__, PRICE_COLUMNS, price_rows),
+                (StockHistory.__table__, STOCK_COLUMNS, stock_rows),
+            ):
+                if rows:
+                    await driver.copy_records_to_table(
+                        table.name,
+                        records=[tuple(row.get(c) for c in columns) for row in rows],
+                        columns=columns,
+                    )
+
+    @staticmethod
+    async def _insert(conn, price_rows, stock_rows) -> None:
+        async with conn.begin():
+            for table, columns, rows in (
+                (PriceHistory.__table__, PRICE_COLUMNS, price_rows),
+                (StockHistory.__table__, STOCK_COLUMNS, stock_rows),
+            ):
+                if rows:
+                    await conn.execute(insert(table), [{c: row.get(c) for c in columns} for row in rows])
+
+    def _requeue(self, price_rows, stock_rows) -> None:
+        """Put unwritten rows back in front, bounded so a dead database can't exhaust memory."""
+        self._price_rows = price_rows + self._price_rows
+        self._stock_rows = stock_rows + self._stock_rows
+        overflow = self.pending - self.max_rows * 10
+        if overflow > 0:
+            dropped_price = min(overflow, len(self._price_rows))
+            self._price_rows = self._price_rows[dropped_price:]
+            self._stock_rows = self._stock_rows[overflow - dropped_price:]
+            logger.error(f"History buffer full, dropped {overflow} oldest rows.")
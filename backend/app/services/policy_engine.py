@@ -1,10 +1,12 @@
-from typing import List, Optional
+import re
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from backend.app.models.product import Product, PriceHistory
+from backend.app.models.product import Product
 from backend.app.models.listing import Listing
 from backend.app.models.admin import Alert
 from backend.app.services.schemas import PolicyViolation
@@ -13,185 +15,206 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class PolicyEngine:
-    async def check_policies(
-        self, product_id: int, db: AsyncSession
-    ) -> List[PolicyViolation]:
-        """
-        Run all policy checks for a given product.
+def stock_quantity(stock: Optional[str]) -> Optional[int]:
+    """
+    Units available according to a supplier stock text.
 
-        Args:
-            product_id: The ID of the product to check.
-            db: The database session.
-
-        Returns:
-            A list of policy violations.
-        """
-        violations = []
-        product = await db.get(
-            Product,
-            product_id,
-            options=[selectinload(Product.listings)],
+    "Only 3 left in stock" -> 3, "Out of Stock" -> 0, "In Stock" -> None
+    (available, quantity not stated).
+    """
+    if stock is None:
+        return None
+    text = stock.lower()
+    if "out of stock" in text or "unavailable" in text:
+        return 0
+    match = re.search(r"\d+", text.replace(",", ""))
+    return int(match.group(0)) if match else None
+
+
+def low_stock_violation(stock: Optional[str], threshold: int) -> Optional[PolicyViolation]:
+    """A low_stock violation if fewer than ``threshold`` units are left."""
+    quantity = stock_quantity(stock)
+    if quantity is not None and quantity < threshold:
+        return PolicyViolation(
+            policy_name="low_stock",
+            severity="warning",
+            details={"stock": stock, "threshold": threshold},
         )
-        if not product:
-            logger.warning(f"Product with id {product_id} not found for policy check.")
-            return []
+    return None
 
-        low_stock_violation = await self.check_low_stock(product, db)
-        if low_stock_violation:
-            violations.append(low_stock_violation)
 
-        price_drop_violation = await self.check_price_drop(product, db)
-        if price_drop_violation:
-            violations.append(price_drop_violation)
-
-        for listing in product.listings:
-            margin_violation = await self.check_margin(product, listing, db)
-            if margin_violation:
-                violations.append(margin_violation)
-
-            duplicate_violation = await self.check_duplicate_listings(
-                product, listing.store_account_id, db
+def price_drop_violation(
+    old_price: Optional[Decimal], new_price: Optional[Decimal], drop_threshold_percent: float
+) -> Optional[PolicyViolation]:
+    """A price_drop violation if the price fell by more than the threshold."""
+    if old_price is not None and new_price is not None and old_price > 0:
+        percent_change = (new_price - old_price) / old_price
+        if percent_change < -drop_threshold_percent:
+            return PolicyViolation(
+                policy_name="price_drop",
+                severity="info",
+                details={"percent": float(percent_change), "threshold": -drop_threshold_percent},
             )
-            if duplicate_violation:
-                violations.append(duplicate_violation)
-
-        for violation in violations:
-            alert = Alert(
-                user_id=product.user_id,
-                type=f"policy_trigger:{violation.policy_name}",
-                product_id=product_id,
-                severity=violation.severity,
-                message=f"Policy violation: {violation.policy_name}",
-                data=violation.details,
+    return None
+
+
+def low_margin_violation(
+    product_price: Optional[Decimal],
+    listing_price: Optional[Decimal],
+    listing_id: int,
+    min_margin: float,
+) -> Optional[PolicyViolation]:
+    """A low_margin violation if a listing earns less than ``min_margin``."""
+    # This is a simplified margin calculation.
+    # A real implementation would need to account for fees, shipping, etc.
+    if product_price and product_price > 0:
+        # An unpriced listing sells at a loss; flag it without a margin
+        margin = (listing_price - product_price) / listing_price if listing_price else None
+        if margin is None or margin < min_margin:
+            return PolicyViolation(
+                policy_name="low_margin",
+                severity="warning",
+                details={
+                    "margin": None if margin is None else float(margin),
+                    "required": min_margin,
+                    "listing_id": listing_id,
+                },
             )
-            db.add(alert)
+    return None
 
-        await db.commit()
-        return violations
 
-    async def check_low_stock(
-        self, product: Product, db: AsyncSession, threshold: int = 5
-    ) -> Optional[PolicyViolation]:
+class PolicyEngine:
+    async def check_policies(
+        self, product_id: int, db: AsyncSession
+    ) -> List[PolicyViolation]:
         """
-        Check for low stock and auto-pause listings if necessary.
+        Run all policy checks for a given product.
 
         Args:
-            product: The product to check.
+            product_id: The ID of the product to check.
             db: The database session.
-            threshold: The low stock threshold.
 
         Returns:
-            A PolicyViolation if stock is low, otherwise None.
+            A list of policy violations.
         """
-        if product.stock is not None and product.stock < threshold:
-            for listing in product.listings:
-                if listing.status == "Active":
-                    listing.status = "Paused"
-                    listing.status_reason = "low_stock"
-            return PolicyViolation(
-                policy_name="low_stock",
-                severity="warning",
-                details={"stock": product.stock, "threshold": threshold},
-            )
-        return None
+        violations = await self.check_policies_bulk([product_id], db)
+        return violations.get(product_id, [])
 
-    async def check_margin(
+    async def check_policies_bulk(
         self,
-        product: Product,
-        listing: Listing,
+        product_ids: List[int],
         db: AsyncSession,
+        low_stock_threshold: int = 5,
         min_margin: float = 0.15,
-    ) -> Optional[PolicyViolation]:
+        drop_threshold_percent: float = 0.05,
+    ) -> Dict[int, List[PolicyViolation]]:
         """
-        Check if the profit margin for a listing is below a minimum.
+        Run all policy checks for many products with a fixed number of queries.
 
-        Args:
-            product: The product.
-            listing: The listing.
-            db: The database session.
-            min_margin: The minimum profit margin.
+        One query loads the products' latest observation (price, previous
+        price, stock) and one their listings; low stock, price drop and
+        margin are evaluated in memory. Duplicate listings are found with
+        a single GROUP BY product_id, store_account_id HAVING count > 1.
+        Active listings of low-stock products are paused with one UPDATE,
+        alerts are inserted with one executemany, then the session commits.
 
-        Returns:
-            A PolicyViolation if the margin is too low, otherwise None.
-        """
-        # This is a simplified margin calculation.
-        # A real implementation would need to account for fees, shipping, etc.
-        if product.price > 0:
-            margin = (listing.price - product.price) / listing.price
-            if margin < min_margin:
-                return PolicyViolation(
-                    policy_name="low_margin",
-                    severity="warning",
-                    details={"margin": float(margin), "required": min_margin},
-                )
-        return None
-
-    async def check_price_drop(
-        self, product: Product, db: AsyncSession, drop_threshold_percent: float = 0.05
-    ) -> Optional[PolicyViolation]:
-        """
-        Check for a significant price drop.
+        Each violation is alerted once to every user listing the product
+        (a low margin only to the listing's owner). Alerts need a user, so
+        violations of products without listings are returned but not
+        alerted.
 
         Args:
-            product: The product to check.
+            product_ids: The IDs of the products to check.
             db: The database session.
-            drop_threshold_percent: The price drop threshold.
+            low_stock_threshold: Stock below this pauses Active listings.
+            min_margin: The minimum profit margin per listing.
+            drop_threshold_percent: The price drop reported as a violation.
 
         Returns:
-            A PolicyViolation if a significant price drop is detected, otherwise None.
+            Violations by product ID, for products with at least one.
         """
-        stmt = (
-            select(PriceHistory)
-            .where(PriceHistory.product_id == product.id)
-            .order_by(PriceHistory.recorded_at.desc())
-            .limit(2)
-        )
-        result = await db.execute(stmt)
-        price_history = result.scalars().all()
-
-        if len(price_history) == 2:
-            old_price = price_history[1].new_price
-            new_price = price_history[0].new_price
-            if old_price > 0:
-                percent_change = (new_price - old_price) / old_price
-                if percent_change < -drop_threshold_percent:
-                    return PolicyViolation(
-                        policy_name="price_drop",
-                        severity="info",
-                        details={
-                            "percent": float(percent_change),
-                            "threshold": -drop_threshold_percent,
-                        },
-                    )
-        return None
-
-    async def check_duplicate_listings(
-        self, product: Product, store_account_id: int, db: AsyncSession
-    ) -> Optional[PolicyViolation]:
-        """
-        Check for duplicate listings of the same product on the same store.
-
-        Args:
-            product: The product to check.
-            store_account_id: The ID of the store account.
-            db: The database session.
-
-        Returns:
-            A PolicyViolation if duplicate listings are found, otherwise None.
-        """
-        stmt = (
-            select(Listing)
-            .where(Listing.product_id == product.id)
-            .where(Listing.store_account_id == store_account_id)
-        )
-        result = await db.execute(stmt)
-        listings = result.scalars().all()
+        if not product_ids:
+            return {}
+        products = (
+            await db.execute(
+                select(Product.id, Product.price, Product.previous_price, Product.stock)
+                .where(Product.id.in_(product_ids))
+            )
+        ).all()
+        found = {row.id for row in products}
+        for product_id in set(product_ids) - found:
+            logger.warning(f"Product with id {product_id} not found for policy check.")
 
-        if len(listings) > 1:
-            return PolicyViolation(
+        listings = (
+            await db.execute(
+                select(Listing.id, Listing.product_id, Listing.user_id, Listing.price, Listing.status)
+                .where(Listing.product_id.in_(found))
+            )
+        ).all()
+        listings_by_product = defaultdict(list)
+        for listing in listings:
+            listings_by_product[listing.product_id].append(listing)
+
+        duplicates = (
+            await db.execute(
+                select(Listing.product_id, Listing.store_account_id, func.count().label("count"))
+                .where(Listing.product_id.in_(found))
+                .group_by(Listing.product_id, Listing.store_account_id)
+                .having(func.count() > 1)
+            )
+        ).all()
+
+        violations: Dict[int, List[PolicyViolation]] = defaultdict(list)
+        low_stock_ids = []
+        for product in products:
+            low_stock = low_stock_violation(product.stock, low_stock_threshold)
+            if low_stock is not None:
+                low_stock_ids.append(product.id)
+            found_violations = [
+                low_stock,
+                price_drop_violation(product.previous_price, product.price, drop_threshold_percent),
+                *(
+                    low_margin_violation(product.price, listing.price, listing.id, min_margin)
+                    for listing in listings_by_product[product.id]
+                ),
+            ]
+            violations[product.id] += [v for v in found_violations if v is not None]
+
+        for duplicate in duplicates:
+            violations[duplicate.product_id].append(PolicyViolation(
                 policy_name="duplicate_listings",
                 severity="warning",
-                details={"count": len(listings)},
+                details={"count": duplicate.count, "store_account_id": duplicate.store_account_id},
+            ))
+
+        if low_stock_ids:
+            await db.execute(
+                update(Listing)
+                .where(Listing.product_id.in_(low_stock_ids), Listing.status == "Active")
+                .values(status="Paused", status_reason="low_stock")
+                .execution_options(synchronize_session=False)
             )
-        return None
+
+        alerts = []
+        for product_id, product_violations in violations.items():
+            product_listings = listings_by_product[product_id]
+            owners = sorted({listing.user_id for listing in product_listings})
+            listing_owner = {listing.id: listing.user_id for listing in product_listings}
+            for violation in product_violations:
+                # A listing's violation concerns its owner; a product's, every seller listing it
+                listing_id = violation.details.get("listing_id")
+                for user_id in [listing_owner[listing_id]] if listing_id in listing_owner else owners:
+                    alerts.append({
+                        "user_id": user_id,
+                        "type": f"policy_trigger:{violation.policy_name}",
+                        "product_id": product_id,
+                        "listing_id": listing_id,
+                        "severity": violation.severity,
+                        "message": f"Policy violation: {violation.policy_name}",
+                        "data": violation.details,
+                    })
+        if alerts:
+            await db.execute(insert(Alert.__table__), alerts)
+
+        await db.commit()
+        return dict(violations)
@@ -0,0 +1,232 @@
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from redis.commands.core import AsyncScript
+from redis.typing import EncodableT, FieldT
+from sqlalchemy import and_, exists, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.models.listing import Listing
+from backend.app.models.product import Product
+from backend.app.services.sharding import shard_of
+from backend.app.core.redis import get_redis_client
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sorted set per shard: product id -> unix time of the next check
+SCHEDULE_KEY = "tracker:schedule:{shard}"
+# Hash: product id -> current check interval in seconds
+INTERVALS_KEY = "tracker:intervals"
+# Tolerated difference between worker and database clocks when telling
+# whether a product was scraped in this batch (checks are >= 15 min apart)
+CLOCK_SKEW_SECONDS = 60
+
+# Take up to ARGV[2] products due at ARGV[1] and push them ARGV[3] seconds
+# out, so a worker that dies mid-batch only delays them by the lease.
+CLAIM_DUE_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local lease_until = tonumber(ARGV[1]) + tonumber(ARGV[3])
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], lease_until, member)
+end
+return due
+"""
+
+
+class TrackingScheduler:
+    """
+    Adaptive per-product check schedule kept in a Redis sorted set.
+
+    Each product has its own interval. It resets to the minimum when price
+    or stock changes and grows by ``TRACKER_BACKOFF_FACTOR`` after each
+    check that found nothing new, so volatile products are checked often
+    and stable ones rarely. Products with Active listings are never left
+    longer than ``TRACKER_ACTIVE_MAX_INTERVAL_SECONDS``; archived products
+    drop to ``TRACKER_ARCHIVED_INTERVAL_SECONDS``.
+
+    The schedule is split into ``TRACKER_SHARDS`` sorted sets by product
+    id so tracker workers can divide it (see ShardCoordinator).
+    """
+
+    def __init__(self, shards: int = settings.TRACKER_SHARDS):
+        self.shard_count = shards
+        self._claim: Optional[AsyncScript] = None
+        self._next_shard = 0
+
+    def _schedule_key(self, product_id: int) -> str:
+        return SCHEDULE_KEY.format(shard=shard_of(product_id, self.shard_count))
+
+    async def sync(
+        self,
+        db: AsyncSession,
+        shards: Optional[Iterable[int]] = None,
+        batch_size: int = 5000,
+    ) -> int:
+        """
+        Add products of the given shards (default all) missing from the
+        schedule, due immediately.
+
+        Walks the products table by primary key in batches; products
+        already scheduled keep their next-check time.
+
+        Returns:
+            The number of products newly scheduled.
+        """
+        redis = await get_redis_client()
+        added = 0
+        last_id = 0
+        now = time.time()
+        stmt = select(Product.id).order_by(Product.id).limit(batch_size)
+        if shards is not None:
+            stmt = stmt.where((Product.id % self.shard_count).in_(list(shards)))
+        while True:
+            ids = (await db.execute(stmt.where(Product.id > last_id))).scalars().all()
+            if not ids:
+                break
+            by_shard: Dict[str, Dict[str, float]] = defaultdict(dict)
+            for pid in ids:
+                by_shard[self._schedule_key(pid)][str(pid)] = now
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, members in by_shard.items():
+                    pipe.zadd(key, members, nx=True)
+                added += sum(await pipe.execute())
+            last_id = ids[-1]
+        if added:
+            logger.info(f"Scheduled {added} new products for tracking.")
+        return added
+
+    async def claim_due(self, limit: int, shards: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Claim up to ``limit`` due products from the given shards (default all).
+
+        Within a shard the longest-overdue products come first; the shard
+        visited first rotates between calls so no shard starves. Claimed
+        products are leased for ``TRACKER_CLAIM_LEASE_SECONDS``: if they
+        are not rescheduled by then, they become due again.
+        """
+        shards = sorted(range(self.shard_count) if shards is None else shards)
+        if not shards:
+            return []
+        redis = await get_redis_client()
+        if self._claim is None:
+            self._claim = redis.register_script(CLAIM_DUE_LUA)
+        start = self._next_shard % len(shards)
+        self._next_shard += 1
+        now = time.time()
+        claimed: List[int] = []
+        for shard in shards[start:] + shards[:start]:
+            due = await self._claim(
+                keys=[SCHEDULE_KEY.format(shard=shard)],
+                args=[now, limit - len(claimed), settings.TRACKER_CLAIM_LEASE_SECONDS],
+            )
+            claimed += [int(pid) for pid in due]
+            if len(claimed) >= limit:
+                break
+        return claimed
+
+    async def reschedule(
+        self,
+        product_ids: List[int],
+        changed_ids: Iterable[int],
+        db: AsyncSession,
+        checked_since: float,
+    ) -> None:
+        """
+        Compute and store the next check time of each tracked product.
+
+        Other users' products sharing a supplier item with a dispatched
+        product were updated by the same scrape, so they are rescheduled
+        too; each supplier item is then scraped about once per interval
+        however many users track it.
+
+        Args:
+            product_ids: Products that were dispatched for tracking.
+            changed_ids: Products whose price or stock changed.
+            db: The database session.
+            checked_since: Unix time the batch started; products whose
+                ``last_scraped_at`` is older failed and are retried soon.
+        """
+        if not product_ids:
+            return
+        changed: Set[int] = set(changed_ids)
+        checked_since -= CLOCK_SKEW_SECONDS
+        items = select(Product.supplier_id, Product.asin).where(Product.id.in_(product_ids))
+        fanned_out = and_(
+            tuple_(Product.supplier_id, Product.asin).in_(items),
+            Product.last_scraped_at >= datetime.fromtimestamp(checked_since, timezone.utc),
+        )
+        has_active_listing = exists().where(
+            and_(Listing.product_id == Product.id, Listing.status == "Active")
+        )
+        rows = (
+            await db.execute(
+                select(
+                    Product.id,
+                    Product.is_archived,
+                    Product.last_scraped_at,
+                    has_active_listing.label("active"),
+                ).where(or_(Product.id.in_(product_ids), fanned_out))
+            )
+        ).all()
+
+        redis = await get_redis_client()
+        current = await redis.hmget(INTERVALS_KEY, [str(row.id) for row in rows])
+
+        now = time.time()
+        schedule: Dict[str, Dict[str, float]] = defaultdict(dict)
+        intervals: Dict[FieldT, EncodableT] = {}
+        for row, stored in zip(rows, current):
+            interval = float(stored) if stored else float(settings.TRACKER_MIN_INTERVAL_SECONDS)
+            checked = row.last_scraped_at is not None and row.last_scraped_at.timestamp() >= checked_since
+            if not checked:
+                delay = float(settings.TRACKER_RETRY_SECONDS)  # keep the interval, retry soon
+            else:
+                interval = self.next_interval(interval, row.id in changed, row.active, row.is_archived)
+                intervals[str(row.id)] = interval
+                delay = interval
+            schedule[self._schedule_key(row.id)][str(row.id)] = now + delay * random.uniform(0.9, 1.1)
+
+        # Products deleted since they were scheduled
+        missing = set(product_ids) - {row.id for row in rows}
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for key, members in schedule.items():
+                pipe.zadd(key, members)
+            if intervals:
+                pipe.hset(INTERVALS_KEY, mapping=intervals)
+            for pid in missing:
+                pipe.zrem(self._schedule_key(pid), str(pid))
+            if missing:
+                pipe.hdel(INTERVALS_KEY, *map(str, missing))
+            await pipe.execute()
+
+    @staticmethod
+    def next_interval(
+        interval: float, changed: bool, active: bool, archived: bool
+    ) -> float:
+        """
+        The check interval after one successful check.
+
+        Args:
+            interval: The product's current interval in seconds.
+            changed: Whether price or stock changed in this check.
+            active: Whether the product has an Active listing.
+            archived: Whether the product is archived.
+        """
+        if archived:
+            return settings.TRACKER_ARCHIVED_INTERVAL_SECONDS
+        if changed:
+            interval = settings.TRACKER_MIN_INTERVAL_SECONDS
+        else:
+            interval *= settings.TRACKER_BACKOFF_FACTOR
+        ceiling = (
+            settings.TRACKER_ACTIVE_MAX_INTERVAL_SECONDS
+            if active
+            else settings.TRACKER_MAX_INTERVAL_SECONDS
+        )
+        return max(settings.TRACKER_MIN_INTERVAL_SECONDS, min(interval, ceiling))
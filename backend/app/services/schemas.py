@@ -10,8 +10,8 @@ class ProductChangeEvent(BaseModel):
     old_price: Optional[Decimal] = None
     new_price: Optional[Decimal] = None
     has_stock_change: bool
-    old_stock: Optional[int] = None
-    new_stock: Optional[int] = None
+    old_stock: Optional[str] = None
+    new_stock: Optional[str] = None
 
 
 class PolicyViolation(BaseModel):
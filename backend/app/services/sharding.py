@@ -0,0 +1,164 @@
+import asyncio
+import math
+import os
+import random
+import socket
+import time
+import uuid
+from typing import List, Optional, Set
+
+from redis.commands.core import AsyncScript
+
+from backend.app.core.redis import get_redis_client
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sorted set: worker id -> unix time of its last heartbeat
+WORKERS_KEY = "tracker:workers"
+
+# Extend every shard lease in KEYS that this worker still holds; one
+# 1 (renewed) or 0 (lost) per key
+RENEW_LUA = """
+local renewed = {}
+for i, key in ipairs(KEYS) do
+    renewed[i] = 0
+    if redis.call('GET', key) == ARGV[1] then
+        renewed[i] = redis.call('PEXPIRE', key, ARGV[2])
+    end
+end
+return renewed
+"""
+
+# Give up every shard lease in KEYS that this worker still holds
+RELEASE_LUA = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        released = released + redis.call('DEL', key)
+    end
+end
+return released
+"""
+
+
+def shard_of(product_id: int, shards: int = settings.TRACKER_SHARDS) -> int:
+    """The schedule shard a product belongs to."""
+    return product_id % shards
+
+
+def lease_key(shard: int) -> str:
+    return f"tracker:shard:{shard}:owner"
+
+
+class ShardCoordinator:
+    """
+    Splits the tracking schedule's shards among live tracker workers.
+
+    The shard count is fixed (``TRACKER_SHARDS``), so a product never
+    changes shard; only shard ownership moves. Each worker holds leases
+    on about ``shards / live workers`` shards and renews them on every
+    heartbeat. A worker that stops heartbeating loses its leases after
+    ``TRACKER_SHARD_LEASE_SECONDS`` and the others pick its shards up.
+    When workers join or leave, workers above their fair share release
+    only the surplus and workers below it claim only free shards, so
+    most shards stay where they are.
+    """
+
+    def __init__(
+        self,
+        shards: int = settings.TRACKER_SHARDS,
+        lease_seconds: float = settings.TRACKER_SHARD_LEASE_SECONDS,
+        worker_id: Optional[str] = None,
+    ):
+        self.shard_count = shards
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.shards: Set[int] = set()
+        self._renew: Optional[AsyncScript] = None
+        self._release: Optional[AsyncScript] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Join the fleet, claim a first share and keep heartbeating."""
+        await self.heartbeat()
+        self._task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Tracker worker {self.worker_id} owns shards {sorted(self.shards)}.")
+
+    async def stop(self) -> None:
+        """Stop heartbeating and hand every shard back immediately."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            redis = await get_redis_client()
+            await self._release_shards(redis, list(self.shards))
+            await redis.zrem(WORKERS_KEY, self.worker_id)
+        except Exception as e:
+            logger.warning(f"Failed to release tracker shards on shutdown: {e}")
+        self.shards.clear()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                # Leases still cover us until they expire; retry next beat
+                logger.error(f"Tracker heartbeat failed: {e}", exc_info=True)
+
+    async def heartbeat(self) -> Set[int]:
+        """
+        Renew leases and rebalance towards this worker's fair share.
+
+        Returns:
+            The shards this worker owns afterwards.
+        """
+        redis = await get_redis_client()
+        if self._renew is None:
+            self._renew = redis.register_script(RENEW_LUA)
+        renew = self._renew
+        now = time.time()
+        lease_ms = int(self.lease_seconds * 1000)
+
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(WORKERS_KEY, {self.worker_id: now})
+            pipe.zremrangebyscore(WORKERS_KEY, "-inf", now - self.lease_seconds)
+            pipe.zcard(WORKERS_KEY)
+            _, _, live_workers = await pipe.execute()
+
+        owned = sorted(self.shards)
+        renewed = []
+        if owned:  # one round trip for all leases
+            renewed = await renew(keys=[lease_key(shard) for shard in owned], args=[self.worker_id, lease_ms])
+        lost = {shard for shard, ok in zip(owned, renewed) if not ok}
+        if lost:
+            logger.warning(f"Tracker worker {self.worker_id} lost shards {sorted(lost)}.")
+        self.shards -= lost
+
+        fair_share = math.ceil(self.shard_count / max(1, live_workers))
+        if len(self.shards) > fair_share:
+            surplus = random.sample(sorted(self.shards), len(self.shards) - fair_share)
+            await self._release_shards(redis, surplus)
+            self.shards -= set(surplus)
+        elif len(self.shards) < fair_share:
+            free = [s for s in range(self.shard_count) if s not in self.shards]
+            random.shuffle(free)
+            for shard in free:
+                if len(self.shards) >= fair_share:
+                    break
+                if await redis.set(lease_key(shard), self.worker_id, nx=True, px=lease_ms):
+                    self.shards.add(shard)
+        return self.shards
+
+    async def _release_shards(self, redis, shards: List[int]) -> None:
+        if self._release is None:
+            self._release = redis.register_script(RELEASE_LUA)
+        release = self._release
+        if shards:
+            await release(keys=[lease_key(shard) for shard in shards], args=[self.worker_id])
@@ -0,0 +1,214 @@
+import asyncio
+import contextlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union, cast
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from backend.app.models.admin import Job
+from backend.app.models.product import Product
+from backend.app.services.tracker_service import TrackerService
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SWEEP_JOB_TYPE = "track_products"
+# A sweep is only taken over once its heartbeat is older than both
+# ``stale_after`` and this many times its slowest chunk
+STALE_CHUNKS = 3
+
+
+class TrackingSweep:
+    """
+    A full, resumable tracking pass over every non-archived product.
+
+    Products are walked in primary-key order (keyset pagination, never
+    OFFSET). After each chunk the last tracked id is checkpointed in the
+    sweep's ``jobs`` row, together with progress and an ETA, so a sweep
+    interrupted by a crash or deploy resumes after the last finished
+    chunk instead of starting over. At most one chunk is tracked twice.
+
+    While it runs, the owner refreshes the row's ``updated_at`` every
+    ``heartbeat_every`` seconds from its own session, so a slow chunk is
+    not mistaken for a dead sweep. Job.result while running looks like::
+
+        {"cursor": 81234, "processed": 81000, "changed": 950, "total": 200000,
+         "progress": 40.5, "eta_seconds": 9120, "chunk_seconds": 41.7}
+    """
+
+    def __init__(
+        self,
+        tracker: Optional[TrackerService] = None,
+        chunk_size: int = settings.TRACKER_CHUNK_SIZE,
+        stale_after: float = settings.TRACKER_SWEEP_STALE_SECONDS,
+        heartbeat_every: Optional[float] = None,
+    ):
+        self.tracker = tracker or TrackerService()
+        self.chunk_size = chunk_size
+        self.stale_after = stale_after
+        self.heartbeat_every = heartbeat_every or stale_after / STALE_CHUNKS
+
+    async def run(self, db: AsyncSession) -> Optional[Job]:
+        """
+        Resume the unfinished sweep, or start a new one, and run it to the end.
+
+        Returns:
+            The finished sweep job, or None if another process is running
+            a sweep (its heartbeat is younger than ``stale_after``).
+        """
+        bind = db.bind
+        if bind is None:
+            raise ValueError("TrackingSweep needs a session bound to an engine")
+        job = await self._claim(db)
+        if job is None:
+            logger.info("Another tracking sweep is in progress, not starting one.")
+            return None
+
+        heartbeat = asyncio.create_task(self._heartbeat(bind, cast(int, job.id)))
+        try:
+            return await self._sweep(db, job, heartbeat)
+        finally:
+            await self._stop(heartbeat)
+
+    async def _sweep(self, db: AsyncSession, job: Job, heartbeat: asyncio.Task) -> Job:
+        state = dict(job.result or {})
+        cursor = state.get("cursor", 0)
+        processed = state.get("processed", 0)
+        changed = state.get("changed", 0)
+        if cursor:
+            logger.info(f"Resuming tracking sweep {job.id} after product {cursor} ({processed}/{state.get('total')}).")
+        started = time.monotonic()
+        processed_at_start = processed
+        job_id = job.id
+        job_state = state
+
+        while True:
+            ids = (
+                await db.execute(
+                    select(Product.id)
+                    .where(Product.id > cursor, Product.is_archived.is_(False))
+                    .order_by(Product.id)
+                    .limit(self.chunk_size)
+                )
+            ).scalars().all()
+            if not ids:
+                break
+            chunk_started = time.monotonic()
+            try:
+                events = await self.tracker.track_multiple_products(list(ids), db, chunk_size=self.chunk_size)
+            except Exception as e:
+                # Keep the checkpoint; clearing the heartbeat lets the next
+                # run resume straight away instead of waiting for staleness
+                await self._stop(heartbeat)
+                await db.rollback()
+                await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id)
+                    .values(error_message=str(e), result=job_state, updated_at=None)
+                )
+                await db.commit()
+                raise
+
+            cursor = ids[-1]
+            processed += len(ids)
+            changed += len(events)
+            rate = (processed - processed_at_start) / max(time.monotonic() - started, 1e-6)
+            total = max(state["total"], processed)
+            job_state = {
+                **state,
+                "cursor": cursor,
+                "processed": processed,
+                "changed": changed,
+                "total": total,
+                "progress": round(100 * processed / total, 1) if total else 100.0,
+                "eta_seconds": round((total - processed) / rate) if rate else None,
+                "chunk_seconds": round(max(state.get("chunk_seconds", 0), time.monotonic() - chunk_started), 1),
+            }
+            await db.execute(update(Job).where(Job.id == job_id).values(result=job_state))
+            await db.commit()
+
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status="SUCCESS",
+                completed_at=datetime.now(timezone.utc),
+                result={**job_state, "progress": 100.0, "eta_seconds": 0},
+            )
+        )
+        await db.commit()
+        await db.refresh(job)
+        logger.info(f"Tracking sweep {job_id} finished: {processed} products, {changed} changed.")
+        return job
+
+    async def _heartbeat(self, bind: Union[AsyncEngine, AsyncConnection], job_id: int) -> None:
+        """Refresh the sweep's ``updated_at`` until cancelled"""
+        while True:
+            await asyncio.sleep(self.heartbeat_every)
+            try:
+                async with AsyncSession(bind) as db:
+                    await db.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == "RUNNING")
+                        .values(updated_at=datetime.now(timezone.utc))
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Tracking sweep {job_id} heartbeat failed: {e}")
+
+    @staticmethod
+    async def _stop(heartbeat: asyncio.Task) -> None:
+        heartbeat.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await heartbeat
+
+    async def _claim(self, db: AsyncSession) -> Optional[Job]:
+        """The RUNNING sweep job if its owner died, a new one if none, else None."""
+        job = (
+            await db.execute(
+                select(Job)
+                .where(Job.type == SWEEP_JOB_TYPE, Job.status == "RUNNING")
+                .order_by(Job.id.desc())
+                .limit(1)
+                .with_for_update()
+            )
+        ).scalar_one_or_none()
+
+        now = datetime.now(timezone.utc)
+        if job is not None:
+            heartbeat = job.updated_at
+            if heartbeat is not None and heartbeat.tzinfo is None:
+                heartbeat = heartbeat.replace(tzinfo=timezone.utc)  # SQLite drops the offset
+            stale_after = max(self.stale_after, STALE_CHUNKS * (job.result or {}).get("chunk_seconds", 0))
+            if heartbeat is not None and now - heartbeat < timedelta(seconds=stale_after):
+                await db.rollback()
+                return None
+            await db.execute(update(Job).where(Job.id == job.id).values(updated_at=now))
+            await db.commit()
+            return job
+
+        total = (
+            await db.execute(
+                select(func.count()).select_from(Product).where(Product.is_archived.is_(False))
+            )
+        ).scalar_one()
+        job = Job(
+            type=SWEEP_JOB_TYPE,
+            status="RUNNING",
+            params={"chunk_size": self.chunk_size},
+            result={"cursor": 0, "processed": 0, "changed": 0, "total": total},
+            started_at=now,
+            updated_at=now,
+        )
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Another process started a sweep since the select (uq_jobs_running_sweep)
+            await db.rollback()
+            return None
+        return job
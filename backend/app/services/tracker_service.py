@@ -1,27 +1,57 @@
 import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Row, bindparam, func, insert, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from backend.app.models.product import Product, PriceHistory, StockHistory
-from backend.app.scrapers.registry import get_scraper
+from backend.app.models.product import Product, PriceHistory, StockHistory, Supplier
+from backend.app.scrapers.base import Product as ScrapedProduct, PageFingerprint, ScrapeResult
+from backend.app.scrapers.registry import ScraperRegistry
+from backend.app.services.change_stream import ChangeEventPublisher
+from backend.app.services.history_writer import HistoryWriter
 from backend.app.services.schemas import ProductChangeEvent
 from backend.app.core.exceptions import ScrapingError
+from backend.app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# PriceHistory.price_change_percent is DECIMAL(5, 2)
+MAX_CHANGE_PERCENT = Decimal("999.99")
+
+
 class TrackerService:
+    def __init__(
+        self,
+        history_writer: Optional[HistoryWriter] = None,
+        publisher: Optional[ChangeEventPublisher] = None,
+    ):
+        """
+        Args:
+            history_writer: If given, history rows are buffered and bulk
+                written by it instead of inserted in the tracking
+                transaction. Long-running workers should pass one.
+            publisher: Where committed change events are published
+                (the ``tracker:changes`` stream by default).
+        """
+        self.history_writer = history_writer
+        self.publisher = publisher or ChangeEventPublisher()
+
     async def track_product(
         self, product_id: int, db: AsyncSession
     ) -> Optional[ProductChangeEvent]:
         """
         Track price and stock changes for a single product.
 
+        If the supplier page is unchanged since the last check (same
+        fingerprint), returns None without parsing the page. A freshly
+        scraped page is applied to every product tracking the same
+        supplier item, whichever user owns it.
+
         Args:
             product_id: The ID of the product to track.
             db: The database session.
@@ -32,96 +62,303 @@ class TrackerService:
         Raises:
             ScrapingError: If the scraper fails to fetch the product data.
         """
-        stmt = (
-            select(Product)
-            .where(Product.id == product_id)
-            .options(
-                selectinload(Product.price_history), selectinload(Product.stock_history)
-            )
-        )
-        result = await db.execute(stmt)
-        product = result.scalars().first()
+        rows = (await db.execute(self._tracking_rows([product_id]))).all()
+        row = next((r for r in rows if r.id == product_id), None)
 
-        if not product:
+        if not row:
             logger.warning(f"Product with id {product_id} not found for tracking.")
             return None
 
         try:
-            scraper = get_scraper(product.supplier.name)
-            scraped_product = await scraper.get_product(product.asin)
+            scraper = ScraperRegistry.configure_from_supplier(row.Supplier)
+            scraped_product, fingerprint = await scraper.fetch_product_if_changed(
+                row.asin,
+                self._fingerprint(row),
+                max_staleness=settings.TRACKER_MAX_STALENESS_SECONDS,
+            )
         except Exception as e:
             logger.error(
                 f"Scraping failed for product {product_id}: {e}", exc_info=True
             )
             raise ScrapingError(f"Failed to scrape product {product_id}") from e
 
-        old_price = product.price
-        new_price = scraped_product.price
-        price_changed = old_price != new_price
+        change_events = []
+        if scraped_product is None:
+            logger.debug(f"Product {product_id} unchanged since last check.")
+            scraped = {product_id: fingerprint}
+        else:
+            change_events = [e for e in (self._diff(r, scraped_product) for r in rows) if e]
+            scraped = {r.id: fingerprint for r in rows}
+        await self._write_changes(change_events, scraped, db)
+        await db.commit()
+        await self.publisher.publish(change_events)
+        return next((e for e in change_events if e.product_id == product_id), None)
 
-        old_stock = product.stock
-        new_stock = scraped_product.stock
-        stock_changed = old_stock != new_stock
+    async def track_multiple_products(
+        self,
+        product_ids: List[int],
+        db: AsyncSession,
+        concurrency: Optional[int] = None,
+        chunk_size: int = settings.TRACKER_CHUNK_SIZE,
+    ) -> List[ProductChangeEvent]:
+        """
+        Track price and stock changes for multiple products.
 
-        if not price_changed and not stock_changed:
-            return None
+        Works in chunks of ``chunk_size`` products. Per chunk: one query
+        loads the tracked columns and suppliers of the products and of
+        every other user's product tracking the same supplier items,
+        every supplier is scraped concurrently through its
+        ``get_products`` batch API (adaptive concurrency, rate limited)
+        with each supplier item fetched once, diffs are computed in memory,
+        and history rows and product updates are written with one bulk
+        statement each, followed by a single commit. The session is only
+        used between scrapes, never concurrently. Items whose page
+        fingerprint is unchanged are not parsed. A failed scrape is logged
+        and skipped. Each chunk's changes are published to the change
+        stream once committed.
 
-        change_event = ProductChangeEvent(
-            product_id=product_id,
-            has_price_change=price_changed,
-            old_price=old_price,
-            new_price=new_price,
-            has_stock_change=stock_changed,
-            old_stock=old_stock,
-            new_stock=new_stock,
-        )
+        Args:
+            product_ids: A list of product IDs to track.
+            db: The database session.
+            concurrency: Max in-flight scrapes per supplier (scraper default if None).
+            chunk_size: Products loaded, scraped and written per round.
 
-        if price_changed:
-            price_history_entry = PriceHistory(
-                product_id=product_id,
-                old_price=old_price,
-                new_price=new_price,
-                price_change_percent=self.get_price_change_percent(
-                    old_price, new_price
-                ),
+        Returns:
+            A list of ProductChangeEvents for products with changes,
+            including other products that share a supplier item.
+        """
+        change_events = []
+        for start in range(0, len(product_ids), chunk_size):
+            change_events += await self._track_chunk(
+                product_ids[start:start + chunk_size], db, concurrency
             )
-            db.add(price_history_entry)
-            product.price = new_price
+        return change_events
 
-        if stock_changed:
-            stock_history_entry = StockHistory(
-                product_id=product_id, old_stock=old_stock, new_stock=new_stock
+    async def _track_chunk(
+        self, product_ids: List[int], db: AsyncSession, concurrency: Optional[int]
+    ) -> List[ProductChangeEvent]:
+        """
+        Run one load / scrape / bulk-write round of ``track_multiple_products``.
+        """
+        rows = (await db.execute(self._tracking_rows(product_ids))).all()
+
+        # supplier name -> supplier item id -> rows of products tracking that item
+        by_supplier: Dict[str, Dict[str, List[Row]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        suppliers = {}
+        for row in rows:
+            suppliers[row.Supplier.name] = row.Supplier
+            by_supplier[row.Supplier.name][row.asin].append(row)
+
+        previous = {row.id: self._fingerprint(row) for row in rows}
+        scrapes = await asyncio.gather(
+            *(
+                self._scrape_supplier(suppliers[name], by_item, previous, concurrency)
+                for name, by_item in by_supplier.items()
             )
-            db.add(stock_history_entry)
-            product.stock = new_stock
+        )
+
+        change_events = []
+        scraped: Dict[int, Optional[PageFingerprint]] = {}
+        for by_item, results in zip(by_supplier.values(), scrapes):
+            for scrape in results:
+                for row in by_item[scrape.product_id]:
+                    scraped[row.id] = scrape.fingerprint
+                    if scrape.product is None:  # page unchanged
+                        continue
+                    change_event = self._diff(row, scrape.product)
+                    if change_event:
+                        change_events.append(change_event)
 
+        await self._write_changes(change_events, scraped, db)
         await db.commit()
-        return change_event
+        await self.publisher.publish(change_events)
+        return change_events
 
-    async def track_multiple_products(
-        self, product_ids: List[int], db: AsyncSession
-    ) -> List[ProductChangeEvent]:
+    async def _scrape_supplier(
+        self,
+        supplier: Supplier,
+        by_item: Dict[str, List[Row]],
+        previous: Dict[int, Optional[PageFingerprint]],
+        concurrency: Optional[int],
+    ) -> List[ScrapeResult]:
+        """
+        Scrape one supplier's items, returning the successful results.
+        """
+        scraper = ScraperRegistry.configure_from_supplier(supplier)
+        item_fingerprints: Dict[str, PageFingerprint] = {}
+        for item_id, rows in by_item.items():
+            # Only skip an item if every product tracking it saw the same page
+            seen = {previous.get(row.id) for row in rows}
+            fingerprint = seen.pop() if len(seen) == 1 else None
+            if fingerprint is not None:
+                item_fingerprints[item_id] = fingerprint
+
+        results = []
+        async for scrape in scraper.get_products(
+            list(by_item),
+            concurrency=concurrency,
+            fingerprints=item_fingerprints,
+            max_staleness=settings.TRACKER_MAX_STALENESS_SECONDS,
+        ):
+            if not scrape.ok:
+                logger.error(
+                    f"Scraping failed for {supplier.name} item {scrape.product_id}: {scrape.error}"
+                )
+                continue
+            results.append(scrape)
+        return results
+
+    @staticmethod
+    def _tracking_rows(product_ids: List[int]):
         """
-        Track price and stock changes for multiple products in parallel.
+        Select just the columns tracking needs, plus the supplier, in one query.
+
+        Besides the requested products, selects every non-archived product
+        tracking the same supplier item ((supplier_id, asin), whichever
+        user owns it), so each item is scraped once and the result fans
+        out to all of them.
+
+        Only the latest observation stored on the product is read, never
+        its price or stock history, so a check costs the same however
+        long the product has been tracked.
+        """
+        items = select(Product.supplier_id, Product.asin).where(Product.id.in_(product_ids))
+        return (
+            select(
+                Product.id,
+                Product.asin,
+                Product.price,
+                Product.stock,
+                Product.page_fingerprint,
+                Supplier,
+            )
+            .join(Product.supplier)
+            .where(
+                tuple_(Product.supplier_id, Product.asin).in_(items),
+                or_(Product.id.in_(product_ids), Product.is_archived.is_(False)),
+            )
+        )
+
+    @staticmethod
+    def _fingerprint(row: Row) -> Optional[PageFingerprint]:
+        """
+        The fingerprint of the page a tracking row was last scraped from.
+        """
+        if not row.page_fingerprint:
+            return None
+        return PageFingerprint.model_validate(row.page_fingerprint)
+
+    def _diff(self, row: Row, scraped_product: ScrapedProduct) -> Optional[ProductChangeEvent]:
+        """
+        Compare a scraped product with the stored price and stock.
 
         Args:
-            product_ids: A list of product IDs to track.
-            db: The database session.
+            row: The stored product's tracking row (id, price, stock).
+            scraped_product: Freshly scraped supplier data.
 
         Returns:
-            A list of ProductChangeEvents for products with changes.
+            A ProductChangeEvent if changes are detected, otherwise None.
         """
-        tasks = [self.track_product(product_id, db) for product_id in product_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # A page without a price (e.g. unavailable) says nothing about it
+        price_changed = scraped_product.price is not None and row.price != scraped_product.price
+        stock_changed = row.stock != scraped_product.stock
+        if not price_changed and not stock_changed:
+            return None
 
-        change_events = []
-        for result in results:
-            if isinstance(result, ProductChangeEvent):
-                change_events.append(result)
-            elif isinstance(result, Exception):
-                logger.error(f"Error tracking product: {result}", exc_info=result)
+        return ProductChangeEvent(
+            product_id=row.id,
+            has_price_change=price_changed,
+            old_price=row.price,
+            new_price=scraped_product.price if scraped_product.price is not None else row.price,
+            has_stock_change=stock_changed,
+            old_stock=row.stock,
+            new_stock=scraped_product.stock,
+        )
 
-        return change_events
+    async def _write_changes(
+        self,
+        change_events: List[ProductChangeEvent],
+        scraped: Dict[int, Optional[PageFingerprint]],
+        db: AsyncSession,
+    ) -> None:
+        """
+        Persist a batch of changes with one statement per table.
+
+        Inserts all PriceHistory and StockHistory rows (or hands them to
+        the history writer), updates the latest
+        observation of changed products (price, stock, previous price and
+        change times; executemany by primary key), and stamps
+        ``last_scraped_at`` and the page fingerprint on every scraped
+        product. Products served from the scrape cache have no fingerprint
+        and keep the stored one. The caller commits.
+
+        Args:
+            change_events: Changes detected in this batch.
+            scraped: Page fingerprint of every product scraped successfully
+                (None for cache hits).
+            db: The database session.
+        """
+        price_rows = [
+            {
+                "product_id": e.product_id,
+                "old_price": e.old_price,
+                "new_price": e.new_price,
+                "price_change_percent": (
+                    self.get_price_change_percent(e.old_price, e.new_price)
+                    if e.old_price and e.new_price is not None
+                    else None
+                ),
+            }
+            for e in change_events
+            if e.has_price_change
+        ]
+        stock_rows = [
+            {"product_id": e.product_id, "old_stock": e.old_stock, "new_stock": e.new_stock}
+            for e in change_events
+            if e.has_stock_change
+        ]
+        if self.history_writer is not None:
+            await self.history_writer.add(price_rows, stock_rows)
+        else:
+            if price_rows:
+                await db.execute(insert(PriceHistory), price_rows)
+            if stock_rows:
+                await db.execute(insert(StockHistory), stock_rows)
+        if change_events:
+            now = datetime.now(timezone.utc)
+            snapshots = []
+            for e in change_events:
+                snapshot: Dict[str, Any] = {"id": e.product_id, "price": e.new_price, "stock": e.new_stock}
+                if e.has_price_change:
+                    snapshot.update(previous_price=e.old_price, price_changed_at=now)
+                if e.has_stock_change:
+                    snapshot.update(stock_changed_at=now)
+                snapshots.append(snapshot)
+            await db.execute(update(Product), snapshots)
+        products = Product.__table__
+        fingerprinted = [
+            {"product_id": pid, "fingerprint": fingerprint.model_dump()}
+            for pid, fingerprint in scraped.items()
+            if fingerprint is not None
+        ]
+        if fingerprinted:
+            await db.execute(
+                update(products)
+                .where(products.c.id == bindparam("product_id"))
+                .values(page_fingerprint=bindparam("fingerprint"), last_scraped_at=func.now()),
+                fingerprinted,
+            )
+        # Served from the scrape cache: no page was seen, keep the stored fingerprint
+        cached = [{"product_id": pid} for pid, fingerprint in scraped.items() if fingerprint is None]
+        if cached:
+            await db.execute(
+                update(products)
+                .where(products.c.id == bindparam("product_id"))
+                .values(last_scraped_at=func.now()),
+                cached,
+            )
 
     def get_price_change_percent(
         self, old_price: Decimal, new_price: Decimal
@@ -134,8 +371,12 @@ class TrackerService:
             new_price: The new price.
 
         Returns:
-            The percentage change.
+            The percentage change, rounded to cents and clamped to
+            +/-``MAX_CHANGE_PERCENT`` so it fits the history column.
         """
         if old_price == 0:
-            return Decimal("inf") if new_price > 0 else Decimal(0)
-        return ((new_price - old_price) / old_price) * 100
+            percent = MAX_CHANGE_PERCENT if new_price > 0 else Decimal(0)
+        else:
+            percent = ((new_price - old_price) / old_price) * 100
+        percent = max(-MAX_CHANGE_PERCENT, min(MAX_CHANGE_PERCENT, percent))
+        return percent.quantize(Decimal("0.01"))
@@ -0,0 +1,198 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, case, func, select, update
+from ..config import settings
+from ..models.admin import ProxyPool
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_HEALTH = 100
+SUCCESS_REWARD = 1
+SLOW_PENALTY = 2
+FAILURE_PENALTY = 10
+BLOCK_PENALTY = 25
+
+
+class ProxyState:
+    """In-memory health of one ProxyPool row, plus changes not yet written back"""
+
+    def __init__(self, row):
+        self.id = row.id
+        auth = f"{row.username}:{row.password}@" if row.username else ""
+        self.url = f"{row.protocol}://{auth}{row.host}:{row.port}"
+        self.health_score = row.health_score
+        self.health_delta = 0  # change to health_score since the last flush
+        self.latency: Optional[float] = None  # EWMA, seconds
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0  # monotonic time
+        self.successes = 0
+        self.failures = 0
+        self.last_checked_at: Optional[datetime] = None
+        self.last_failed_at: Optional[datetime] = None
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.successes or self.failures or self.health_delta)
+
+    def adjust_health(self, delta: int) -> None:
+        new_health = max(0, min(MAX_HEALTH, self.health_score + delta))
+        self.health_delta += new_health - self.health_score
+        self.health_score = new_health
+
+    def __repr__(self) -> str:
+        return f"<ProxyState id={self.id} health={self.health_score}>"
+
+
+class ProxyManager:
+    """Weighted proxy rotation backed by the proxy_pool table
+
+    Proxies are picked at random weighted by health score. Every request
+    reports its outcome through ``record_success``/``record_failure``; a
+    proxy that keeps failing (or drops below ``SCRAPER_PROXY_MIN_HEALTH``)
+    is taken out of rotation for a cooldown that doubles on each strike.
+
+    Health and counters live in memory and are written back to the table
+    in one batched UPDATE every ``SCRAPER_PROXY_FLUSH_SECONDS``, which also
+    reloads the pool to pick up added or deactivated proxies. Health is
+    written as the change since the last flush, so workers sharing a proxy
+    add up their observations instead of overwriting each other's.
+    """
+
+    def __init__(self):
+        self._proxies: Dict[int, ProxyState] = {}
+        self._session_maker = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self, session_maker) -> None:
+        """Load active proxies and start the periodic write-back"""
+        self._session_maker = session_maker
+        await self.load()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the write-back loop and flush pending stats"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def load(self) -> None:
+        """(Re)load active proxies, keeping in-memory state for known ones"""
+        table = ProxyPool.__table__
+        async with self._session_maker() as db:
+            result = await db.execute(select(table).where(table.c.is_active.is_(True)))
+            rows = result.all()
+
+        proxies = {}
+        for row in rows:
+            state = self._proxies.get(row.id)
+            if state is None:
+                state = ProxyState(row)
+            elif not state.dirty:
+                state.health_score = row.health_score  # pick up other workers' view
+            proxies[row.id] = state
+        self._proxies = proxies
+        logger.info(f"Loaded {len(proxies)} active proxies.")
+
+    def choose(self) -> Optional[ProxyState]:
+        """Pick a proxy weighted by health, or None if none are available"""
+        now = time.monotonic()
+        candidates = [p for p in self._proxies.values() if p.cooldown_until <= now]
+        if not candidates:
+            return None
+        weights = [max(p.health_score, 1) for p in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def record_success(self, proxy: ProxyState, latency: float) -> None:
+        proxy.successes += 1
+        proxy.consecutive_failures = 0
+        proxy.latency = latency if proxy.latency is None else 0.8 * proxy.latency + 0.2 * latency
+        penalty = SLOW_PENALTY if latency > settings.SCRAPER_PROXY_SLOW_SECONDS else 0
+        proxy.adjust_health(SUCCESS_REWARD - penalty)
+        proxy.last_checked_at = datetime.now(timezone.utc)
+
+    def record_failure(self, proxy: ProxyState, blocked: bool = False) -> None:
+        """Record a failed request; ``blocked`` for captcha/403/503 responses"""
+        now = datetime.now(timezone.utc)
+        proxy.failures += 1
+        proxy.consecutive_failures += 1
+        proxy.adjust_health(-(BLOCK_PENALTY if blocked else FAILURE_PENALTY))
+        proxy.last_checked_at = now
+        proxy.last_failed_at = now
+
+        if blocked or proxy.consecutive_failures >= 3 or proxy.health_score < settings.SCRAPER_PROXY_MIN_HEALTH:
+            strikes = max(proxy.consecutive_failures, 1)
+            cooldown = min(settings.SCRAPER_PROXY_COOLDOWN_SECONDS * 2 ** (strikes - 1), 3600)
+            proxy.cooldown_until = time.monotonic() + cooldown
+            logger.warning(f"Proxy {proxy.id} cooling down for {cooldown}s (health {proxy.health_score}).")
+
+    async def flush(self) -> None:
+        """Write health and counters of every touched proxy in one statement"""
+        dirty = [p for p in self._proxies.values() if p.dirty]
+        if not dirty or self._session_maker is None:
+            return
+
+        rows: List[dict] = [
+            {
+                "proxy_id": p.id,
+                "health_delta": p.health_delta,
+                "successes": p.successes,
+                "failures": p.failures,
+                "checked_at": p.last_checked_at,
+                "failed_at": p.last_failed_at,
+            }
+            for p in dirty
+        ]
+        table = ProxyPool.__table__
+        new_health = table.c.health_score + bindparam("health_delta")
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("proxy_id"))
+            .values(
+                health_score=case((new_health < 0, 0), (new_health > MAX_HEALTH, MAX_HEALTH), else_=new_health),
+                success_count=table.c.success_count + bindparam("successes"),
+                failure_count=table.c.failure_count + bindparam("failures"),
+                last_checked_at=bindparam("checked_at"),
+                last_failed_at=func.coalesce(bindparam("failed_at"), table.c.last_failed_at),
+            )
+        )
+        async with self._session_maker() as db:
+            await db.execute(stmt, rows)
+            await db.commit()
+
+        # Outcomes recorded while the UPDATE was in flight stay pending
+        for p, row in zip(dirty, rows):
+            p.successes -= row["successes"]
+            p.failures -= row["failures"]
+            p.health_delta -= row["health_delta"]
+        logger.info(f"Flushed stats of {len(rows)} proxies.")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SCRAPER_PROXY_FLUSH_SECONDS)
+            try:
+                await self.flush()
+                await self.load()
+            except Exception as e:
+                logger.error(f"Proxy stats flush failed: {e}", exc_info=True)
+
+
+_proxy_manager = ProxyManager()
+
+
+def get_proxy_manager() -> ProxyManager:
+    return _proxy_manager
+
+
+async def get_healthy_proxy() -> Optional[ProxyState]:
+    """Pick a healthy proxy from the pool, or None to connect directly"""
+    return _proxy_manager.choose()
@@ -1,96 +1,123 @@
 import asyncio
-import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.redis import get_redis_client
-from app.scrapers.registry import get_scraper
-from app.core.database import get_db
-from app.models.product import Product as DBProduct, PriceHistory, StockHistory
-from app.models.admin import Job as DBJob
-from app.core.logging import logger
-
-async def scraper_worker():
+from backend.app.config import settings
+from backend.app.core.redis import get_redis_client
+from backend.app.scrapers.registry import ScraperRegistry, get_scraper
+from backend.app.core.database import get_db, init_db, close_db
+from backend.app.utils.proxy_manager import get_proxy_manager
+from backend.app.models.product import Product as DBProduct
+from backend.app.models.admin import Job as DBJob
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def scraper_worker(batch_size: int = settings.SCRAPER_WORKER_BATCH_SIZE):
     """
     Worker that processes scraping jobs from the Redis queue.
+
+    Up to ``batch_size`` jobs are read at once and scraped together through
+    ``get_products``, so a burst of imports is fetched concurrently within the
+    scraper's rate limit.
     """
     redis = await get_redis_client()
-    db: AsyncSession = await anext(get_db())
+    engine, session_maker = await init_db()
+    db: AsyncSession = await anext(get_db(session_maker))
+
+    await get_proxy_manager().start(session_maker)
+    await ScraperRegistry.open_all()
+    logger.info(f"Scraper worker started with batch size {batch_size}.")
+    try:
+        await _process_jobs(redis, db, batch_size)
+    finally:
+        await ScraperRegistry.close_all()
+        await get_proxy_manager().stop()
+        await close_db(engine)
 
-    logger.info("scraper_worker_started")
+async def _process_jobs(redis, db: AsyncSession, batch_size: int):
     while True:
         try:
             # Blocking read from the Redis stream
             job_data = await redis.xreadgroup(
-                "scrapers", "scraper_worker_1", {"scraper:amazon": ">"}, count=1, block=0
+                "scrapers", "scraper_worker_1", {"scraper:amazon": ">"}, count=batch_size, block=0
             )
 
             if not job_data:
                 continue
 
             stream, messages = job_data[0]
-            message_id, job_params = messages[0]
-
-            job_id = job_params.get("job_id")
-            asin = job_params.get("asin")
-            logger.info("scraper_job_received", job_id=job_id, asin=asin)
+            # Several jobs may ask for the same ASIN; each ASIN is scraped once
+            jobs: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+            for message_id, job_params in messages:
+                jobs[job_params.get("asin")].append((message_id, job_params.get("job_id")))
+                logger.info(f"Received scraper job {job_params.get('job_id')} for ASIN {job_params.get('asin')}.")
 
             # Update job status to RUNNING
             await db.execute(
-                update(DBJob).where(DBJob.id == job_id).values(status="RUNNING", started_at=datetime.utcnow())
+                update(DBJob).where(DBJob.id.in_([job_id for asin_jobs in jobs.values() for _, job_id in asin_jobs])).values(status="RUNNING", started_at=datetime.utcnow())
             )
             await db.commit()
 
-            try:
-                scraper = get_scraper("amazon") # Assuming amazon for now
-                product_data = await scraper.get_product(asin)
-
-                # Save product to DB
-                result = await db.execute(select(DBProduct).where(DBProduct.asin == asin))
-                db_product = result.scalar_one_or_none()
-
-                if db_product:
-                    # Update existing product
-                    db_product.title = product_data.title
-                    db_product.price = product_data.price
-                    db_product.stock = product_data.stock
-                    db_product.rating = product_data.rating
-                    db_product.reviews_count = product_data.reviews_count
-                    db_product.images = product_data.images
-                    db_product.url = product_data.url
-                    db_product.last_scraped_at = datetime.utcnow()
-                else:
-                    # Create new product
-                    db_product = DBProduct(**product_data.model_dump())
-                
-                db.add(db_product)
-                await db.commit()
-                await db.refresh(db_product)
-
-                # Update job status to SUCCESS
-                await db.execute(
-                    update(DBJob).where(DBJob.id == job_id).values(status="SUCCESS", result={"product_id": db_product.id}, completed_at=datetime.utcnow())
-                )
-                await db.commit()
-
-                # Acknowledge the job in Redis
-                await redis.xack(stream, "scrapers", message_id)
-                logger.info("scraper_job_success", job_id=job_id, product_id=db_product.id)
-
-            except Exception as e:
-                logger.error("scraper_job_failed", job_id=job_id, error=str(e))
-                # Update job status to FAILED
-                await db.execute(
-                    update(DBJob).where(DBJob.id == job_id).values(status="FAILED", error_message=str(e), completed_at=datetime.utcnow())
-                )
-                await db.commit()
+            scraper = get_scraper("amazon") # Assuming amazon for now
+            # Each product is saved as soon as its scrape completes
+            async for scrape in scraper.get_products(list(jobs)):
+                asin = scrape.product_id
+                for message_id, job_id in jobs[asin]:
+                    try:
+                        if not scrape.ok:
+                            raise scrape.error
+                        product_data = scrape.product
+
+                        # Save product to DB
+                        result = await db.execute(select(DBProduct).where(DBProduct.asin == asin))
+                        db_product = result.scalar_one_or_none()
+
+                        if db_product:
+                            # Update existing product
+                            db_product.title = product_data.title
+                            if product_data.price is not None:
+                                db_product.price = product_data.price
+                            db_product.stock = product_data.stock
+                            db_product.rating = product_data.rating
+                            db_product.reviews_count = product_data.reviews_count
+                            db_product.images = product_data.images
+                            db_product.url = product_data.url
+                            db_product.last_scraped_at = datetime.utcnow()
+                        else:
+                            # Create new product
+                            db_product = DBProduct(**product_data.model_dump())
+
+                        db.add(db_product)
+                        await db.commit()
+                        await db.refresh(db_product)
+
+                        # Update job status to SUCCESS
+                        await db.execute(
+                            update(DBJob).where(DBJob.id == job_id).values(status="SUCCESS", result={"product_id": db_product.id}, completed_at=datetime.utcnow())
+                        )
+                        await db.commit()
+
+                        # Acknowledge the job in Redis
+                        await redis.xack(stream, "scrapers", message_id)
+                        logger.info(f"Scraper job {job_id} saved product {db_product.id}.")
+
+                    except Exception as e:
+                        logger.error(f"Scraper job {job_id} failed: {e}")
+                        # Update job status to FAILED
+                        await db.execute(
+                            update(DBJob).where(DBJob.id == job_id).values(status="FAILED", error_message=str(e), completed_at=datetime.utcnow())
+                        )
+                        await db.commit()
 
         except Exception as e:
-            logger.error("scraper_worker_error", error=str(e))
+            logger.error(f"Scraper worker error: {e}")
             await asyncio.sleep(5) # Wait before retrying
         finally:
             await db.close()
 
 if __name__ == "__main__":
-    asyncio.run(scraper_worker())
-from datetime import datetime
-from sqlalchemy import update
+    asyncio.run(scraper_worker())
\ No newline at end of file
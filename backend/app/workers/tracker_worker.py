@@ -1,21 +1,101 @@
 import asyncio
-from app.services.tracker_service import track_all_products
-from app.core.logging import logger
+import time
+from backend.app.config import settings
+from backend.app.services.history_writer import HistoryWriter
+from backend.app.services.scheduler import TrackingScheduler
+from backend.app.services.sharding import ShardCoordinator
+from backend.app.services.sweep import TrackingSweep
+from backend.app.services.tracker_service import TrackerService
+from backend.app.scrapers.registry import ScraperRegistry
+from backend.app.core.database import init_db, close_db
+from backend.app.utils.proxy_manager import get_proxy_manager
+import logging
 
-async def tracker_worker(interval_seconds: int = 3600):
+logger = logging.getLogger(__name__)
+
+async def tracker_worker(
+    batch_size: int = settings.TRACKER_DISPATCH_BATCH_SIZE,
+    idle_seconds: float = 5.0,
+):
+    """
+    Worker that tracks products as their scheduled checks come due.
+
+    Each product's next check time lives in the TrackingScheduler; the
+    worker claims due products in batches, tracks them and reschedules
+    them based on what changed. Any number of workers can run side by
+    side: the ShardCoordinator gives each one a disjoint share of the
+    schedule's shards and rebalances as workers come and go.
+    """
+    engine, session_maker = await init_db()
+    await get_proxy_manager().start(session_maker)
+    await ScraperRegistry.open_all()
+    scheduler = TrackingScheduler()
+    history_writer = HistoryWriter(engine)
+    await history_writer.start()
+    tracker = TrackerService(history_writer=history_writer)
+    coordinator = ShardCoordinator()
+    await coordinator.start()
+    synced_at = float("-inf")
+    logger.info(f"Tracker worker {coordinator.worker_id} started (batch size {batch_size}).")
+    try:
+        while True:
+            try:
+                if time.monotonic() - synced_at >= settings.TRACKER_SYNC_INTERVAL_SECONDS:
+                    async with session_maker() as db:
+                        await scheduler.sync(db, shards=set(coordinator.shards))
+                    synced_at = time.monotonic()
+
+                product_ids = await scheduler.claim_due(batch_size, shards=set(coordinator.shards))
+                if not product_ids:
+                    await asyncio.sleep(idle_seconds)
+                    continue
+
+                started = time.time()
+                async with session_maker() as db:
+                    events = await tracker.track_multiple_products(product_ids, db)
+                    await scheduler.reschedule(
+                        product_ids, [e.product_id for e in events], db, checked_since=started
+                    )
+                logger.info(
+                    f"Tracked {len(product_ids)} products, {len(events)} changed, "
+                    f"in {time.time() - started:.1f}s."
+                )
+            except Exception as e:
+                logger.error(f"Tracker worker error: {e}", exc_info=True)
+                await asyncio.sleep(idle_seconds)
+    finally:
+        await coordinator.stop()
+        await history_writer.close()
+        await ScraperRegistry.close_all()
+        await get_proxy_manager().stop()
+        await close_db(engine)
+
+async def tracker_sweep():
     """
-    Worker that periodically tracks all products for changes.
+    Track every product once, resuming an interrupted sweep if there is one.
+
+    Progress and ETA are kept in the sweep's ``jobs`` row.
     """
-    logger.info("tracker_worker_started", interval_seconds=interval_seconds)
-    while True:
-        try:
-            await track_all_products()
-        except Exception as e:
-            logger.error("tracker_worker_error", error=str(e))
-        
-        logger.info("tracker_worker_sleeping", seconds=interval_seconds)
-        await asyncio.sleep(interval_seconds)
+    engine, session_maker = await init_db()
+    await get_proxy_manager().start(session_maker)
+    await ScraperRegistry.open_all()
+    history_writer = HistoryWriter(engine)
+    await history_writer.start()
+    try:
+        async with session_maker() as db:
+            job = await TrackingSweep(TrackerService(history_writer=history_writer)).run(db)
+        if job is not None:
+            logger.info(
+                f"Tracking sweep {job.id} finished: {job.result['processed']} products, "
+                f"{job.result['changed']} changed."
+            )
+    finally:
+        await history_writer.close()
+        await ScraperRegistry.close_all()
+        await get_proxy_manager().stop()
+        await close_db(engine)
 
 if __name__ == "__main__":
-    # Example of how to run the worker
-    asyncio.run(tracker_worker(interval_seconds=60))
+    import sys
+    # Example of how to run the worker; pass --sweep for a one-off full pass
+    asyncio.run(tracker_sweep() if "--sweep" in sys.argv else tracker_worker())
@@ -0,0 +1,78 @@
+"""
+Parser backend throughput benchmark.
+
+Parses the given HTML pages with every available BeautifulSoup backend in a
+single process and reports pages parsed per second on one core.
+
+Usage (from the repository root):
+    python -m backend.tests.benchmarks.bench_parsers [page.html ...] [--rounds N]
+
+Without page arguments the offline corpus product pages (tests/fixtures)
+plus a synthetic ~1 MB Amazon-like product page are used.
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from backend.app.scrapers.amazon import AmazonScraper
+from backend.app.scrapers.extraction import extract_product_html
+from backend.app.scrapers.parsing import PARSER_BACKENDS
+from backend.tests.corpus import load_corpus
+
+
+def synthetic_product_page(size_bytes: int = 1_000_000) -> bytes:
+    """Product page with the real markup at the top and filler below it."""
+    head = (
+        '<html><head><title>Amazon.com</title></head><body>'
+        '<div id="dp"><h1 id="title"><span id="productTitle"> Sony WH-1000XM5 </span></h1>'
+        '<span class="a-price"><span class="a-price-whole">348.</span></span>'
+        '<div id="availability"><span>In Stock</span></div></div>'
+    )
+    filler = (
+        '<div class="a-section"><ul><li><span class="a-list-item">'
+        'Lorem ipsum dolor sit amet</span></li></ul>'
+        '<img src="https://m.media-amazon.com/images/I/x.jpg" alt=""></div>'
+    )
+    body = head + filler * (size_bytes // len(filler))
+    return (body + "</body></html>").encode()
+
+
+def bench(pages: List[bytes], backend: str, rounds: int) -> float:
+    """Return pages parsed per second with ``backend``."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            extract_product_html(
+                html, "B000000000", "https://www.amazon.com/dp/B000000000", backend, AmazonScraper.extraction_config
+            )
+    return rounds * len(pages) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", type=Path)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [p.read_bytes() for p in args.pages] or [
+        *(page.html for page in load_corpus(kind="product")),
+        synthetic_product_page(),
+    ]
+    avg_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"{len(pages)} page(s), avg {avg_kb:.0f} KB, {args.rounds} round(s)")
+
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup("", backend)
+        except FeatureNotFound:
+            print(f"{backend:>12}: not installed")
+            continue
+        rate = bench(pages, backend, args.rounds)
+        print(f"{backend:>12}: {rate:8.1f} pages/s/core  ({1000 / rate:6.1f} ms/page)")
+
+
+if __name__ == "__main__":
+    main()
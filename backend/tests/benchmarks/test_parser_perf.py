@@ -0,0 +1,49 @@
+"""
+Parse latency and memory per page over the offline corpus.
+
+Runs with the normal test suite and prints a report (use ``pytest -s`` to
+see it). Each page must parse within PARSER_BENCH_P95_MS at the 95th
+percentile; the budget is loose so only real regressions fail CI.
+"""
+import os
+import statistics
+import time
+import tracemalloc
+
+import pytest
+
+from backend.app.scrapers.amazon import AmazonScraper
+from backend.tests.corpus import load_corpus, parse_page
+
+ROUNDS = int(os.environ.get("PARSER_BENCH_ROUNDS", "30"))
+P95_BUDGET_MS = float(os.environ.get("PARSER_BENCH_P95_MS", "250"))
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+@pytest.mark.parametrize("page", load_corpus(), ids=str)
+def test_parse_latency_and_memory(page):
+    backend = AmazonScraper.parser_backend
+    parse_page(page, backend)  # warm up imports and caches
+
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        parse_page(page, backend)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    parse_page(page, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = (_percentile(timings, p) for p in (50, 95, 99))
+    print(
+        f"\n{page} [{backend}] {len(page.html) / 1024:.0f} KB: "
+        f"p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms  "
+        f"mean {statistics.mean(timings):.2f} ms  peak {peak / 1024:.0f} KB"
+    )
+    assert p95 < P95_BUDGET_MS
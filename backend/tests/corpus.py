@@ -0,0 +1,79 @@
+"""
+Offline corpus of saved supplier pages with their expected extraction.
+
+Pages live in ``tests/fixtures/<supplier>/`` as ``product_<ID>.html`` or
+``search_<name>.html``, each next to a ``.json`` file holding what the
+parser is expected to extract from it.
+
+After an intended parser change, regenerate the expectations (from the
+repository root) and review the diff:
+    python -m backend.tests.corpus --update
+"""
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional
+
+from backend.app.scrapers.amazon import AmazonScraper
+from backend.app.scrapers.extraction import extract_product_html
+from backend.app.scrapers.parsing import DEFAULT_BACKEND
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@dataclass
+class CorpusPage:
+    path: Path
+    kind: str  # "product" or "search"
+    name: str  # product ID for product pages
+    html: bytes
+
+    @property
+    def expected_path(self) -> Path:
+        return self.path.with_suffix(".json")
+
+    def expected(self) -> Any:
+        return json.loads(self.expected_path.read_text())
+
+    def __str__(self) -> str:
+        return self.path.name
+
+
+def load_corpus(supplier: str = "amazon", kind: Optional[str] = None) -> List[CorpusPage]:
+    """All saved pages of a supplier, optionally only one ``kind``"""
+    pages = []
+    for path in sorted((FIXTURES_DIR / supplier).glob("*.html")):
+        page_kind, _, name = path.stem.partition("_")
+        if kind is None or page_kind == kind:
+            pages.append(CorpusPage(path, page_kind, name, path.read_bytes()))
+    return pages
+
+
+def parse_page(page: CorpusPage, backend: str = DEFAULT_BACKEND) -> Any:
+    """Run the Amazon parser over a page, returning JSON-compatible output"""
+    if page.kind == "product":
+        url = f"https://www.amazon.com/dp/{page.name}"
+        product = extract_product_html(page.html, page.name, url, backend, AmazonScraper.extraction_config)
+        return product.model_dump(mode="json")
+    products = AmazonScraper._parse_search_html(page.html, backend)
+    return [p.model_dump(mode="json") for p in products]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update", action="store_true", help="rewrite expected .json files")
+    args = parser.parse_args()
+
+    for page in load_corpus():
+        actual = parse_page(page)
+        if args.update:
+            page.expected_path.write_text(json.dumps(actual, indent=2, ensure_ascii=False) + "\n")
+            print(f"updated {page.expected_path.name}")
+        else:
+            status = "ok" if page.expected_path.exists() and page.expected() == actual else "DIFFERS"
+            print(f"{page}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import fakeredis.aioredis
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app.models import admin, listing, product, user  # noqa: F401  register every table
+from backend.app.models.base import Base
+
+
+@pytest.fixture
+def fake_redis():
+    """In-memory Redis (Lua scripting included) for modules that use get_redis_client"""
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def use_redis(monkeypatch, fake_redis):
+    """Point ``get_redis_client`` of the given modules at ``fake_redis``"""
+    async def get_redis_client():
+        return fake_redis
+
+    def patch(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "get_redis_client", get_redis_client)
+        return fake_redis
+
+    return patch
+
+
+@pytest_asyncio.fixture
+async def db_engine():
+    """In-memory SQLite database with every table created"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(db_engine):
+    async with async_sessionmaker(db_engine, expire_on_commit=False)() as session:
+        yield session
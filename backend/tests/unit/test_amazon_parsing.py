@@ -0,0 +1,48 @@
+"""Extraction over the offline corpus must match the checked-in expectations."""
+import pytest
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from backend.app.scrapers.amazon import AmazonScraper
+from backend.app.scrapers.parsing import PARSER_BACKENDS, make_soup
+from backend.tests.corpus import load_corpus, parse_page
+
+
+def _installed(backend: str) -> bool:
+    try:
+        BeautifulSoup("", backend)
+        return True
+    except FeatureNotFound:
+        return False
+
+
+BACKENDS = [b for b in PARSER_BACKENDS if _installed(b)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", load_corpus(), ids=str)
+def test_extraction_matches_expected(page, backend):
+    assert parse_page(page, backend) == page.expected()
+
+
+def test_corpus_covers_products_and_search():
+    kinds = {page.kind for page in load_corpus()}
+    assert kinds == {"product", "search"}
+
+
+def test_search_results_tolerate_unparsable_ratings_and_counts():
+    html = """
+    <div data-component-type="s-search-result" data-asin="B1">
+      <h2><span>Parsed</span></h2>
+      <span class="a-icon-alt">4.5 out of 5 stars</span>
+      <span aria-label="reviews"><span class="s-underline-text">(1,234)</span></span>
+    </div>
+    <div data-component-type="s-search-result" data-asin="B2">
+      <h2><span>New listing</span></h2>
+      <span class="a-icon-alt">New</span>
+      <span aria-label="reviews"><span class="s-underline-text">1.2K</span></span>
+    </div>
+    """
+    first, second = AmazonScraper._parse_search_results(make_soup(html))
+
+    assert (first.rating, first.reviews_count) == (4.5, 1234)
+    assert (second.asin, second.rating, second.reviews_count) == ("B2", None, None)
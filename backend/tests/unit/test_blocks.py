@@ -0,0 +1,31 @@
+"""Byte-level block page detection on saved Amazon pages."""
+import pytest
+
+from backend.app.core.exceptions import CaptchaDetected, ProductNotFound, SupplierBlocked
+from backend.app.scrapers.amazon import AMAZON_BLOCK_MARKERS
+from backend.app.scrapers.blocks import classify_page, raise_for_page
+from backend.tests.corpus import FIXTURES_DIR, load_corpus
+
+BLOCKED_DIR = FIXTURES_DIR / "amazon" / "blocked"
+
+
+@pytest.mark.parametrize("kind", ["captcha", "robot_check", "dog_page", "not_found"])
+def test_block_pages_are_recognized(kind):
+    body = (BLOCKED_DIR / f"{kind}.html").read_bytes()
+    assert classify_page(body, AMAZON_BLOCK_MARKERS) == kind
+
+
+@pytest.mark.parametrize("page", load_corpus(), ids=str)
+def test_regular_pages_pass(page):
+    assert classify_page(page.html, AMAZON_BLOCK_MARKERS) is None
+
+
+@pytest.mark.parametrize("kind, exc", [
+    ("captcha", CaptchaDetected),
+    ("robot_check", CaptchaDetected),
+    ("dog_page", SupplierBlocked),
+    ("not_found", ProductNotFound),
+])
+def test_typed_exceptions(kind, exc):
+    with pytest.raises(exc):
+        raise_for_page(kind, "amazon", "https://www.amazon.com/dp/B000000000")
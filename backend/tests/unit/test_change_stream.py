@@ -0,0 +1,105 @@
+"""Tracker change events on a Redis Stream with consumer groups."""
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from backend.app.services import change_stream
+from backend.app.services.change_stream import (
+    CHANGES_STREAM,
+    ChangeEventConsumer,
+    ChangeEventPublisher,
+    decode_event,
+    encode_event,
+)
+from backend.app.services.schemas import ProductChangeEvent
+
+
+def _event(product_id: int) -> ProductChangeEvent:
+    return ProductChangeEvent(
+        product_id=product_id,
+        has_price_change=True,
+        old_price=Decimal("10.00"),
+        new_price=Decimal("12.50"),
+        has_stock_change=False,
+    )
+
+
+@pytest.fixture
+def redis(use_redis):
+    return use_redis(change_stream)
+
+
+def _consumer(name: str, **kwargs) -> ChangeEventConsumer:
+    kwargs = {"block_ms": 10, "claim_idle_ms": 50, "start_id": "0", **kwargs}
+    return ChangeEventConsumer("policies", name, **kwargs)
+
+
+def test_events_round_trip_through_stream_fields():
+    event = _event(1)
+    fields = encode_event(event)
+    assert fields["has_stock_change"] == "0"
+    assert "old_stock" not in fields
+    assert decode_event(fields) == event
+
+
+@pytest.mark.asyncio
+async def test_publish_and_consume(redis):
+    await ChangeEventPublisher().publish([_event(1), _event(2)])
+    assert await redis.xlen(CHANGES_STREAM) == 2
+
+    consumer = _consumer("p1")
+    received = []
+    stop = asyncio.Event()
+
+    async def handler(events):
+        received.extend(events)
+        stop.set()
+
+    await asyncio.wait_for(consumer.consume(handler, stop), timeout=5)
+    assert [e.product_id for e in received] == [1, 2]
+    assert (await redis.xpending(CHANGES_STREAM, "policies"))["pending"] == 0
+    assert await consumer.read() == []
+
+    # Another group sees every event too
+    other = ChangeEventConsumer("repricer", "r1", block_ms=10, start_id="0")
+    assert [e.product_id for _, e in await other.read()] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_dead_consumers_events_are_reclaimed(redis):
+    await ChangeEventPublisher().publish([_event(1), _event(2)])
+    dead = _consumer("p1")
+    assert len(await dead.read()) == 2  # read, never acknowledged
+
+    survivor = _consumer("p2")
+    assert await survivor.read() == []  # still within claim_idle_ms
+    await asyncio.sleep(0.1)
+    reclaimed = await survivor.read()
+    assert [e.product_id for _, e in reclaimed] == [1, 2]
+
+    await survivor.ack([entry_id for entry_id, _ in reclaimed])
+    assert (await redis.xpending(CHANGES_STREAM, "policies"))["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_leaves_events_pending(redis):
+    await ChangeEventPublisher().publish([_event(1)])
+    consumer = _consumer("p1")
+    stop = asyncio.Event()
+
+    async def handler(events):
+        stop.set()
+        raise RuntimeError("handler crashed")
+
+    await asyncio.wait_for(consumer.consume(handler, stop), timeout=5)
+    assert (await redis.xpending(CHANGES_STREAM, "policies"))["pending"] == 1
+
+
+@pytest.mark.asyncio
+async def test_malformed_entries_are_acknowledged(redis):
+    await redis.xadd(CHANGES_STREAM, {"product_id": "not-a-number"})
+    await ChangeEventPublisher().publish([_event(3)])
+    consumer = _consumer("p1")
+    assert [e.product_id for _, e in await consumer.read()] == [3]
+    assert (await redis.xpending(CHANGES_STREAM, "policies"))["pending"] == 1
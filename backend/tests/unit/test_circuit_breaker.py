@@ -0,0 +1,88 @@
+"""Circuit breaker state shared through Redis."""
+import time
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from backend.app.core.exceptions import CircuitOpen, SupplierBlocked
+from backend.app.scrapers import circuit_breaker
+from backend.app.scrapers.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    kwargs = {"block_threshold": 2, "backoff": 30, "max_backoff": 600, "sync_interval": 0, **kwargs}
+    return CircuitBreaker("test", **kwargs)
+
+
+async def _fail(breaker, exc=SupplierBlocked):
+    with pytest.raises(exc):
+        async with breaker.guard():
+            raise exc("blocked")
+
+
+async def _expire(redis):
+    """Fast-forward past the open period"""
+    await redis.hset("breaker:test", "open_until", time.time() - 1)
+
+
+@pytest.mark.asyncio
+async def test_trip_half_open_and_close(use_redis):
+    redis = use_redis(circuit_breaker)
+    breaker = _breaker()
+
+    await _fail(breaker)
+    assert breaker.state == CLOSED
+    await _fail(breaker)
+    assert breaker.state == OPEN
+    assert await redis.hget("breaker:test", "strikes") == "1"
+
+    # Another worker sees the open circuit and fails fast
+    other = _breaker()
+    with pytest.raises(CircuitOpen):
+        async with other.guard():
+            pass
+
+    await _expire(redis)
+    async with breaker.guard():
+        assert breaker.state == HALF_OPEN
+        # Only one probe goes out fleet-wide
+        with pytest.raises(CircuitOpen):
+            async with other.guard():
+                pass
+    assert breaker.state == CLOSED
+    assert not await redis.exists("breaker:test", "breaker:test:probe")
+
+    async with other.guard():
+        pass
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_with_longer_backoff(use_redis, monkeypatch):
+    redis = use_redis(circuit_breaker)
+    monkeypatch.setattr(circuit_breaker.random, "random", lambda: 1.0)  # no jitter
+    breaker = _breaker()
+    await _fail(breaker)
+    await _fail(breaker)
+    first = breaker.snapshot()["retry_in"]
+
+    await _expire(redis)
+    await _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["strikes"] == 2
+    assert breaker.snapshot()["retry_in"] > first
+    assert not await redis.exists("breaker:test:probe")
+
+
+@pytest.mark.asyncio
+async def test_trips_on_local_state_without_redis(monkeypatch):
+    async def unavailable():
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(circuit_breaker, "get_redis_client", unavailable)
+    breaker = _breaker()
+    await _fail(breaker)
+    await _fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        async with breaker.guard():
+            pass
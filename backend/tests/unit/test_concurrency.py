@@ -0,0 +1,70 @@
+"""Additive increase / multiplicative decrease of the in-flight limit."""
+import asyncio
+
+import pytest
+
+from backend.app.core.exceptions import SupplierBlocked, SupplierTimeout
+from backend.app.scrapers.concurrency import AIMDLimiter
+
+
+async def _requests(limiter, count, error=None):
+    async def request():
+        async with limiter.slot():
+            await asyncio.sleep(0.001)
+            if error is not None:
+                raise error
+
+    results = await asyncio.gather(*(request() for _ in range(count)), return_exceptions=True)
+    return [r for r in results if r is not None]
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_by_one_per_healthy_saturated_window():
+    limiter = AIMDLimiter("test", initial=2, max_limit=4)
+    await _requests(limiter, 2)
+    assert limiter.limit == 3
+    await _requests(limiter, 3)
+    assert limiter.limit == 4
+    await _requests(limiter, 8)
+    assert limiter.limit == 4  # capped at max_limit
+
+
+@pytest.mark.asyncio
+async def test_limit_does_not_grow_when_not_saturated_or_slow():
+    limiter = AIMDLimiter("test", initial=4, max_limit=8)
+    for _ in range(4):
+        await _requests(limiter, 1)  # one at a time: the limit was never reached
+    assert limiter.limit == 4
+
+    slow = AIMDLimiter("test", initial=4, max_limit=8, latency_target=0.0)
+    await _requests(slow, 4)
+    assert slow.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_overload_halves_the_limit_once_per_window():
+    limiter = AIMDLimiter("test", initial=8, max_limit=16)
+    errors = await _requests(limiter, 3, SupplierTimeout("timed out"))
+    assert len(errors) == 3
+    assert limiter.limit == 4
+
+    # Closes the window without growing the limit: it was cut in this window
+    await _requests(limiter, 1)
+    assert limiter.limit == 4
+
+    await _requests(limiter, 1, SupplierBlocked("blocked"))
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_limit_never_drops_below_minimum():
+    limiter = AIMDLimiter("test", initial=2, max_limit=8, min_limit=2)
+    await _requests(limiter, 2, SupplierBlocked("blocked"))
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_other_errors_do_not_cut_the_limit():
+    limiter = AIMDLimiter("test", initial=4, max_limit=8)
+    await _requests(limiter, 4, ValueError("bad page"))
+    assert limiter.limit == 4
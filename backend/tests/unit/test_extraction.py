@@ -0,0 +1,74 @@
+"""Compiled extraction plans built from Supplier.scraper_config."""
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app.core.exceptions import ScrapingError
+from backend.app.scrapers.extraction import _index_keys, _to_decimal, extract_product_html, get_plan
+
+PAGE = b"""
+<html><body>
+  <h1 class="product-name"> Garden Hose 50ft </h1>
+  <meta itemprop="price" content="24.99">
+  <div class="stock">Only 4 left</div>
+  <div class="stars">4.6 of 5 (1,203 reviews)</div>
+  <div class="gallery"><img src="/a.jpg"><img src="/b.jpg"><img src="/a.jpg"><img src="/c.jpg"></div>
+</body></html>
+"""
+
+CONFIG = {
+    "product_url": "{base_url}/item/{id}",
+    "fields": {
+        "title": {"selector": "h1.product-name"},
+        "price": {"selector": "[itemprop=price]", "attr": "content", "convert": "price"},
+        "stock": {"selector": ".stock"},
+        "rating": {"selector": ".stars", "regex": r"([\d.]+) of 5", "convert": "float"},
+        "reviews_count": {"selector": ".stars", "regex": r"\(([\d,]+) reviews", "convert": "int"},
+        "images": {"selector": ".gallery img", "attr": "src", "many": True, "limit": 2},
+    },
+}
+
+
+def test_extracts_product_in_one_pass():
+    product = extract_product_html(PAGE, "H-1", "https://shop.test/item/H-1", "html.parser", CONFIG)
+    assert product.title == "Garden Hose 50ft"
+    assert product.price == Decimal("24.99")
+    assert product.stock == "Only 4 left"
+    assert product.rating == 4.6
+    assert product.reviews_count == 1203
+    assert product.images == ["/a.jpg", "/b.jpg"]
+
+
+def test_plan_is_compiled_once():
+    assert get_plan(CONFIG) is get_plan(dict(CONFIG))
+
+
+def test_missing_required_field_raises():
+    config = {"fields": {"title": {"selector": "h2"}, "stock": {"selector": ".stock"}}}
+    with pytest.raises(ScrapingError, match="title"):
+        extract_product_html(PAGE, "H-1", "https://shop.test/item/H-1", "html.parser", config)
+
+
+def test_invalid_spec_is_rejected():
+    with pytest.raises(ValidationError):
+        get_plan({"fields": {"title": {"selector": "h1", "convert": "roman"}}})
+    with pytest.raises(ValidationError):
+        get_plan({"fields": {"colour": {"selector": "h1"}}})
+
+
+@pytest.mark.parametrize("selector, keys", [
+    ("#productTitle, h1 span", [("id", "productTitle"), ("tag", "span")]),
+    (".a .b, .c .b", [("class", "b")]),
+    ("div.x > a:not(.y)", [("tag", "a")]),
+    ("[itemprop=price]", None),
+])
+def test_index_keys(selector, keys):
+    assert _index_keys(selector) == keys
+
+
+def test_price_range_reads_as_its_low_end():
+    assert _to_decimal("$12.99 - $24.99") == Decimal("12.99")
+    assert _to_decimal("$1,299.00") == Decimal("1299.00")
+    with pytest.raises(ValueError):
+        _to_decimal("Currently unavailable")
@@ -0,0 +1,114 @@
+"""Buffered bulk writes of price and stock history."""
+import logging
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.app.models.base import Base
+from backend.app.models.product import PriceHistory, StockHistory
+from backend.app.services.history_writer import HistoryWriter
+
+
+def _price(product_id: int) -> dict:
+    return {"product_id": product_id, "old_price": Decimal("10.00"), "new_price": Decimal("12.00"),
+            "price_change_percent": Decimal("20.00"), "reason": "tracker"}
+
+
+def _stock(product_id: int) -> dict:
+    return {"product_id": product_id, "old_stock": "In Stock", "new_stock": "Out of Stock"}
+
+
+async def _count(engine, model) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest_asyncio.fixture
+async def bare_engine():
+    """A database without tables, so every write fails until they are created"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    yield engine
+    await engine.dispose()
+
+
+async def _create_tables(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[PriceHistory.__table__, StockHistory.__table__])
+
+
+@pytest.mark.asyncio
+async def test_rows_are_buffered_until_flushed(db_engine):
+    writer = HistoryWriter(db_engine, max_rows=100)
+    await writer.add([_price(1), _price(2)], [_stock(1)])
+    assert writer.pending == 3
+    assert await _count(db_engine, PriceHistory) == 0
+
+    await writer.flush()
+    assert writer.pending == 0
+    assert await _count(db_engine, PriceHistory) == 2
+    assert await _count(db_engine, StockHistory) == 1
+    async with db_engine.connect() as conn:
+        row = (await conn.execute(select(PriceHistory.__table__))).first()
+    assert (row.new_price, row.reason) == (Decimal("12.00"), "tracker")
+    assert row.recorded_at is not None
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_flushes_on_add(db_engine):
+    writer = HistoryWriter(db_engine, max_rows=3)
+    await writer.add([_price(1), _price(2)])
+    assert writer.pending == 2
+    await writer.add(stock_rows=[_stock(1)])
+    assert writer.pending == 0
+    assert await _count(db_engine, PriceHistory) + await _count(db_engine, StockHistory) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows_in_order(bare_engine):
+    writer = HistoryWriter(bare_engine, max_rows=100)
+    await writer.add([_price(1)], [_stock(1)])
+    await writer.flush()
+    assert writer.pending == 2
+
+    # Rows added after the failure queue behind the requeued ones
+    await writer.add([_price(2)])
+    assert [row["product_id"] for row in writer._price_rows] == [1, 2]
+
+    await _create_tables(bare_engine)
+    await writer.close()
+    assert writer.pending == 0
+    assert await _count(bare_engine, PriceHistory) == 2
+    assert await _count(bare_engine, StockHistory) == 1
+
+
+@pytest.mark.asyncio
+async def test_requeue_cap_drops_oldest_rows_and_logs_count(bare_engine, caplog):
+    writer = HistoryWriter(bare_engine, max_rows=2)  # holds at most 20 rows
+    await writer.add([_price(i) for i in range(15)], [_stock(i) for i in range(10)])
+    with caplog.at_level(logging.ERROR, logger="backend.app.services.history_writer"):
+        await writer.flush()
+
+    assert writer.pending == 20
+    # The oldest price rows go first
+    assert [row["product_id"] for row in writer._price_rows] == list(range(5, 15))
+    assert len(writer._stock_rows) == 10
+    assert "History buffer full, dropped 5 oldest rows." in caplog.messages
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_are_dropped_not_retried(db_engine, caplog):
+    writer = HistoryWriter(db_engine, max_rows=100)
+    bad = {**_price(3), "new_price": None}  # violates NOT NULL
+    await writer.add([_price(1), _price(2), bad, _price(4), _price(5)], [_stock(1)])
+    with caplog.at_level(logging.ERROR, logger="backend.app.services.history_writer"):
+        await writer.flush()
+
+    assert writer.pending == 0
+    async with db_engine.connect() as conn:
+        written = (await conn.execute(select(PriceHistory.product_id).order_by(PriceHistory.product_id))).scalars().all()
+    assert written == [1, 2, 4, 5]
+    assert await _count(db_engine, StockHistory) == 1
+    assert "Dropped 1 rejected history rows." in caplog.messages
@@ -0,0 +1,23 @@
+"""Parser pool and tree builder fallback."""
+import pytest
+
+from backend.app.scrapers.parsing import DEFAULT_BACKEND, ParserPool, make_soup
+
+
+def _title(html: str) -> str:
+    return make_soup(html).title.string
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_runs_parser():
+    pool = ParserPool("thread", max_workers=2)
+    try:
+        assert await pool.run(_title, "<title>Widget</title>") == "Widget"
+    finally:
+        pool.shutdown()
+
+
+def test_unknown_backend_falls_back_to_default():
+    soup = make_soup("<p>ok</p>", backend="no-such-parser")
+    assert soup.builder.NAME == DEFAULT_BACKEND
+    assert soup.p.string == "ok"
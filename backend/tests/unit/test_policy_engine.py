@@ -0,0 +1,78 @@
+"""Bulk policy checks over products and their listings."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from backend.app.models.admin import Alert
+from backend.app.models.listing import Listing, StoreAccount
+from backend.app.models.product import Product
+from backend.app.models.user import User
+from backend.app.services.policy_engine import PolicyEngine, low_margin_violation
+
+
+async def _listed_product(db, product_price, listing_prices, stock="In Stock"):
+    db.add(User(id=1, email="seller@example.com", password_hash="x"))
+    db.add(StoreAccount(id=1, user_id=1, marketplace="ebay", account_name="shop"))
+    db.add(Product(id=1, asin="B1", title="t", price=Decimal(product_price), stock=stock))
+    db.add_all([
+        Listing(
+            id=i, user_id=1, product_id=1, store_account_id=1, title="t",
+            price=Decimal(price), quantity_available=1, status="Active",
+        )
+        for i, price in enumerate(listing_prices, start=1)
+    ])
+    await db.commit()
+
+
+def _names(violations):
+    return sorted(v.policy_name for v in violations)
+
+
+@pytest.mark.asyncio
+async def test_bulk_checks_and_alerts(db):
+    await _listed_product(db, "10.00", ["20.00", "11.00"], stock="Only 2 left in stock")
+
+    violations = await PolicyEngine().check_policies_bulk([1, 99], db)
+
+    assert _names(violations[1]) == ["duplicate_listings", "low_margin", "low_stock"]
+    low_margin = next(v for v in violations[1] if v.policy_name == "low_margin")
+    assert low_margin.details["listing_id"] == 2
+    statuses = (await db.execute(select(Listing.status))).scalars().all()
+    assert statuses == ["Paused", "Paused"]
+    alerts = (await db.execute(select(Alert))).scalars().all()
+    assert len(alerts) == 3
+
+
+@pytest.mark.asyncio
+async def test_unpriced_listing_is_flagged_not_divided_by(db):
+    await _listed_product(db, "10.00", ["0.00"])
+
+    violations = await PolicyEngine().check_policies_bulk([1], db)
+
+    assert violations[1][0].policy_name == "low_margin"
+    assert violations[1][0].details["margin"] is None
+    assert low_margin_violation(Decimal("10.00"), None, 1, 0.15).details["margin"] is None
+
+
+@pytest.mark.asyncio
+async def test_every_seller_of_a_product_is_alerted(db):
+    await _listed_product(db, "10.00", ["20.00"], stock="Only 2 left in stock")
+    db.add(User(id=2, email="other@example.com", password_hash="x"))
+    db.add(StoreAccount(id=2, user_id=2, marketplace="ebay", account_name="other"))
+    db.add(Listing(
+        id=2, user_id=2, product_id=1, store_account_id=2, title="t",
+        price=Decimal("10.50"), quantity_available=1, status="Active",
+    ))
+    await db.commit()
+
+    await PolicyEngine().check_policies_bulk([1], db)
+
+    alerts = (await db.execute(select(Alert.user_id, Alert.type))).all()
+    # Low stock concerns both sellers, the low margin only the second
+    assert sorted(alerts) == [
+        (1, "policy_trigger:low_stock"),
+        (2, "policy_trigger:low_margin"),
+        (2, "policy_trigger:low_stock"),
+    ]
+
@@ -0,0 +1,80 @@
+"""Proxy health bookkeeping and its write-back to proxy_pool."""
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app.models.admin import ProxyPool
+from backend.app.utils.proxy_manager import MAX_HEALTH, ProxyManager
+
+table = ProxyPool.__table__
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(table.create)
+        await conn.execute(insert(table), [
+            {"id": 1, "host": "10.0.0.1", "port": 8080, "protocol": "http", "health_score": 100,
+             "success_count": 0, "failure_count": 0, "is_active": True},
+            {"id": 2, "host": "10.0.0.2", "port": 8080, "protocol": "http", "health_score": 15,
+             "success_count": 0, "failure_count": 0, "is_active": True},
+        ])
+    yield async_sessionmaker(engine)
+    await engine.dispose()
+
+
+async def _stored(session_maker, proxy_id):
+    async with session_maker() as db:
+        return (await db.execute(select(table).where(table.c.id == proxy_id))).one()
+
+
+async def _manager(session_maker) -> ProxyManager:
+    manager = ProxyManager()
+    manager._session_maker = session_maker
+    await manager.load()
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_flushes_from_several_workers_add_up(session_maker):
+    first = await _manager(session_maker)
+    second = await _manager(session_maker)
+
+    first.record_failure(first._proxies[1])
+    second.record_failure(second._proxies[1], blocked=True)
+    second.record_success(second._proxies[1], latency=0.5)
+    await first.flush()
+    await second.flush()
+
+    row = await _stored(session_maker, 1)
+    assert row.health_score == 100 - 10 - 25 + 1
+    assert (row.success_count, row.failure_count) == (1, 2)
+    assert not first._proxies[1].dirty and not second._proxies[1].dirty
+
+
+@pytest.mark.asyncio
+async def test_health_is_clamped_in_the_database(session_maker):
+    first = await _manager(session_maker)
+    second = await _manager(session_maker)
+
+    # Each worker sees 15 - 10 = 5; together they would go below zero
+    first.record_failure(first._proxies[2])
+    second.record_failure(second._proxies[2])
+    await first.flush()
+    await second.flush()
+    assert (await _stored(session_maker, 2)).health_score == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_health_stays_in_range(session_maker):
+    manager = await _manager(session_maker)
+    proxy = manager._proxies[1]
+    manager.record_success(proxy, latency=0.1)
+    assert proxy.health_score == MAX_HEALTH
+    assert not proxy.health_delta  # the reward was clamped away
+    manager.record_failure(proxy, blocked=True)
+    assert proxy.cooldown_until > 0
+    await manager.flush()
+    assert (await _stored(session_maker, 1)).health_score == MAX_HEALTH - 25
@@ -0,0 +1,117 @@
+"""Redis token bucket and its local fallback."""
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from backend.app.scrapers import base, rate_limiter
+from backend.app.scrapers.base import BaseScraper
+from backend.app.scrapers.rate_limiter import RateLimiter
+
+KEY = "ratelimit:test"
+
+
+@pytest.fixture
+def limiter(use_redis):
+    use_redis(rate_limiter)
+    return RateLimiter("test", rate_limit=60)
+
+
+@pytest.mark.asyncio
+async def test_burst_then_wait(limiter):
+    # 1 token per second, room for 3
+    waits = [await limiter._take(KEY, 1.0, 3) for _ in range(4)]
+    assert waits[:3] == [0, 0, 0]
+    assert 900 < waits[3] <= 1000
+
+
+@pytest.mark.asyncio
+async def test_wait_time_scales_with_rate(limiter):
+    await limiter._take(KEY, 10.0, 1)
+    assert 0 < await limiter._take(KEY, 10.0, 1) <= 100
+
+
+@pytest.mark.asyncio
+async def test_tokens_refill_over_time(limiter, fake_redis):
+    for _ in range(3):
+        await limiter._take(KEY, 1.0, 3)
+    assert await limiter._take(KEY, 1.0, 3) > 0
+
+    # Pretend the last take was two seconds ago: two tokens are back
+    ts = float(await fake_redis.hget(KEY, "ts"))
+    await fake_redis.hset(KEY, "ts", ts - 2000)
+    assert await limiter._take(KEY, 1.0, 3) == 0
+    assert await limiter._take(KEY, 1.0, 3) == 0
+    assert await limiter._take(KEY, 1.0, 3) > 0
+
+
+@pytest.mark.asyncio
+async def test_refill_is_capped_at_capacity(limiter, fake_redis):
+    await limiter._take(KEY, 1.0, 2)
+    ts = float(await fake_redis.hget(KEY, "ts"))
+    await fake_redis.hset(KEY, "ts", ts - 60_000)
+    await limiter._take(KEY, 1.0, 2)
+    assert float(await fake_redis.hget(KEY, "tokens")) <= 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_spacing_without_redis(monkeypatch):
+    async def unavailable():
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(rate_limiter, "get_redis_client", unavailable)
+    monkeypatch.setattr(rate_limiter.settings, "SCRAPER_RATE_LIMIT_HEADROOM", 1.0)
+    monkeypatch.setattr(rate_limiter.settings, "SCRAPER_FLEET_SIZE", 2)
+    limiter = RateLimiter("test", rate_limit=1200)  # this process's half: one request per 100 ms
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for _ in range(3):
+        await limiter.acquire()
+    # The first request goes straight out, the next two are spaced
+    assert loop.time() - started >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_proxy_bucket_is_charged_separately(use_redis):
+    fake_redis = use_redis(rate_limiter)
+    limiter = RateLimiter("test", rate_limit=600, proxy_rate_limit=60)
+    await limiter.acquire("http://10.0.0.1:8080")
+    await limiter.acquire("http://10.0.0.2:8080")
+
+    assert await fake_redis.exists(KEY)
+    assert await fake_redis.exists("ratelimit:test:http://10.0.0.1:8080")
+    assert await fake_redis.exists("ratelimit:test:http://10.0.0.2:8080")
+
+
+class ProxiedScraper(BaseScraper):
+    supplier_name = "test"
+
+    async def get_product(self, product_id):
+        return base._call_proxy.get()
+
+    async def search(self, query, limit=10):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_scraper_charges_and_uses_the_chosen_proxy(monkeypatch):
+    class Proxy:
+        url = "http://10.0.0.1:8080"
+
+    proxy = Proxy()
+    throttled = []
+
+    async def healthy_proxy():
+        return proxy
+
+    async def throttle(proxy_url=None):
+        throttled.append(proxy_url)
+
+    monkeypatch.setattr(base, "get_healthy_proxy", healthy_proxy)
+    scraper = ProxiedScraper()
+    monkeypatch.setattr(scraper, "_throttle", throttle)
+
+    assert await scraper._call(scraper.get_product, "A1") is proxy
+    assert throttled == [proxy.url]
+    assert base._call_proxy.get() is None
@@ -0,0 +1,137 @@
+"""Adaptive per-product check schedule."""
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from backend.app.config import settings
+from backend.app.models.listing import Listing, StoreAccount
+from backend.app.models.product import Product, Supplier
+from backend.app.models.user import User
+from backend.app.services import scheduler
+from backend.app.services.scheduler import INTERVALS_KEY, SCHEDULE_KEY, TrackingScheduler
+
+MIN = settings.TRACKER_MIN_INTERVAL_SECONDS
+
+
+@pytest.fixture
+def redis(use_redis):
+    return use_redis(scheduler)
+
+
+async def _products(db, count, **values):
+    db.add(Supplier(id=1, name="amazon"))
+    db.add_all([
+        Product(id=i, supplier_id=1, asin=f"B{i}", title="t", price=Decimal("10"), **values)
+        for i in range(1, count + 1)
+    ])
+    await db.commit()
+
+
+async def _scores(redis, shard=0):
+    return {int(pid): score for pid, score in await redis.zrange(SCHEDULE_KEY.format(shard=shard), 0, -1, withscores=True)}
+
+
+@pytest.mark.asyncio
+async def test_claim_due_takes_most_overdue_first(redis):
+    now = time.time()
+    await redis.zadd(SCHEDULE_KEY.format(shard=0), {"1": now - 10, "2": now - 300, "3": now - 60, "4": now + 600})
+    tracking = TrackingScheduler(shards=1)
+
+    assert await tracking.claim_due(2) == [2, 3]
+    # Claimed products are leased, not removed
+    scores = await _scores(redis)
+    assert scores[2] >= now + settings.TRACKER_CLAIM_LEASE_SECONDS - 1
+    assert await tracking.claim_due(10) == [1]
+    assert await tracking.claim_due(10) == []
+
+
+@pytest.mark.asyncio
+async def test_claim_due_rotates_shards(redis):
+    now = time.time()
+    await redis.zadd(SCHEDULE_KEY.format(shard=0), {"2": now - 30, "4": now - 20, "6": now - 10})
+    await redis.zadd(SCHEDULE_KEY.format(shard=1), {"3": now - 30, "5": now - 20, "7": now - 10})
+    tracking = TrackingScheduler(shards=2)
+
+    assert await tracking.claim_due(2) == [2, 4]
+    assert await tracking.claim_due(2) == [3, 5]
+    # A short shard is topped up from the next one
+    assert await tracking.claim_due(2) == [6, 7]
+    assert await tracking.claim_due(2, shards=[1]) == []
+
+
+@pytest.mark.asyncio
+async def test_sync_adds_only_missing_products(redis, db):
+    await _products(db, 5)
+    tracking = TrackingScheduler(shards=2)
+    await redis.zadd(SCHEDULE_KEY.format(shard=1), {"1": 1.0})
+
+    assert await tracking.sync(db, batch_size=2) == 4
+    assert (await _scores(redis, 1))[1] == 1.0  # kept its next-check time
+    assert set(await _scores(redis, 0)) == {2, 4}
+    assert await tracking.sync(db) == 0
+
+
+@pytest.mark.asyncio
+async def test_reschedule_adapts_intervals(redis, db):
+    now = datetime.now(timezone.utc)
+    await _products(db, 4, last_scraped_at=now)
+    product = await db.get(Product, 4)
+    product.is_archived = True
+    await db.commit()
+    await redis.hset(INTERVALS_KEY, mapping={"1": MIN * 4, "2": MIN * 4})
+    tracking = TrackingScheduler(shards=1)
+
+    await tracking.reschedule([1, 2, 3, 4], changed_ids=[1], db=db, checked_since=time.time() - 5)
+
+    intervals = {int(k): float(v) for k, v in (await redis.hgetall(INTERVALS_KEY)).items()}
+    assert intervals[1] == MIN  # changed: back to the minimum
+    assert intervals[2] == MIN * 4 * settings.TRACKER_BACKOFF_FACTOR  # stable: backs off
+    assert intervals[3] == MIN * settings.TRACKER_BACKOFF_FACTOR  # first check
+    assert intervals[4] == settings.TRACKER_ARCHIVED_INTERVAL_SECONDS
+    scores = await _scores(redis)
+    for pid, interval in intervals.items():
+        assert scores[pid] - time.time() == pytest.approx(interval, rel=0.11)
+
+
+@pytest.mark.asyncio
+async def test_reschedule_retries_failed_and_drops_deleted(redis, db):
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    await _products(db, 1, last_scraped_at=stale)
+    await redis.hset(INTERVALS_KEY, mapping={"1": MIN * 4, "9": MIN})
+    await redis.zadd(SCHEDULE_KEY.format(shard=0), {"9": 0})
+    tracking = TrackingScheduler(shards=1)
+
+    await tracking.reschedule([1, 9], changed_ids=[], db=db, checked_since=time.time())
+
+    scores = await _scores(redis)
+    assert scores[1] - time.time() == pytest.approx(settings.TRACKER_RETRY_SECONDS, rel=0.11)
+    assert await redis.hget(INTERVALS_KEY, "1") == str(MIN * 4)  # interval kept
+    assert 9 not in scores
+    assert not await redis.hexists(INTERVALS_KEY, "9")
+
+
+@pytest.mark.asyncio
+async def test_reschedule_caps_active_and_includes_fanned_out(redis, db):
+    now = datetime.now(timezone.utc)
+    db.add(Supplier(id=1, name="amazon"))
+    db.add(User(id=1, email="a@example.com", password_hash="x"))
+    db.add(StoreAccount(id=1, user_id=1, marketplace="ebay", account_name="shop"))
+    # Products 1 and 2 are the same supplier item tracked by two users
+    db.add_all([
+        Product(id=1, supplier_id=1, asin="B1", title="t", last_scraped_at=now),
+        Product(id=2, supplier_id=1, asin="B1", title="t", last_scraped_at=now),
+    ])
+    db.add(Listing(user_id=1, product_id=1, store_account_id=1, title="t", price=Decimal("20"),
+                   quantity_available=1, status="Active"))
+    await db.commit()
+    await redis.hset(INTERVALS_KEY, mapping={"1": settings.TRACKER_MAX_INTERVAL_SECONDS, "2": MIN})
+    tracking = TrackingScheduler(shards=1)
+
+    await tracking.reschedule([1], changed_ids=[], db=db, checked_since=time.time() - 5)
+
+    intervals = await redis.hgetall(INTERVALS_KEY)
+    assert float(intervals["1"]) == settings.TRACKER_ACTIVE_MAX_INTERVAL_SECONDS
+    assert float(intervals["2"]) == MIN * settings.TRACKER_BACKOFF_FACTOR
+    assert set(await _scores(redis)) == {1, 2}
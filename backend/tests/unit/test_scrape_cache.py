@@ -0,0 +1,74 @@
+"""Scrape cache hits, staleness and Redis outages."""
+import pytest
+from redis.exceptions import ConnectionError
+
+from backend.app.scrapers import base, cache, registry
+from backend.app.scrapers.base import BaseScraper
+from backend.app.scrapers.cache import ScrapeCache
+from backend.app.scrapers.registry import ScraperRegistry
+
+
+@pytest.fixture
+def scrape_cache(use_redis):
+    use_redis(cache)
+    return ScrapeCache()
+
+
+@pytest.mark.asyncio
+async def test_hit_and_miss(scrape_cache):
+    assert await scrape_cache.get("amazon", "B1") is None
+    await scrape_cache.set("amazon", "B1", '{"asin": "B1"}', ttl=60)
+    assert await scrape_cache.get("amazon", "B1") == '{"asin": "B1"}'
+    assert scrape_cache.stats() == {"amazon": {"hits": 1, "misses": 1}}
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_misses(scrape_cache, fake_redis):
+    await scrape_cache.set("amazon", "B1", "{}", ttl=3600)
+    await fake_redis.hset("scrape:amazon:B1", "scraped_at", 0)
+    assert await scrape_cache.get("amazon", "B1", max_staleness=60) is None
+    assert await scrape_cache.get("amazon", "B1") == "{}"
+    assert await scrape_cache.get("amazon", "B1", max_staleness=0) is None
+
+
+class FailingRedis:
+    async def hmget(self, *args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    def pipeline(self, *args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_is_a_miss(monkeypatch):
+    async def get_redis_client():
+        return FailingRedis()
+
+    monkeypatch.setattr(cache, "get_redis_client", get_redis_client)
+    scrape_cache = ScrapeCache()
+    await scrape_cache.set("amazon", "B1", "{}", ttl=60)
+    assert await scrape_cache.get("amazon", "B1") is None
+    assert scrape_cache.misses["amazon"] == 1
+
+
+class CachedScraper(BaseScraper):
+    supplier_name = "cached"
+
+    async def get_product(self, product_id):
+        raise NotImplementedError
+
+    async def search(self, query, limit=10):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_health_snapshot_reports_cache_counters(use_redis, monkeypatch):
+    use_redis(base, cache)
+    counters = ScrapeCache()
+    monkeypatch.setattr(registry, "scrape_cache", counters)
+    monkeypatch.setattr(ScraperRegistry, "_scrapers", {"cached": CachedScraper()})
+
+    await counters.get("cached", "B1")
+    snapshot = await ScraperRegistry.health_snapshot()
+
+    assert snapshot["cached"]["cache"] == {"hits": 0, "misses": 1}
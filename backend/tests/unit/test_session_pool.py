@@ -0,0 +1,57 @@
+"""Proxy affinity and LRU eviction in the scraper session pool."""
+import pytest
+
+from backend.app.scrapers.session_pool import DIRECT, SessionPool
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused_per_proxy():
+    pool = SessionPool("chrome", max_sessions=4)
+    try:
+        async with pool.session("http://proxy-a:8080") as first:
+            pass
+        async with pool.session("http://proxy-a:8080") as again:
+            assert again is first
+        async with pool.session("http://proxy-b:8080") as other:
+            assert other is not first
+        async with pool.session() as direct:
+            assert direct is not first
+        assert len(pool) == 3
+        assert DIRECT in pool._sessions
+    finally:
+        await pool.close()
+    assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_idle_session_is_evicted():
+    pool = SessionPool("chrome", max_sessions=2)
+    try:
+        async with pool.session("http://proxy-a:8080") as a:
+            pass
+        async with pool.session("http://proxy-b:8080"):
+            pass
+        # Touch a so b becomes the least recently used
+        async with pool.session("http://proxy-a:8080"):
+            pass
+        async with pool.session("http://proxy-c:8080"):
+            pass
+        assert list(pool._sessions) == ["http://proxy-a:8080", "http://proxy-c:8080"]
+        async with pool.session("http://proxy-a:8080") as still_a:
+            assert still_a is a
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_busy_sessions_are_not_evicted():
+    pool = SessionPool("chrome", max_sessions=2)
+    try:
+        async with pool.session("http://proxy-a:8080"):
+            async with pool.session("http://proxy-b:8080"):
+                pass
+            # a is in use, so the idle b makes room for c
+            async with pool.session("http://proxy-c:8080"):
+                assert set(pool._sessions) == {"http://proxy-a:8080", "http://proxy-c:8080"}
+    finally:
+        await pool.close()
@@ -0,0 +1,99 @@
+"""Shard ownership among tracker workers."""
+import asyncio
+
+import pytest
+
+from backend.app.services import sharding
+from backend.app.services.sharding import WORKERS_KEY, ShardCoordinator, lease_key
+
+SHARDS = 8
+
+
+@pytest.fixture
+def redis(use_redis):
+    return use_redis(sharding)
+
+
+async def _owners(redis):
+    return {shard: await redis.get(lease_key(shard)) for shard in range(SHARDS)}
+
+
+@pytest.mark.asyncio
+async def test_workers_rebalance_to_fair_share(redis):
+    first = ShardCoordinator(SHARDS, lease_seconds=30, worker_id="w1")
+    second = ShardCoordinator(SHARDS, lease_seconds=30, worker_id="w2")
+
+    assert len(await first.heartbeat()) == SHARDS
+    # Everything is leased: the newcomer waits for the surplus
+    assert await second.heartbeat() == set()
+    assert len(await first.heartbeat()) == SHARDS // 2
+    assert len(await second.heartbeat()) == SHARDS // 2
+
+    assert first.shards.isdisjoint(second.shards)
+    owners = await _owners(redis)
+    assert {s for s, w in owners.items() if w == "w1"} == first.shards
+    assert {s for s, w in owners.items() if w == "w2"} == second.shards
+
+    # Stable: further heartbeats move nothing
+    before = set(first.shards)
+    await first.heartbeat()
+    await second.heartbeat()
+    assert first.shards == before
+
+
+@pytest.mark.asyncio
+async def test_stop_hands_shards_back(redis):
+    first = ShardCoordinator(SHARDS, lease_seconds=30, worker_id="w1")
+    second = ShardCoordinator(SHARDS, lease_seconds=30, worker_id="w2")
+    await first.heartbeat()
+    await second.heartbeat()
+    await first.heartbeat()
+    await second.heartbeat()
+
+    await first.stop()
+    assert first.shards == set()
+    assert await redis.zscore(WORKERS_KEY, "w1") is None
+    assert len(await second.heartbeat()) == SHARDS
+
+
+@pytest.mark.asyncio
+async def test_takeover_after_lease_expires(redis):
+    first = ShardCoordinator(SHARDS, lease_seconds=0.3, worker_id="w1")
+    second = ShardCoordinator(SHARDS, lease_seconds=0.3, worker_id="w2")
+    await first.heartbeat()
+    await second.heartbeat()
+    await first.heartbeat()
+    await second.heartbeat()
+    assert len(first.shards) == len(second.shards) == SHARDS // 2
+
+    # w1 dies; w2 keeps heartbeating until w1's leases run out
+    for _ in range(3):
+        await asyncio.sleep(0.15)
+        await second.heartbeat()
+    assert second.shards == set(range(SHARDS))
+    assert set((await _owners(redis)).values()) == {"w2"}
+    assert await redis.zscore(WORKERS_KEY, "w1") is None
+
+    # If w1 comes back, it finds its leases gone before claiming anew
+    assert await first.heartbeat() == set()
+
+
+@pytest.mark.asyncio
+async def test_leases_are_renewed_in_one_call(redis, monkeypatch):
+    coordinator = ShardCoordinator(SHARDS, lease_seconds=30, worker_id="w1")
+    await coordinator.heartbeat()
+    calls = []
+    renew = coordinator._renew
+
+    async def counting_renew(keys, args):
+        calls.append(keys)
+        return await renew(keys=keys, args=args)
+
+    monkeypatch.setattr(coordinator, "_renew", counting_renew)
+    await redis.delete(lease_key(3))
+    await redis.set(lease_key(5), "w2")
+
+    # Shard 3 lapsed and is reclaimed; shard 5 now belongs to someone else
+    assert await coordinator.heartbeat() == set(range(SHARDS)) - {5}
+    assert calls == [[lease_key(shard) for shard in range(SHARDS)]]
+    assert await redis.get(lease_key(5)) == "w2"
@@ -0,0 +1,66 @@
+"""In-process and cross-process call coalescing."""
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from backend.app.scrapers import singleflight
+from backend.app.scrapers.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_upstream_call():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "product"
+
+    flight = SingleFlight("test")
+    results = await asyncio.gather(*(flight.do("B1", fetch) for _ in range(5)))
+    assert results == ["product"] * 5
+    assert calls == 1
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_lock_holder_fetches_and_others_peek(use_redis):
+    redis = use_redis(singleflight)
+    cached = None
+    calls = 0
+
+    async def fetch():
+        nonlocal cached, calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        cached = "product"
+        return cached
+
+    async def peek():
+        return cached
+
+    # Two flights stand in for two worker processes
+    first = SingleFlight("test", lock_ttl=5, poll_interval=0.01)
+    second = SingleFlight("test", lock_ttl=5, poll_interval=0.01)
+    results = await asyncio.gather(first.do("B1", fetch, peek), second.do("B1", fetch, peek))
+    assert results == ["product", "product"]
+    assert calls == 1
+    assert await redis.get("singleflight:test:B1") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_calls_through(monkeypatch):
+    async def unavailable():
+        raise ConnectionError("Redis is down")
+
+    async def fetch():
+        return "product"
+
+    async def peek():
+        return None
+
+    monkeypatch.setattr(singleflight, "get_redis_client", unavailable)
+    flight = SingleFlight("test", lock_ttl=5)
+    assert await flight.do("B1", fetch, peek) == "product"
@@ -0,0 +1,103 @@
+"""Streamed product pages: the prefix keeps the tracked fields."""
+import pytest
+
+from backend.app.scrapers import amazon, base, cache
+from backend.app.scrapers.amazon import AMAZON_EXTRACTION, STREAM_STOP_MARKERS, AmazonScraper
+from backend.app.scrapers.extraction import extract_product_html
+from backend.app.scrapers.streaming import read_prefix
+from backend.tests.corpus import FIXTURES_DIR
+
+ASIN = "B09XS7JWHH"  # has a description below the availability block
+PAGE = (FIXTURES_DIR / "amazon" / f"product_{ASIN}.html").read_bytes()
+URL = f"https://www.amazon.com/dp/{ASIN}"
+TRACKED = ("title", "price", "stock")
+
+
+class FakeStream:
+    """Streamed response handing out the body in small chunks"""
+
+    def __init__(self, body: bytes, chunk_size: int = 256):
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.quit_now = None
+        self.status_code = 200
+        self.headers = {}
+        self.content = body
+
+    async def aiter_content(self):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def aclose(self):
+        pass
+
+
+def _extract(html: bytes):
+    return extract_product_html(html, ASIN, URL, "html.parser", AMAZON_EXTRACTION)
+
+
+@pytest.mark.asyncio
+async def test_prefix_keeps_tracked_fields():
+    # A small tail stands in for the reviews and recommendations of a real page
+    prefix = await read_prefix(FakeStream(PAGE), 1_000_000, STREAM_STOP_MARKERS, tail_bytes=64)
+    assert len(prefix) < len(PAGE)
+
+    full, streamed = _extract(PAGE), _extract(prefix)
+    for field in TRACKED:
+        assert getattr(streamed, field) == getattr(full, field)
+    assert full.description
+    assert streamed.description is None
+
+
+@pytest.mark.asyncio
+async def test_only_change_checks_are_streamed(monkeypatch):
+    monkeypatch.setattr(amazon.settings, "SCRAPER_STREAM_MAX_BYTES", 1_000_000)
+    scraper = AmazonScraper()
+    requests = []
+
+    async def request(url, **kwargs):
+        requests.append(kwargs)
+        return FakeStream(PAGE)
+
+    monkeypatch.setattr(scraper, "_request", request)
+
+    product = await scraper.get_product(ASIN)
+    assert product.description
+    assert "stop_markers" not in requests[-1] and not requests[-1].get("max_bytes")
+
+    await scraper.get_product_if_changed(ASIN)
+    assert requests[-1]["stop_markers"] == STREAM_STOP_MARKERS
+    assert requests[-1]["max_bytes"] == 1_000_000
+
+
+@pytest.mark.asyncio
+async def test_streaming_is_off_by_default(monkeypatch):
+    scraper = AmazonScraper()
+    requests = []
+
+    async def request(url, **kwargs):
+        requests.append(kwargs)
+        return FakeStream(PAGE)
+
+    monkeypatch.setattr(scraper, "_request", request)
+    product, _ = await scraper.get_product_if_changed(ASIN)
+    assert product.description
+    assert "stop_markers" not in requests[-1]
+
+
+@pytest.mark.asyncio
+async def test_streamed_products_are_not_cached(monkeypatch, use_redis):
+    use_redis(base, cache)
+    monkeypatch.setattr(amazon.settings, "SCRAPER_STREAM_MAX_BYTES", 1_000_000)
+    scraper = AmazonScraper()
+
+    async def request(url, **kwargs):
+        return FakeStream(PAGE)
+
+    monkeypatch.setattr(scraper, "_request", request)
+    monkeypatch.setattr(scraper, "_call", lambda fn, *args: fn(*args))
+
+    product, _ = await scraper.fetch_product_if_changed(ASIN)
+    assert product.title
+    assert await cache.scrape_cache.get("amazon", ASIN) is None
+
+    assert (await scraper.fetch_product(ASIN)).description
@@ -0,0 +1,137 @@
+"""Resumable full tracking sweep and its single-owner guarantee."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.models.admin import Job
+from backend.app.models.product import Product
+from backend.app.services.sweep import SWEEP_JOB_TYPE, TrackingSweep
+
+
+class FakeTracker:
+    def __init__(self, fail_on: int = 0):
+        self.fail_on = fail_on
+        self.chunks = []
+
+    async def track_multiple_products(self, product_ids, db, chunk_size=None):
+        await db.commit()  # like TrackerService, which commits per chunk
+        if product_ids[0] == self.fail_on:
+            raise RuntimeError("supplier down")
+        self.chunks.append(product_ids)
+        return []
+
+
+async def _products(db, count):
+    db.add_all([Product(id=i, asin=f"B{i}", title="t") for i in range(1, count + 1)])
+    await db.commit()
+
+
+def _running_job(updated_at, **result):
+    return Job(
+        type=SWEEP_JOB_TYPE,
+        status="RUNNING",
+        result={"cursor": 0, "processed": 0, "changed": 0, "total": 5, **result},
+        updated_at=updated_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sweep_tracks_every_product_in_chunks(db):
+    await _products(db, 5)
+    tracker = FakeTracker()
+
+    job = await TrackingSweep(tracker, chunk_size=2).run(db)
+
+    assert tracker.chunks == [[1, 2], [3, 4], [5]]
+    assert job.status == "SUCCESS"
+    assert job.result["processed"] == 5
+    assert job.result["progress"] == 100.0
+
+
+@pytest.mark.asyncio
+async def test_failed_sweep_resumes_from_checkpoint_at_once(db):
+    await _products(db, 5)
+
+    with pytest.raises(RuntimeError):
+        await TrackingSweep(FakeTracker(fail_on=3), chunk_size=2).run(db)
+    job = (await db.execute(select(Job))).scalar_one()
+    await db.refresh(job)
+    assert job.status == "RUNNING"
+    assert job.result["cursor"] == 2
+    assert job.updated_at is None
+
+    tracker = FakeTracker()
+    job = await TrackingSweep(tracker, chunk_size=2).run(db)
+    assert tracker.chunks == [[3, 4], [5]]
+    assert job.result["processed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_live_sweep_is_not_taken_over(db):
+    await _products(db, 5)
+    db.add(_running_job(datetime.now(timezone.utc)))
+    await db.commit()
+
+    assert await TrackingSweep(FakeTracker()).run(db) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_window_grows_with_slow_chunks(db):
+    await _products(db, 5)
+    db.add(_running_job(datetime.now(timezone.utc) - timedelta(seconds=120), chunk_seconds=60))
+    await db.commit()
+
+    # Older than stale_after, but younger than three of its chunks
+    assert await TrackingSweep(FakeTracker(), stale_after=60).run(db) is None
+    assert await TrackingSweep(FakeTracker(), stale_after=60 / 4).run(db) is None
+
+    job = (await db.execute(select(Job))).scalar_one()
+    job.result = {**job.result, "chunk_seconds": 10}
+    job.updated_at = datetime.now(timezone.utc) - timedelta(seconds=120)
+    await db.commit()
+    assert (await TrackingSweep(FakeTracker(), stale_after=60).run(db)).status == "SUCCESS"
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_advances_during_a_slow_chunk(db):
+    await _products(db, 1)
+    beats = []
+
+    class SlowTracker(FakeTracker):
+        async def track_multiple_products(self, product_ids, db, chunk_size=None):
+            await db.commit()
+            for _ in range(3):
+                await asyncio.sleep(0.05)
+                job = (await db.execute(select(Job))).scalar_one()
+                await db.refresh(job)
+                beats.append(job.updated_at)
+                await db.commit()
+            return []
+
+    await TrackingSweep(SlowTracker(), heartbeat_every=0.02).run(db)
+
+    assert beats[0] is not None
+    assert beats[-1] > beats[0]
+
+
+@pytest.mark.asyncio
+async def test_only_one_sweep_can_be_running(db):
+    now = datetime.now(timezone.utc)
+    db.add(_running_job(now))
+    await db.commit()
+
+    db.add(_running_job(now))
+    with pytest.raises(IntegrityError):
+        await db.commit()
+    await db.rollback()
+
+    # Finished sweeps and other job types are not constrained
+    db.add_all([
+        Job(type=SWEEP_JOB_TYPE, status="SUCCESS"),
+        Job(type="scrape_amazon", status="RUNNING"),
+        Job(type="scrape_amazon", status="RUNNING"),
+    ])
+    await db.commit()
@@ -0,0 +1,131 @@
+"""Tracking runs against a fake supplier, end to end through the database."""
+from decimal import Decimal
+from typing import Optional, Tuple
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.app.models.product import PriceHistory, Product, Supplier
+from backend.app.scrapers import base, cache, circuit_breaker, rate_limiter, singleflight
+from backend.app.scrapers.base import BaseScraper, PageFingerprint, Product as ScrapedProduct
+from backend.app.scrapers.registry import ScraperRegistry
+from backend.app.services import change_stream
+from backend.app.services.tracker_service import TrackerService
+
+
+class FakeScraper(BaseScraper):
+    supplier_name = "fake"
+    rate_limit = 0
+
+    def __init__(self):
+        self.price = Decimal("10.00")
+        self.stock = "In Stock"
+        self.requests = []  # previous fingerprint of every page fetch
+
+    def page(self, asin: str) -> Tuple[ScrapedProduct, PageFingerprint]:
+        product = ScrapedProduct(
+            asin=asin, title="Widget", price=self.price, stock=self.stock,
+            rating=None, reviews_count=None, images=[], url=f"https://example.com/{asin}",
+        )
+        return product, PageFingerprint(digest=f"price-{self.price}")
+
+    async def get_product(self, product_id: str) -> ScrapedProduct:
+        return self.page(product_id)[0]
+
+    async def get_product_if_changed(
+        self, product_id: str, previous: Optional[PageFingerprint] = None
+    ) -> Tuple[Optional[ScrapedProduct], Optional[PageFingerprint]]:
+        self.requests.append(previous)
+        product, fingerprint = self.page(product_id)
+        if previous is not None and previous.digest == fingerprint.digest:
+            return None, previous
+        return product, fingerprint
+
+    async def search(self, query: str, limit: int = 10):
+        return []
+
+
+@pytest.fixture
+def scraper(use_redis, monkeypatch):
+    use_redis(base, cache, circuit_breaker, rate_limiter, singleflight, change_stream)
+    scraper = FakeScraper()
+    monkeypatch.setattr(ScraperRegistry, "_scrapers", {})
+    ScraperRegistry.register(scraper)
+    return scraper
+
+
+async def _products(db):
+    db.add(Supplier(id=1, name="fake"))
+    # Products 1 and 2 are the same supplier item tracked by two users
+    db.add_all([
+        Product(id=1, supplier_id=1, asin="B1", title="Widget", price=Decimal("8.00"), stock="In Stock"),
+        Product(id=2, supplier_id=1, asin="B1", title="Widget", price=Decimal("8.00"), stock="In Stock"),
+    ])
+    await db.commit()
+
+
+async def _fingerprints(db):
+    rows = await db.execute(select(Product.id, Product.page_fingerprint).order_by(Product.id))
+    return {pid: (fp or {}).get("digest") for pid, fp in rows}
+
+
+@pytest.mark.asyncio
+async def test_tracking_twice_keeps_fingerprint_on_cache_hit(scraper, db, fake_redis):
+    await _products(db)
+    tracker = TrackerService()
+
+    events = await tracker.track_multiple_products([1], db)
+    assert {e.product_id for e in events} == {1, 2}
+    assert await _fingerprints(db) == {1: "price-10.00", 2: "price-10.00"}
+
+    # Within TRACKER_MAX_STALENESS_SECONDS the scrape cache answers, with no fingerprint
+    assert await tracker.track_multiple_products([1, 2], db) == []
+    assert len(scraper.requests) == 1
+    assert await _fingerprints(db) == {1: "price-10.00", 2: "price-10.00"}
+
+    # Once the cache is gone the stored fingerprint is sent, and the page is skipped
+    await fake_redis.flushall()
+    assert await tracker.track_multiple_products([1, 2], db) == []
+    assert scraper.requests[-1] == PageFingerprint(digest="price-10.00")
+    assert await _fingerprints(db) == {1: "price-10.00", 2: "price-10.00"}
+
+
+@pytest.mark.asyncio
+async def test_tracking_twice_records_each_change_once(scraper, db, fake_redis):
+    await _products(db)
+    tracker = TrackerService()
+
+    await tracker.track_multiple_products([1, 2], db)
+    scraper.price = Decimal("12.00")
+    await fake_redis.flushall()
+    events = await tracker.track_multiple_products([1, 2], db)
+
+    assert [(e.old_price, e.new_price) for e in events] == [(Decimal("10.00"), Decimal("12.00"))] * 2
+    product = await db.get(Product, 1)
+    await db.refresh(product)
+    assert (product.price, product.previous_price) == (Decimal("12.00"), Decimal("10.00"))
+    assert product.page_fingerprint["digest"] == "price-12.00"
+    assert (await db.execute(select(func.count()).select_from(PriceHistory))).scalar_one() == 4
+
+
+@pytest.mark.asyncio
+async def test_missing_price_is_not_a_price_drop(scraper, db):
+    await _products(db)
+    scraper.price = None
+    scraper.stock = "Currently unavailable."
+
+    events = await TrackerService().track_multiple_products([1], db)
+
+    assert events and all(e.has_stock_change and not e.has_price_change for e in events)
+    product = await db.get(Product, 1)
+    await db.refresh(product)
+    assert (product.price, product.stock) == (Decimal("8.00"), "Currently unavailable.")
+    assert (await db.execute(select(func.count()).select_from(PriceHistory))).scalar_one() == 0
+
+
+def test_price_change_percent_fits_the_history_column():
+    percent = TrackerService(publisher=object()).get_price_change_percent
+    assert percent(Decimal("3.00"), Decimal("4.00")) == Decimal("33.33")
+    assert percent(Decimal("0.01"), Decimal("500.00")) == Decimal("999.99")
+    assert percent(Decimal("0"), Decimal("5.00")) == Decimal("999.99")
+    assert percent(Decimal("10.00"), Decimal("0")) == Decimal("-100.00")